@@ -4,10 +4,32 @@ LlamaVerifier - Zero-Knowledge Proof System for AI Model Verification
 
 __version__ = "0.1.0"
 __author__ = "LlamaVerifier Contributors"
+__email__ = "info@llamaverifier.ai"
+__description__ = "Zero-Knowledge Proof System for AI Model Verification"
+__url__ = "https://github.com/username/llamaverifier"
 __license__ = "MIT"
 
-from .cli import commands
-from .api import server
-from .circuits import compiler
-from .proofs import generator
-from .utils import logger 
\ No newline at end of file
+import importlib
+
+# Subpackages and the modules formerly imported here, loaded on first access
+# so that importing the package (and starting the CLI) does not pull in
+# NumPy, Numba or FastAPI
+_LAZY_MODULES = {
+    "api": ".api",
+    "circuits": ".circuits",
+    "cli": ".cli",
+    "models": ".models",
+    "proofs": ".proofs",
+    "utils": ".utils",
+    "commands": ".cli.commands",
+    "server": ".api.server",
+    "compiler": ".circuits.compiler",
+    "generator": ".proofs.generator",
+    "logger": ".utils.logger",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_MODULES:
+        return importlib.import_module(_LAZY_MODULES[name], __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}") 
@@ -5,7 +5,7 @@ Main entry point for LlamaVerifier
 import sys
 from typing import List, Optional
 
-from .cli.commands import app
+from .cli.commands import get_app
 
 
 def main(args: Optional[List[str]] = None) -> None:
@@ -16,6 +16,7 @@ def main(args: Optional[List[str]] = None) -> None:
         args: Command-line arguments (defaults to sys.argv[1:])
     """
     try:
+        app = get_app()
         if args is None:
             app()
         else:
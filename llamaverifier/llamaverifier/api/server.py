@@ -1,27 +1,33 @@
 """
 API server for LlamaVerifier
 """
+import asyncio
+import hashlib
 import os
 import tempfile
+import threading
+from dataclasses import dataclass, field
+from functools import partial
 from typing import Dict, List, Optional, Union
 
+import aiofiles
+import aiofiles.tempfile
 import uvicorn
-from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi import BackgroundTasks, FastAPI, File, Form, HTTPException, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel
-from rich.console import Console
 
-from ..circuits import ZKPCompiler
+from ..circuits import ZKPCompiler, ZoKratesPool
+from ..circuits.codegen import warm_template_cache
+from ..circuits.compiler import circuit_files
 from ..proofs import ProofSystem
+from ..utils.file_utils import hash_file
 from ..utils.logger import get_logger
 
 # Initialize logger
 logger = get_logger(__name__)
 
-# Initialize console for rich output
-console = Console()
-
 # Initialize FastAPI app
 app = FastAPI(
     title="LlamaVerifier API",
@@ -40,6 +46,7 @@ app.add_middleware(
 
 # Initialize modules
 compiler = ZKPCompiler()
+zokrates_pool = ZoKratesPool(compiler)
 proof_system = ProofSystem()
 
 # API Models
@@ -65,12 +72,117 @@ class ProofResponse(BaseModel):
     public_inputs_id: str
     message: str
 
+# Size of the chunks used to stream uploaded models to disk
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+@dataclass
+class ArtifactStore:
+    """
+    In-memory mapping of artifact IDs to file paths.
+    
+    Entries are spread over several shards, each guarded by its own lock,
+    so concurrent requests only contend when they touch the same shard.
+    """
+    num_shards: int = 16
+    _shards: List[Dict[str, str]] = field(init=False, repr=False)
+    _locks: List[threading.Lock] = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        self._shards = [{} for _ in range(self.num_shards)]
+        self._locks = [threading.Lock() for _ in range(self.num_shards)]
+    
+    def _shard(self, key: str) -> int:
+        return hash(key) % self.num_shards
+    
+    def __getitem__(self, key: str) -> str:
+        index = self._shard(key)
+        with self._locks[index]:
+            return self._shards[index][key]
+    
+    def __setitem__(self, key: str, value: str) -> None:
+        index = self._shard(key)
+        with self._locks[index]:
+            self._shards[index][key] = value
+    
+    def __contains__(self, key: str) -> bool:
+        index = self._shard(key)
+        with self._locks[index]:
+            return key in self._shards[index]
+    
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+    
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Get the path stored for an ID, or default if missing"""
+        index = self._shard(key)
+        with self._locks[index]:
+            return self._shards[index].get(key, default)
+    
+    def setdefault(self, key: str, value: str) -> str:
+        """Store a path for an ID unless one is already stored, returning the stored path"""
+        index = self._shard(key)
+        with self._locks[index]:
+            return self._shards[index].setdefault(key, value)
+    
+    def pop_all(self) -> List[str]:
+        """Remove every entry, returning the stored paths"""
+        paths = []
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                paths.extend(shard.values())
+                shard.clear()
+        return paths
+
+
+def _artifact_id(prefix: str, path: str) -> str:
+    """Derive a content-addressed ID for an artifact file"""
+    return f"{prefix}_{hash_file(path)[:16]}"
+
+
 # In-memory storage for demo purposes (would use a database in production)
-circuits = {}
-proofs = {}
-public_inputs = {}
-verification_keys = {}
-proving_keys = {}
+circuits = ArtifactStore()
+proofs = ArtifactStore()
+public_inputs = ArtifactStore()
+verification_keys = ArtifactStore()
+proving_keys = ArtifactStore()
+
+
+async def _run_blocking(func, *args):
+    """Run a blocking call on the default executor so the event loop keeps serving requests"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(func, *args))
+
+
+async def _stream_upload(upload: UploadFile, temp_file, digest) -> None:
+    """Stream an uploaded file to disk without buffering it in memory"""
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+        await temp_file.write(chunk)
+
+
+@app.on_event("startup")
+async def start_workers():
+    """Start the ZoKrates worker pool and pre-render common circuits"""
+    warm_template_cache()
+    compiler.warm_up()
+    zokrates_pool.start()
+
+
+@app.on_event("shutdown")
+async def stop_workers():
+    """Stop the workers and remove the artifacts they produced"""
+    zokrates_pool.shutdown()
+    proof_system.close()
+    
+    # Artifacts are only reachable through the in-memory stores
+    for circuit_path in circuits.pop_all():
+        _remove_circuit(circuit_path)
+    for store in (proofs, public_inputs, verification_keys, proving_keys):
+        for path in store.pop_all():
+            _remove_file(path)
 
 
 @app.get("/")
@@ -105,18 +217,31 @@ async def compile_model(
     Compile an AI model into a ZoKrates circuit
     """
     try:
-        # Save uploaded model to temporary file
-        with tempfile.NamedTemporaryFile(delete=False) as temp_model:
+        # Stream the upload to disk, hashing it on the way. No compile work
+        # starts until the digest shows the circuit is not already known.
+        digest = hashlib.blake2b(digest_size=16)
+        async with aiofiles.tempfile.NamedTemporaryFile("wb", delete=False) as temp_model:
             temp_model_path = temp_model.name
-            content = await model_file.read()
-            temp_model.write(content)
+            await _stream_upload(model_file, temp_model, digest)
+        
+        # Circuits are addressed by the model contents and compile options
+        digest.update(f"{model_type}:{optimization_level}".encode())
+        circuit_id = f"circuit_{digest.hexdigest()[:16]}"
+        
+        # Identical uploads map to the same circuit, so skip recompiling them
+        if circuit_id in circuits:
+            logger.info(f"Reusing compiled circuit: {circuit_id}")
+            return CompilationResponse(
+                circuit_id=circuit_id,
+                message="Model already compiled (cached)"
+            )
         
         # Create temporary output file
         with tempfile.NamedTemporaryFile(delete=False) as temp_output:
             temp_output_path = temp_output.name
         
-        # Compile model
-        success = compiler.compile_model(
+        # Compile model on the worker pool
+        success = await zokrates_pool.submit(
             temp_model_path,
             temp_output_path,
             model_type,
@@ -126,9 +251,10 @@ async def compile_model(
         if not success:
             raise HTTPException(status_code=500, detail="Compilation failed")
         
-        # Store circuit in memory (would store in database in production)
-        circuit_id = f"circuit_{len(circuits) + 1}"
-        circuits[circuit_id] = temp_output_path
+        # Store circuit in memory (would store in database in production);
+        # a concurrent upload of the same model may have stored it first
+        if circuits.setdefault(circuit_id, temp_output_path) != temp_output_path:
+            _remove_circuit(temp_output_path)
         
         return CompilationResponse(
             circuit_id=circuit_id,
@@ -137,6 +263,8 @@ async def compile_model(
     
     except Exception as e:
         logger.error(f"Error compiling model: {e}")
+        if 'temp_output_path' in locals():
+            _remove_circuit(temp_output_path)
         raise HTTPException(status_code=500, detail=str(e))
     
     finally:
@@ -158,7 +286,8 @@ async def setup_circuit(circuit_id: str, scheme: str = "g16"):
     
     try:
         # Perform trusted setup
-        proving_key_path, verification_key_path = proof_system.setup(
+        proving_key_path, verification_key_path = await _run_blocking(
+            proof_system.setup,
             circuits[circuit_id],
             scheme
         )
@@ -199,7 +328,8 @@ async def generate_proof(
     
     try:
         # Generate proof
-        proof_path, public_inputs_path = proof_system.generate_proof(
+        proof_path, public_inputs_path = await _run_blocking(
+            proof_system.generate_proof,
             circuits[circuit_id],
             proving_keys[proving_key_id],
             witness_values,
@@ -207,8 +337,8 @@ async def generate_proof(
         )
         
         # Store proof and public inputs in memory
-        proof_id = f"proof_{len(proofs) + 1}"
-        public_inputs_id = f"public_inputs_{len(public_inputs) + 1}"
+        proof_id = _artifact_id("proof", proof_path)
+        public_inputs_id = _artifact_id("public_inputs", public_inputs_path)
         
         proofs[proof_id] = proof_path
         public_inputs[public_inputs_id] = public_inputs_path
@@ -241,7 +371,8 @@ async def verify_proof(request: VerificationRequest, scheme: str = "g16"):
             raise HTTPException(status_code=404, detail="Verification key not found. Run setup first.")
         
         # Verify proof
-        valid = proof_system.verify_proof(
+        valid = await _run_blocking(
+            proof_system.verify_proof,
             verification_keys[verification_key_id],
             proofs[request.proof_id],
             public_inputs[request.public_inputs_id],
@@ -265,7 +396,7 @@ async def verify_proof(request: VerificationRequest, scheme: str = "g16"):
 
 
 @app.post("/export-verifier/{circuit_id}")
-async def export_verifier(circuit_id: str, scheme: str = "g16"):
+async def export_verifier(circuit_id: str, background_tasks: BackgroundTasks, scheme: str = "g16"):
     """
     Export a Solidity verifier contract
     """
@@ -279,32 +410,36 @@ async def export_verifier(circuit_id: str, scheme: str = "g16"):
             temp_output_path = temp_output.name
         
         # Export verifier
-        verifier_path = proof_system.export_verifier(
+        verifier_path = await _run_blocking(
+            proof_system.export_verifier,
             verification_keys[verification_key_id],
             temp_output_path,
             scheme
         )
         
-        # Read verifier contract
-        with open(verifier_path, "r") as f:
-            verifier_code = f.read()
-        
-        return {
-            "message": "Verifier contract exported successfully",
-            "verifier_code": verifier_code
-        }
+        # Stream the contract from disk and remove it once it has been sent
+        background_tasks.add_task(_remove_file, temp_output_path)
+        return FileResponse(verifier_path, media_type="text/plain", filename="Verifier.sol")
     
     except Exception as e:
         logger.error(f"Error exporting verifier: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-    
-    finally:
-        # Clean up temporary output file
         if 'temp_output_path' in locals():
-            try:
-                os.unlink(temp_output_path)
-            except:
-                pass
+            _remove_file(temp_output_path)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _remove_file(path: str) -> None:
+    """Remove a temporary file, ignoring errors"""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _remove_circuit(path: str) -> None:
+    """Remove a compiled circuit and the side files written next to it"""
+    for circuit_file in circuit_files(path):
+        _remove_file(circuit_file)
 
 
 def start_server(host: str = "0.0.0.0", port: int = 8000, debug: bool = False):
@@ -2,5 +2,5 @@
 Circuit compilation modules for LlamaVerifier
 """
 
-from .compiler import ZKPCompiler
+from .compiler import ModelType, ZKPCompiler, ZoKratesPool
 from .optimizations import OptimizationLevel, optimize_circuit 
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""
+Weight quantization helpers for LlamaVerifier circuits
+"""
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Scalar field modulus of the BN254 curve used by ZoKrates by default
+FIELD_MODULUS = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+
+# Fixed-point scale applied to weights before they are embedded as field elements
+DEFAULT_QUANT_SCALE = 1 << 16
+
+# Bit width of the signed weights passed to the circuits as witness values.
+# Keeping witness scalars this short already gives the prover the short-scalar
+# MSMs that a GLV split of full-width scalars would aim for.
+WITNESS_WEIGHT_BITS = 8
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _quantize_kernel(x, scale):
+        out = np.empty(x.size, np.int64)
+        for i in prange(x.size):
+            out[i] = np.int64(math.floor(x[i] * scale + 0.5))
+        return out
+else:
+    def _quantize_kernel(x, scale):
+        return np.floor(x * scale + 0.5).astype(np.int64)
+
+
+def quantize_weights(weights: np.ndarray, scale: float = DEFAULT_QUANT_SCALE) -> np.ndarray:
+    """
+    Quantize floating-point weights to signed fixed-point integers.
+    
+    Args:
+        weights: Weights to quantize
+        scale: Fixed-point scale factor
+        
+    Returns:
+        Flat int64 array of quantized weights
+    """
+    x = np.ascontiguousarray(weights, dtype=np.float64).ravel()
+    return _quantize_kernel(x, float(scale))
+
+
+def quantize_int8(weights: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Symmetrically quantize weights to the signed 8-bit range [-127, 127].
+    
+    Args:
+        weights: Weights to quantize
+        
+    Returns:
+        Tuple of (int8 quantized weights, scale factor)
+    """
+    limit = (1 << (WITNESS_WEIGHT_BITS - 1)) - 1
+    max_abs = float(np.max(np.abs(weights))) if weights.size else 0.0
+    scale = limit / max_abs if max_abs > 0 else 1.0
+    quantized = np.clip(quantize_weights(weights, scale), -limit, limit)
+    return quantized.astype(np.int8), scale
+
+
+def _naf_encode(weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Recode signed integer weights in non-adjacent form.
+    
+    Each weight w is split into non-negative parts with w = pos - neg, where
+    pos collects the +1 digits and neg the -1 digits of the NAF of w. The
+    circuit never sees negative values, which would otherwise wrap around
+    to large field elements.
+    
+    Args:
+        weights: Signed int8 weights
+        
+    Returns:
+        Tuple of (pos, neg) uint8 arrays
+    """
+    k = weights.astype(np.int16).ravel()
+    pos = np.zeros(k.size, dtype=np.int16)
+    neg = np.zeros(k.size, dtype=np.int16)
+    
+    bit = 1
+    while np.any(k):
+        # k mod 4 selects the digit of odd values: 1 -> +1, 3 -> -1
+        digit = np.where(k & 1, 2 - (k & 3), 0)
+        pos += np.where(digit > 0, bit, 0).astype(np.int16)
+        neg += np.where(digit < 0, bit, 0).astype(np.int16)
+        k = (k - digit) >> 1
+        bit <<= 1
+    
+    return pos.astype(np.uint8), neg.astype(np.uint8)
+
+
+def to_field_elements(quantized: np.ndarray, modulus: int = FIELD_MODULUS) -> List[int]:
+    """
+    Map signed fixed-point integers to field elements.
+    
+    Negative values are represented by their additive inverse modulo the
+    field modulus, which does not fit in a machine integer.
+    
+    Args:
+        quantized: Quantized weights
+        modulus: Field modulus
+        
+    Returns:
+        List of field elements
+    """
+    return [v % modulus for v in quantized.tolist()]
+
+
+def warm_up_kernels() -> None:
+    """
+    Compile the quantization kernel, or load it from numba's cache, so the
+    first request does not pay the JIT cost. Does nothing without numba.
+    """
+    if NUMBA_AVAILABLE:
+        _quantize_kernel(np.zeros(1, dtype=np.float64), 1.0)
+
@@ -0,0 +1,148 @@
+"""
+ZoKrates code generation for LlamaVerifier circuits
+"""
+import os
+from functools import lru_cache
+from typing import Iterable, List, Sequence, Tuple
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined
+
+from ..utils.logger import get_logger
+from ._quant import FIELD_MODULUS
+
+logger = get_logger(__name__)
+
+# Directory containing the Jinja templates for generated circuits
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+# (inputs, outputs, optimization level) specializations rendered ahead of time
+COMMON_ONNX_SHAPES = (
+    (1, 1, 1),
+    (1, 2, 1),
+    (2, 1, 1),
+    (2, 2, 1),
+)
+
+_environment = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    keep_trailing_newline=True,
+    undefined=StrictUndefined,
+)
+
+
+@lru_cache(maxsize=256)
+def render_onnx_circuit(inputs: int, outputs: int, optimization_level: int) -> str:
+    """
+    Render the ZoKrates circuit for an ONNX model of the given shape.
+    
+    The loops over inputs and outputs are unrolled by the template, so
+    ZoKrates receives straight-line code with constant indices.
+    
+    Args:
+        inputs: Number of model inputs
+        outputs: Number of model outputs
+        optimization_level: Optimization level
+        
+    Returns:
+        ZoKrates source code
+    """
+    template = _environment.get_template("onnx_main.zok.j2")
+    return template.render(
+        inputs=inputs,
+        outputs=outputs,
+        terms=min(5, inputs * 5),
+        opt=optimization_level,
+    )
+
+
+@lru_cache(maxsize=16)
+def render_llama_circuit(hidden_size: int, block_size: int, optimization_level: int) -> str:
+    """
+    Render the ZoKrates circuit for a LLaMA attention block.
+    
+    Both attention matrix products are tiled into block_size x block_size
+    blocks, and the cyclic (i + j) % hidden_size indexing is replaced by a
+    constant lookup table computed here.
+    
+    Args:
+        hidden_size: Hidden size of the attention block
+        block_size: Tile size (must divide hidden_size)
+        optimization_level: Optimization level
+        
+    Returns:
+        ZoKrates source code
+    """
+    if hidden_size % block_size:
+        raise ValueError(f"Block size {block_size} does not divide hidden size {hidden_size}")
+    
+    template = _environment.get_template("llama_main.zok.j2")
+    return template.render(
+        d=hidden_size,
+        block=block_size,
+        blocks=hidden_size // block_size,
+        rot=_rotation_table(hidden_size),
+        opt=optimization_level,
+    )
+
+
+def evaluate_llama_circuit(
+    weights: Sequence[int],
+    inputs: Sequence[int],
+    hidden_size: int,
+    modulus: int = FIELD_MODULUS
+) -> List[int]:
+    """
+    Compute the attention output the LLaMA circuit checks expected_output
+    against.
+    
+    Mirrors llama_main.zok.j2 over the field, using the same ROT table: the
+    projections index the weights like the template, the relu never fires
+    on field elements, and the softmax division multiplies by the inverse
+    of the sum. Tiling only reorders the sums, so it does not change the
+    result.
+    
+    Args:
+        weights: Field elements of the weights, w_pos - w_neg
+        inputs: Field elements of the circuit input
+        hidden_size: Hidden size of the attention block
+        modulus: Field modulus
+        
+    Returns:
+        Field elements of the attention output
+    """
+    d = hidden_size
+    if len(weights) != d or len(inputs) != d:
+        raise ValueError(f"Expected {d} weights and inputs, got {len(weights)} and {len(inputs)}")
+    
+    rot = _rotation_table(d)
+    query = [weights[i] * inputs[i] % modulus for i in range(d)]
+    key = [weights[(i + d) % d] * inputs[i] % modulus for i in range(d)]
+    value = [weights[(i + 2 * d) % d] * inputs[i] % modulus for i in range(d)]
+    
+    scores = [sum(query[j] * key[rot[i][j]] for j in range(d)) % modulus for i in range(d)]
+    total = sum(scores) % modulus
+    if total:
+        inverse = pow(total, -1, modulus)
+        scores = [score * inverse % modulus for score in scores]
+    
+    return [sum(scores[j] * value[rot[i][j]] for j in range(d)) % modulus for i in range(d)]
+
+
+def _rotation_table(hidden_size: int) -> List[List[int]]:
+    """Cyclic index table of the LLaMA circuit, ROT[i][j] = (i + j) % hidden_size"""
+    return [[(i + j) % hidden_size for j in range(hidden_size)] for i in range(hidden_size)]
+
+
+def warm_template_cache(shapes: Iterable[Tuple[int, int, int]] = COMMON_ONNX_SHAPES) -> None:
+    """
+    Pre-render the most common circuit specializations.
+    
+    Args:
+        shapes: (inputs, outputs, optimization level) tuples to render
+    """
+    for inputs, outputs, optimization_level in shapes:
+        render_onnx_circuit(inputs, outputs, optimization_level)
+    
+    logger.debug(f"Pre-rendered {render_onnx_circuit.cache_info().currsize} circuit templates")
@@ -1,21 +1,54 @@
 """
 ZKP Circuit Compiler for AI Models
 """
+import asyncio
+import hashlib
 import os
+import shutil
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from enum import Enum
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
 
+from ..utils.file_utils import ensure_private_directory, hash_file, user_cache_dir
 from ..utils.logger import get_logger
-from ..utils.system_utils import is_apple_silicon
+from ._quant import _naf_encode, quantize_int8, quantize_weights, to_field_elements, warm_up_kernels
+from .codegen import evaluate_llama_circuit, render_llama_circuit, render_onnx_circuit
 from .optimizations import OptimizationLevel, optimize_circuit
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
 logger = get_logger(__name__)
 
+# Bump whenever the generated ZoKrates templates change so stale cache
+# entries are never reused
+CIRCUIT_TEMPLATE_VERSION = 6
+
+# Hidden size of the attention block in the generated LLaMA circuit
+LLAMA_HIDDEN_SIZE = 64
+
+# Tile size used for the attention matrix products
+LLAMA_BLOCK_SIZE = 8
+
+# Artifacts produced by `zokrates compile` that are stored in the cache
+CIRCUIT_ARTIFACTS = ("out", "abi.json", "out.r1cs")
+
+# RAM-backed directory for the throwaway .zok sources, which ZoKrates reads
+# once before they are deleted (None uses the default temp directory)
+SOURCE_TEMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+# Shape of the placeholder generic circuit as (weights, inputs)
+GENERIC_CIRCUIT_SHAPE = (10, 5)
+
 
 class ModelType(str, Enum):
     """Enum for AI model types"""
@@ -43,18 +76,48 @@ class ZKPCompiler:
         """
         self.workspace_dir = workspace_dir
         
-        # Check if we're running on Apple Silicon for optimizations
-        self.is_apple_silicon = is_apple_silicon()
+        # Directory for cached circuit artifacts, which are served without
+        # being checked again, so it must not be shared with other users
+        if workspace_dir:
+            self.cache_dir = os.path.join(workspace_dir, "cache")
+        else:
+            self.cache_dir = user_cache_dir("circuits")
         
-        # Set up MLX if available
-        self.mlx_available = False
-        if self.is_apple_silicon:
-            try:
-                import mlx
-                self.mlx_available = True
-                logger.info("MLX acceleration enabled")
-            except ImportError:
-                logger.warning("MLX not available. Install with 'pip install mlx' for acceleration on Apple Silicon")
+        # Resolve the ZoKrates binary once instead of searching $PATH per call
+        self._zokrates_bin = shutil.which("zokrates") or "zokrates"
+        
+        # Model-specific compilers; transformers share the LLaMA circuit and
+        # unsupported types fall back to the generic compiler
+        self._dispatch = {
+            ModelType.LLAMA: self._compile_llama_model,
+            ModelType.TRANSFORMER: self._compile_llama_model,
+            ModelType.ONNX: self._compile_onnx_model,
+            ModelType.GENERIC: self._compile_generic_model,
+        }
+    
+    def warm_up(self) -> bool:
+        """
+        Run the ZoKrates binary once so it and its shared libraries are
+        loaded into the page cache before the first compilation, and compile
+        the quantization kernels.
+        
+        Returns:
+            True if ZoKrates ran successfully, False otherwise
+        """
+        warm_up_kernels()
+        
+        try:
+            result = subprocess.run(
+                [self._zokrates_bin, "--version"],
+                capture_output=True,
+                text=True
+            )
+        except OSError as e:
+            logger.warning(f"ZoKrates not available: {e}")
+            return False
+        
+        logger.debug(f"ZoKrates version: {result.stdout.strip()}")
+        return result.returncode == 0
     
     def compile_model(
         self,
@@ -74,6 +137,12 @@ class ZKPCompiler:
             
         Returns:
             True if compilation was successful, False otherwise
+        
+        Note:
+            Model weights are passed to the generated circuits as signed NAF
+            pairs (w_pos, w_neg) with weight = w_pos - w_neg. This changes the
+            witness layout, so proving and verification keys created for
+            circuits compiled by earlier versions must be regenerated.
         """
         # Validate inputs
         if not os.path.exists(model_path):
@@ -101,19 +170,17 @@ class ZKPCompiler:
         
         try:
             # The compilation process depends on the model type
-            if model_type_enum == ModelType.LLAMA:
-                success = self._compile_llama_model(model_path, output_path, opt_level)
-            elif model_type_enum == ModelType.TRANSFORMER:
-                success = self._compile_transformer_model(model_path, output_path, opt_level)
-            elif model_type_enum == ModelType.ONNX:
-                success = self._compile_onnx_model(model_path, output_path, opt_level)
-            else:
-                # Generic model compilation
-                success = self._compile_generic_model(model_path, output_path, opt_level)
+            compile_fn = self._dispatch.get(model_type_enum, self._compile_generic_model)
+            success = compile_fn(model_path, output_path, opt_level)
             
             if success:
-                # Apply post-compilation optimizations
-                optimized_path = optimize_circuit(output_path, opt_level)
+                # Apply post-compilation optimizations next to the output so
+                # replacing it is a rename rather than a copy
+                optimized_path = optimize_circuit(
+                    output_path,
+                    opt_level,
+                    temp_dir=os.path.dirname(os.path.abspath(output_path))
+                )
                 
                 # If optimization produced a new file, replace the original
                 if optimized_path != output_path:
@@ -129,221 +196,220 @@ class ZKPCompiler:
             logger.error(f"Error compiling model: {e}")
             return False
     
-    def _compile_generic_model(
-        self,
-        model_path: str,
-        output_path: str,
-        optimization_level: OptimizationLevel
-    ) -> bool:
+    def precompile(self, model_type: str = "generic", optimization_level: int = 1) -> bool:
         """
-        Compile a generic model into a ZKP circuit.
+        Compile the circuit skeleton for a model type into the circuit cache.
+        
+        Generic and LLaMA circuits only depend on the compile options, not on
+        the model contents, so they can be compiled while the model is still
+        being uploaded. A later compile_model call is then a cache hit.
         
         Args:
-            model_path: Path to the model file
+            model_type: Type of the model (generic, llama, etc.)
+            optimization_level: Level of circuit optimization (0-3)
+            
+        Returns:
+            True if the skeleton is in the cache, False if the model type
+            has no shape-independent skeleton or compilation failed
+        """
+        try:
+            model_type_enum = ModelType(model_type.lower())
+        except ValueError:
+            model_type_enum = ModelType.GENERIC
+        
+        try:
+            opt_level = OptimizationLevel(optimization_level)
+        except ValueError:
+            opt_level = OptimizationLevel.LEVEL_1
+        
+        if model_type_enum in (ModelType.LLAMA, ModelType.TRANSFORMER):
+            zokrates_code, cache_key = _llama_skeleton(opt_level)
+        elif model_type_enum == ModelType.ONNX:
+            # ONNX circuits depend on the graph inside the uploaded model
+            return False
+        else:
+            zokrates_code, cache_key = _generic_skeleton(opt_level)
+        
+        logger.info(f"Precompiling {model_type_enum.value} circuit skeleton")
+        
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                source_path = os.path.join(temp_dir, "skeleton.zok")
+                with open(source_path, "wb") as f:
+                    f.write(zokrates_code)
+                
+                return self._compile_zokrates_source(
+                    source_path, os.path.join(temp_dir, "out"), cache_key
+                )
+        except Exception as e:
+            logger.warning(f"Error precompiling circuit skeleton: {e}")
+            return False
+    
+    def _compile_zokrates_source(self, source_path: str, output_path: str, cache_key: str) -> bool:
+        """
+        Compile a ZoKrates source file, reusing cached artifacts when possible.
+        
+        Args:
+            source_path: Path to the temporary .zok source file (removed afterwards)
             output_path: Path where the compiled circuit will be saved
-            optimization_level: Optimization level
+            cache_key: Cache key identifying the circuit shape
             
         Returns:
             True if compilation was successful, False otherwise
         """
-        logger.info("Using generic model compiler")
-        
-        # For demonstration, we'll create a simple ZoKrates circuit
-        # In a real implementation, this would analyze the model and generate
-        # appropriate ZoKrates code
+        entry_dir = os.path.join(self.cache_dir, cache_key)
+        artifact_paths = _artifact_paths(output_path)
         
-        # Create a temporary file for the ZoKrates code
-        with tempfile.NamedTemporaryFile(suffix=".zok", delete=False) as temp_file:
-            zokrates_code = f"""
-            // Auto-generated ZoKrates circuit for model: {model_path}
-            // Optimization level: {optimization_level.value}
+        try:
+            try:
+                ensure_private_directory(self.cache_dir)
+            except OSError as e:
+                logger.warning(f"Compiling without the circuit cache: {e}")
+                return self._run_zokrates_compile(source_path, artifact_paths)
             
-            def main(private field[10] model_params, field[5] input, field expected_output) -> bool:
-                // This is a placeholder implementation
-                // A real implementation would encode the model's computation
-                
-                field result = 0;
+            with _cache_lock(entry_dir + ".lock"):
+                if os.path.exists(os.path.join(entry_dir, "out")):
+                    logger.info(f"Using cached circuit: {cache_key}")
+                    for name, dest in artifact_paths.items():
+                        cached = os.path.join(entry_dir, name)
+                        if os.path.exists(cached):
+                            shutil.copy(cached, dest)
+                    return True
                 
-                // Simple weighted sum as a placeholder
-                for u32 i in 0..5 do
-                    result = result + input[i] * model_params[i];
-                endfor
+                if not self._run_zokrates_compile(source_path, artifact_paths):
+                    return False
                 
-                // Apply activation function (simplified)
-                if result < 0 then
-                    result = 0;
-                endif
-                
-                // Compare with expected output
-                return result == expected_output;
-            }}
-            """
-            
-            temp_file.write(zokrates_code.encode())
-            temp_file_path = temp_file.name
+                self._store_cached_circuit(entry_dir, artifact_paths)
+                return True
+        finally:
+            # Clean up the temporary file
+            os.unlink(source_path)
+    
+    def _run_zokrates_compile(self, source_path: str, artifact_paths: Dict[str, str]) -> bool:
+        """
+        Compile a ZoKrates source file into the given artifact paths.
         
+        Args:
+            source_path: Path to the .zok source file
+            artifact_paths: Mapping of artifact name to output file path
+            
+        Returns:
+            True if compilation was successful, False otherwise
+        """
         try:
             # Compile the ZoKrates code to a circuit
             zokrates_result = subprocess.run(
-                ["zokrates", "compile", "-i", temp_file_path, "-o", output_path],
+                [self._zokrates_bin, "compile", "-i", source_path,
+                 "-o", artifact_paths["out"],
+                 "-s", artifact_paths["abi.json"],
+                 "-r", artifact_paths["out.r1cs"]],
                 check=True,
                 capture_output=True,
                 text=True
             )
             
             logger.debug(f"ZoKrates output: {zokrates_result.stdout}")
-            
-            return True
         except subprocess.CalledProcessError as e:
             logger.error(f"ZoKrates compilation error: {e.stderr}")
             return False
-        finally:
-            # Clean up the temporary file
-            os.unlink(temp_file_path)
+        
+        return True
     
-    def _compile_llama_model(
+    def _store_cached_circuit(self, entry_dir: str, artifact_paths: Dict[str, str]) -> None:
+        """
+        Store freshly compiled artifacts in the circuit cache.
+        
+        The artifacts are staged in a temporary directory and moved into place
+        with a single rename so readers never observe a partial entry.
+        
+        Args:
+            entry_dir: Cache directory for this circuit
+            artifact_paths: Mapping of artifact name to compiled file path
+        """
+        if not os.path.exists(artifact_paths["out"]):
+            return
+        
+        staging_dir = tempfile.mkdtemp(dir=self.cache_dir)
+        try:
+            for name, path in artifact_paths.items():
+                if os.path.exists(path):
+                    shutil.copy(path, os.path.join(staging_dir, name))
+            os.replace(staging_dir, entry_dir)
+        except OSError as e:
+            logger.warning(f"Failed to cache compiled circuit: {e}")
+            shutil.rmtree(staging_dir, ignore_errors=True)
+    
+    def _compile_generic_model(
         self,
         model_path: str,
         output_path: str,
         optimization_level: OptimizationLevel
     ) -> bool:
         """
-        Compile a LLaMA model into a ZKP circuit.
+        Compile a generic model into a ZKP circuit.
         
         Args:
-            model_path: Path to the LLaMA model file
+            model_path: Path to the model file
             output_path: Path where the compiled circuit will be saved
             optimization_level: Optimization level
             
         Returns:
             True if compilation was successful, False otherwise
         """
-        logger.info("Using LLaMA model compiler")
+        logger.info("Using generic model compiler")
         
-        # This would implement LLaMA-specific circuit generation logic
-        # For demonstration, we'll use a placeholder implementation
+        # For demonstration, we'll create a simple ZoKrates circuit
+        # In a real implementation, this would analyze the model and generate
+        # appropriate ZoKrates code
+        zokrates_code, cache_key = _generic_skeleton(optimization_level)
         
-        # Check if MLX acceleration is available for LLaMA models
-        if self.is_apple_silicon and self.mlx_available:
-            logger.info("Using MLX acceleration for LLaMA model compilation")
-            
-            # Here we would load and process the model with MLX
-            # This is a placeholder for the actual implementation
-            pass
-        
-        # Create a more complex circuit for LLaMA models
-        with tempfile.NamedTemporaryFile(suffix=".zok", delete=False) as temp_file:
-            # This is a simplified placeholder - real implementation would be much more complex
-            zokrates_code = f"""
-            // Auto-generated ZoKrates circuit for LLaMA model: {model_path}
-            // Optimization level: {optimization_level.value}
-            
-            def attention(field[64] query, field[64] key, field[64] value) -> field[64]:
-                // Simplified attention mechanism
-                field[64] output = [0; 64];
-                field[64] scores = [0; 64];
-                
-                // Calculate attention scores (dot product of query and key)
-                for u32 i in 0..64 do
-                    for u32 j in 0..64 do
-                        scores[i] = scores[i] + query[j] * key[(i+j)%64];
-                    endfor
-                endfor
-                
-                // Apply softmax (simplified)
-                field sum = 0;
-                for u32 i in 0..64 do
-                    if scores[i] < 0 then
-                        scores[i] = 0;
-                    endif
-                    sum = sum + scores[i];
-                endfor
-                
-                if sum > 0 then
-                    for u32 i in 0..64 do
-                        scores[i] = scores[i] / sum;
-                    endfor
-                endif
-                
-                // Weight values by attention scores
-                for u32 i in 0..64 do
-                    for u32 j in 0..64 do
-                        output[i] = output[i] + scores[j] * value[(i+j)%64];
-                    endfor
-                endfor
-                
-                return output;
-            }}
-            
-            def main(private field[64] model_weights, field[64] input, field[64] expected_output) -> bool:
-                // Simplified LLaMA forward pass
-                field[64] query = [0; 64];
-                field[64] key = [0; 64];
-                field[64] value = [0; 64];
-                
-                // Apply input projection (simplified)
-                for u32 i in 0..64 do
-                    query[i] = input[i] * model_weights[i];
-                    key[i] = input[i] * model_weights[(i+64)%64];
-                    value[i] = input[i] * model_weights[(i+128)%64];
-                endfor
-                
-                // Apply attention
-                field[64] attention_output = attention(query, key, value);
-                
-                // Check if output matches expected
-                bool matches = true;
-                for u32 i in 0..64 do
-                    matches = matches && (attention_output[i] == expected_output[i]);
-                endfor
-                
-                return matches;
-            }}
-            """
-            
-            temp_file.write(zokrates_code.encode())
+        # Create a temporary file for the ZoKrates code
+        with tempfile.NamedTemporaryFile(suffix=".zok", dir=SOURCE_TEMP_DIR, delete=False) as temp_file:
+            temp_file.write(f"// Auto-generated ZoKrates circuit for model: {model_path}\n".encode())
+            temp_file.write(zokrates_code)
             temp_file_path = temp_file.name
         
-        try:
-            # Compile the ZoKrates code to a circuit
-            zokrates_result = subprocess.run(
-                ["zokrates", "compile", "-i", temp_file_path, "-o", output_path],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            
-            logger.debug(f"ZoKrates output: {zokrates_result.stdout}")
-            
-            return True
-        except subprocess.CalledProcessError as e:
-            logger.error(f"ZoKrates compilation error: {e.stderr}")
-            return False
-        finally:
-            # Clean up the temporary file
-            os.unlink(temp_file_path)
+        return self._compile_zokrates_source(temp_file_path, output_path, cache_key)
     
-    def _compile_transformer_model(
+    def _compile_llama_model(
         self,
         model_path: str,
         output_path: str,
         optimization_level: OptimizationLevel
     ) -> bool:
         """
-        Compile a transformer model into a ZKP circuit.
+        Compile a LLaMA model into a ZKP circuit.
         
         Args:
-            model_path: Path to the transformer model file
+            model_path: Path to the LLaMA model file
             output_path: Path where the compiled circuit will be saved
             optimization_level: Optimization level
             
         Returns:
             True if compilation was successful, False otherwise
         """
-        logger.info("Using transformer model compiler")
-        # Similar to LLaMA but with transformer-specific optimizations
-        # For this demo, we'll reuse the LLaMA implementation
-        return self._compile_llama_model(model_path, output_path, optimization_level)
+        logger.info("Using LLaMA model compiler")
+        
+        # This would implement LLaMA-specific circuit generation logic
+        # For demonstration, we'll use a placeholder implementation
+        
+        # Precompute the committed output from the weights the circuit takes
+        weights = _load_llama_weights(model_path)
+        if weights is not None and weights.size >= LLAMA_HIDDEN_SIZE:
+            _write_field_elements(
+                f"{output_path}.committed",
+                _attention_commitment(weights, LLAMA_HIDDEN_SIZE)
+            )
+        
+        # Render the tiled attention circuit for LLaMA models
+        zokrates_code, cache_key = _llama_skeleton(optimization_level)
+        
+        with tempfile.NamedTemporaryFile(suffix=".zok", dir=SOURCE_TEMP_DIR, delete=False) as temp_file:
+            temp_file.write(f"// Auto-generated ZoKrates circuit for LLaMA model: {model_path}\n".encode())
+            temp_file.write(zokrates_code)
+            temp_file_path = temp_file.name
+        
+        return self._compile_zokrates_source(temp_file_path, output_path, cache_key)
     
     def _compile_onnx_model(
         self,
@@ -384,65 +450,401 @@ class ZKPCompiler:
             inputs = graph.input
             outputs = graph.output
             
-            # Create ZoKrates code based on the graph
-            with tempfile.NamedTemporaryFile(suffix=".zok", delete=False) as temp_file:
-                zokrates_code = f"""
-                // Auto-generated ZoKrates circuit for ONNX model: {model_path}
-                // Optimization level: {optimization_level.value}
-                // Model inputs: {len(inputs)}
-                // Model outputs: {len(outputs)}
-                // Model operations: {len(nodes)}
-                
-                def main(
-                    private field[{len(inputs) * 10}] model_weights, 
-                    field[{len(inputs) * 5}] model_input, 
-                    field[{len(outputs)}] expected_output
-                ) -> bool:
-                    // Placeholder for ONNX model execution
-                    field[{len(outputs)}] result = [0; {len(outputs)}];
-                    
-                    // Simplified implementation
-                    for u32 i in 0..{len(outputs)} do
-                        for u32 j in 0..{min(5, len(inputs) * 5)} do
-                            result[i] = result[i] + model_input[j] * model_weights[i * {len(inputs)} + j];
-                        endfor
-                    endfor
-                    
-                    // Check output matches expected
-                    bool matches = true;
-                    for u32 i in 0..{len(outputs)} do
-                        matches = matches && (result[i] == expected_output[i]);
-                    endfor
-                    
-                    return matches;
-                }}
-                """
-                
-                temp_file.write(zokrates_code.encode())
-                temp_file_path = temp_file.name
+            # Pack the initializer tensors into contiguous arrays
+            weights, weight_sizes = _load_onnx_weights(model, model_path, self.cache_dir)
+            logger.info(f"Extracted {weights.size} weights from {weight_sizes.size} initializers")
             
-            try:
-                # Compile the ZoKrates code to a circuit
-                zokrates_result = subprocess.run(
-                    ["zokrates", "compile", "-i", temp_file_path, "-o", output_path],
-                    check=True,
-                    capture_output=True,
-                    text=True
+            # Encode the weights as signed NAF pairs for the private witness
+            quantized, _ = quantize_int8(weights)
+            w_pos, w_neg = _naf_encode(quantized)
+            _write_field_elements(
+                f"{output_path}.weights",
+                w_pos.tolist() + w_neg.tolist()
+            )
+            
+            # Render the unrolled ZoKrates code for this graph shape
+            zokrates_code, cache_key = _onnx_skeleton(len(inputs), len(outputs), optimization_level)
+            
+            with tempfile.NamedTemporaryFile(suffix=".zok", dir=SOURCE_TEMP_DIR, delete=False) as temp_file:
+                temp_file.write(
+                    f"// Auto-generated ZoKrates circuit for ONNX model: {model_path}\n"
+                    f"// Model operations: {len(nodes)}\n".encode()
                 )
-                
-                logger.debug(f"ZoKrates output: {zokrates_result.stdout}")
-                
-                return True
-            except subprocess.CalledProcessError as e:
-                logger.error(f"ZoKrates compilation error: {e.stderr}")
-                return False
-            finally:
-                # Clean up the temporary file
-                os.unlink(temp_file_path)
+                temp_file.write(zokrates_code)
+                temp_file_path = temp_file.name
+            
+            return self._compile_zokrates_source(temp_file_path, output_path, cache_key)
                 
         except ImportError:
             logger.error("ONNX package not installed. Please install with 'pip install onnx onnxruntime'")
             return False
         except Exception as e:
             logger.error(f"Error processing ONNX model: {e}")
-            return False 
\ No newline at end of file
+            return False
+
+
+class ZoKratesPool:
+    """
+    Pool of long-lived workers that run ZoKrates compilation jobs.
+    
+    Jobs are dispatched to a fixed set of worker threads so that the
+    blocking ZoKrates invocations never stall the event loop, and so that
+    the number of concurrent ZoKrates processes stays bounded under load.
+    """
+    
+    def __init__(self, compiler: Optional[ZKPCompiler] = None, size: Optional[int] = None):
+        """
+        Initialize the worker pool.
+        
+        Args:
+            compiler: Compiler used to run the jobs (optional)
+            size: Number of workers (defaults to half the CPU count)
+        """
+        self.compiler = compiler or ZKPCompiler()
+        self.size = size or max(1, (os.cpu_count() or 2) // 2)
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    @property
+    def running(self) -> bool:
+        """Whether the pool workers have been started"""
+        return self._executor is not None
+    
+    def start(self) -> None:
+        """Start the pool workers"""
+        if self._executor is not None:
+            return
+        
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.size,
+            thread_name_prefix="zokrates-worker"
+        )
+        logger.info(f"Started ZoKrates worker pool with {self.size} workers")
+    
+    def shutdown(self) -> None:
+        """Stop the pool workers, waiting for running jobs to finish"""
+        if self._executor is None:
+            return
+        
+        self._executor.shutdown(wait=True)
+        self._executor = None
+        logger.info("Stopped ZoKrates worker pool")
+    
+    async def submit(
+        self,
+        model_path: str,
+        output_path: str,
+        model_type: str = "generic",
+        optimization_level: int = 1
+    ) -> bool:
+        """
+        Compile a model on one of the pool workers.
+        
+        Args:
+            model_path: Path to the AI model file
+            output_path: Path where the compiled circuit will be saved
+            model_type: Type of the model (generic, llama, etc.)
+            optimization_level: Level of circuit optimization (0-3)
+            
+        Returns:
+            True if compilation was successful, False otherwise
+        """
+        self.start()
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            partial(
+                self.compiler.compile_model,
+                model_path,
+                output_path,
+                model_type,
+                optimization_level
+            )
+        )
+    
+    async def precompile(self, model_type: str = "generic", optimization_level: int = 1) -> bool:
+        """
+        Compile the circuit skeleton for a model type on one of the pool workers.
+        
+        Args:
+            model_type: Type of the model (generic, llama, etc.)
+            optimization_level: Level of circuit optimization (0-3)
+            
+        Returns:
+            True if the skeleton is in the circuit cache, False otherwise
+        """
+        self.start()
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            partial(self.compiler.precompile, model_type, optimization_level)
+        )
+
+
+def _load_onnx_weights(model, model_path: str, cache_dir: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Extract the initializer tensors of an ONNX model in a structure-of-arrays layout.
+    
+    All weights are flattened into a single contiguous float32 array, with a
+    parallel int32 array holding the element count of each initializer.
+    The arrays are cached on disk keyed by the hash of the model file.
+    
+    Args:
+        model: Loaded ONNX model
+        model_path: Path to the ONNX model file
+        cache_dir: Directory used for cached arrays
+        
+    Returns:
+        Tuple of (weights, weight_sizes)
+    """
+    from onnx import numpy_helper
+    
+    weights_path = os.path.join(cache_dir, "weights", f"{hash_file(model_path)}.npz")
+    try:
+        ensure_private_directory(os.path.dirname(weights_path))
+        use_cache = True
+    except OSError as e:
+        logger.warning(f"Not caching ONNX weights: {e}")
+        use_cache = False
+    
+    if use_cache and os.path.exists(weights_path):
+        with np.load(weights_path) as cached:
+            return cached["weights"], cached["sizes"]
+    
+    initializers = model.graph.initializer
+    sizes = np.fromiter(
+        (int(np.prod(t.dims)) for t in initializers),
+        dtype=np.int32,
+        count=len(initializers)
+    )
+    if initializers:
+        weights = np.concatenate([
+            numpy_helper.to_array(t).ravel().astype(np.float32) for t in initializers
+        ])
+    else:
+        weights = np.empty(0, dtype=np.float32)
+    
+    if use_cache:
+        try:
+            with tempfile.NamedTemporaryFile(dir=os.path.dirname(weights_path), delete=False) as temp_file:
+                np.savez(temp_file, weights=weights, sizes=sizes)
+            os.replace(temp_file.name, weights_path)
+        except OSError as e:
+            logger.warning(f"Failed to cache ONNX weights: {e}")
+    
+    return weights, sizes
+
+
+def _load_llama_weights(model_path: str) -> Optional[np.ndarray]:
+    """
+    Load the weights of a LLaMA model stored as a NumPy .npy or .npz file.
+    
+    Args:
+        model_path: Path to the model file
+        
+    Returns:
+        Flat float32 array of weights, or None if the format is not supported
+    """
+    try:
+        if model_path.endswith(".npy"):
+            return np.load(model_path).ravel().astype(np.float32)
+        if model_path.endswith(".npz"):
+            with np.load(model_path) as archive:
+                arrays = [archive[name].ravel().astype(np.float32) for name in archive.files]
+            return np.concatenate(arrays) if arrays else None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Failed to load LLaMA weights: {e}")
+    
+    return None
+
+
+def _attention_commitment(weights: np.ndarray, d: int) -> List[int]:
+    """
+    Compute the attention output committed to by the LLaMA circuit.
+    
+    The circuit takes the first d int8-quantized weights as its witness,
+    split into w_pos - w_neg. The commitment is the output it computes for
+    the all-ones input, evaluated with the same expression the template
+    emits.
+    
+    Args:
+        weights: Flat array of model weights
+        d: Hidden size of the attention block
+        
+    Returns:
+        Field elements of the attention output
+    """
+    quantized, _ = quantize_int8(weights[:d])
+    field_weights = to_field_elements(quantized.astype(np.int64))
+    return evaluate_llama_circuit(field_weights, [1] * d, d)
+
+
+def _write_field_elements(path: str, field_elements: List[int]) -> None:
+    """
+    Write field elements one per line, so they can be passed as witness
+    values of the circuit.
+    
+    Args:
+        path: Path of the output file
+        field_elements: Field elements to write
+    """
+    with open(path, "w") as f:
+        f.write("".join(f"{value}\n" for value in field_elements))
+
+
+@lru_cache(maxsize=None)
+def _generic_skeleton(optimization_level: OptimizationLevel) -> Tuple[bytes, str]:
+    """
+    Render the placeholder generic circuit.
+    
+    The encoded source is memoized, since it only depends on the options.
+    
+    Args:
+        optimization_level: Optimization level
+        
+    Returns:
+        Tuple of (zokrates_code, cache_key)
+    """
+    zokrates_code = f"""
+        // Optimization level: {optimization_level.value}
+        
+        def main(private field[10] w_pos, private field[10] w_neg, field[5] input, field expected_output) -> bool:
+            // This is a placeholder implementation
+            // A real implementation would encode the model's computation
+            
+            field result = 0;
+            
+            // Simple weighted sum as a placeholder
+            for u32 i in 0..5 do
+                result = result + (w_pos[i] * input[i]) - (w_neg[i] * input[i]);
+            endfor
+            
+            // Apply activation function (simplified)
+            if result < 0 then
+                result = 0;
+            endif
+            
+            // Compare with expected output
+            return result == expected_output;
+        }}
+        """
+    cache_key = _circuit_cache_key(ModelType.GENERIC, optimization_level, GENERIC_CIRCUIT_SHAPE)
+    return zokrates_code.encode(), cache_key
+
+
+@lru_cache(maxsize=None)
+def _llama_skeleton(optimization_level: OptimizationLevel) -> Tuple[bytes, str]:
+    """
+    Render the tiled attention circuit used for LLaMA models.
+    
+    The encoded source is memoized, since it only depends on the options.
+    
+    Args:
+        optimization_level: Optimization level
+        
+    Returns:
+        Tuple of (zokrates_code, cache_key)
+    """
+    zokrates_code = render_llama_circuit(LLAMA_HIDDEN_SIZE, LLAMA_BLOCK_SIZE, optimization_level.value)
+    cache_key = _circuit_cache_key(
+        ModelType.LLAMA, optimization_level, (LLAMA_HIDDEN_SIZE, LLAMA_BLOCK_SIZE)
+    )
+    return zokrates_code.encode(), cache_key
+
+
+@lru_cache(maxsize=256)
+def _onnx_skeleton(
+    num_inputs: int,
+    num_outputs: int,
+    optimization_level: OptimizationLevel
+) -> Tuple[bytes, str]:
+    """
+    Render the unrolled circuit for an ONNX graph shape.
+    
+    Args:
+        num_inputs: Number of graph inputs
+        num_outputs: Number of graph outputs
+        optimization_level: Optimization level
+        
+    Returns:
+        Tuple of (zokrates_code, cache_key)
+    """
+    zokrates_code = render_onnx_circuit(num_inputs, num_outputs, optimization_level.value)
+    cache_key = _circuit_cache_key(ModelType.ONNX, optimization_level, (num_inputs, num_outputs))
+    return zokrates_code.encode(), cache_key
+
+
+def _circuit_cache_key(
+    model_type: ModelType,
+    optimization_level: OptimizationLevel,
+    shape: Tuple[int, ...]
+) -> str:
+    """
+    Compute the content-addressed cache key for a generated circuit.
+    
+    Args:
+        model_type: Type of the model
+        optimization_level: Optimization level
+        shape: Tensor-shape fingerprint of the generated circuit
+        
+    Returns:
+        Hex digest identifying the circuit
+    """
+    fingerprint = f"{CIRCUIT_TEMPLATE_VERSION}:{model_type.value}:{int(optimization_level)}:{shape}"
+    return hashlib.blake2b(fingerprint.encode(), digest_size=16).hexdigest()
+
+
+def _artifact_paths(output_path: str) -> Dict[str, str]:
+    """
+    Get the paths of the artifacts produced when compiling to output_path.
+    
+    Args:
+        output_path: Path where the compiled circuit will be saved
+        
+    Returns:
+        Mapping of cached artifact name to file path
+    """
+    return {
+        "out": output_path,
+        "abi.json": f"{output_path}.abi.json",
+        "out.r1cs": f"{output_path}.r1cs",
+    }
+
+
+def circuit_files(output_path: str) -> List[str]:
+    """
+    Get the paths of every file compile_model may write for a circuit.
+    
+    Args:
+        output_path: Path where the compiled circuit is saved
+        
+    Returns:
+        The circuit path followed by the side files written next to it
+    """
+    return [
+        *_artifact_paths(output_path).values(),
+        f"{output_path}.committed",
+        f"{output_path}.weights",
+    ]
+
+
+@contextmanager
+def _cache_lock(lock_path: str):
+    """
+    Hold an exclusive lock on a cache entry so concurrent workers
+    compile each circuit only once.
+    
+    Args:
+        lock_path: Path to the lock file
+    """
+    if fcntl is None:
+        yield
+        return
+    
+    with open(lock_path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -1,17 +1,29 @@
 """
 Circuit optimization utilities for LlamaVerifier
 """
+import logging
 import os
+import shutil
 import subprocess
 import tempfile
+from contextlib import suppress
 from enum import Enum, IntEnum
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
+from ..utils.file_utils import check_private_directory, ensure_private_directory, hash_file, user_cache_dir
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Per-user directory holding optimized circuits keyed by input content and
+# level; its entries are served without being checked again
+OPT_CACHE_DIR = user_cache_dir("optimized")
+
+# (input digest, optimization level) -> cached optimized circuit path
+_OPT_CACHE: Dict[Tuple[str, int], str] = {}
+
 
 class OptimizationLevel(IntEnum):
     """Optimization levels for circuit compilation"""
@@ -23,7 +35,8 @@ class OptimizationLevel(IntEnum):
 
 def optimize_circuit(
     circuit_path: Union[str, Path],
-    optimization_level: OptimizationLevel = OptimizationLevel.LEVEL_1
+    optimization_level: OptimizationLevel = OptimizationLevel.LEVEL_1,
+    temp_dir: Optional[str] = None
 ) -> str:
     """
     Apply optimizations to a compiled circuit.
@@ -31,6 +44,8 @@ def optimize_circuit(
     Args:
         circuit_path: Path to the compiled circuit
         optimization_level: Level of optimization to apply
+        temp_dir: Directory for the optimized circuit (defaults to the directory
+            of the input circuit, so it can be renamed over it atomically)
         
     Returns:
         Path to the optimized circuit (may be the same as input if no optimizations were applied)
@@ -42,127 +57,184 @@ def optimize_circuit(
     
     logger.info(f"Optimizing circuit with level {optimization_level.value}")
     
-    # Ensure circuit file exists
-    if not os.path.exists(circuit_path):
+    # Ensure circuit file exists; the stat also keys the optimization cache
+    circuit_path_str = str(circuit_path)
+    try:
+        stat = os.stat(circuit_path_str)
+    except FileNotFoundError:
         logger.error(f"Circuit file not found: {circuit_path}")
-        return str(circuit_path)
+        return circuit_path_str
+    
+    # Create the optimized circuit on the same filesystem as the input
+    if temp_dir is None:
+        temp_dir = os.path.dirname(os.path.abspath(circuit_path))
     
-    # Create a temporary file for the optimized circuit
-    with tempfile.NamedTemporaryFile(suffix=".out", delete=False) as temp_file:
+    with tempfile.NamedTemporaryFile(suffix=".out", dir=temp_dir, delete=False) as temp_file:
         optimized_path = temp_file.name
     
     try:
-        circuit_path_str = str(circuit_path)
+        # Reuse the result of a previous optimization of identical content
+        cache_key = (_circuit_digest(circuit_path_str, stat.st_mtime_ns, stat.st_size), int(optimization_level))
+        cached_path = _OPT_CACHE.get(cache_key)
+        if cached_path is None and _cache_dir_private():
+            cached_path = _cache_path(cache_key)
+        if cached_path is not None:
+            with suppress(FileNotFoundError):
+                shutil.copyfile(cached_path, optimized_path)
+                _OPT_CACHE[cache_key] = cached_path
+                logger.info(f"Using cached optimized circuit: {cached_path}")
+                return optimized_path
+        
+        # Run all stages up to the requested level in a single ZoKrates pass
+        success = _apply_optimizations(circuit_path_str, optimized_path, optimization_level)
         
-        # Apply different optimization strategies based on the level
-        if optimization_level == OptimizationLevel.LEVEL_1:
-            _apply_basic_optimizations(circuit_path_str, optimized_path)
-        elif optimization_level == OptimizationLevel.LEVEL_2:
-            _apply_intermediate_optimizations(circuit_path_str, optimized_path)
-        elif optimization_level == OptimizationLevel.LEVEL_3:
-            _apply_aggressive_optimizations(circuit_path_str, optimized_path)
+        # Only cache successful runs, so a failed optimization is retried
+        if success:
+            _store_optimized(cache_key, optimized_path)
+            
+            output_key = (hash_file(optimized_path), cache_key[1])
+            if output_key == cache_key:
+                # The circuit was already minimal at this level; keep the
+                # original so the caller has nothing to replace
+                logger.info("Circuit is already optimized")
+                os.unlink(optimized_path)
+                return circuit_path_str
+            
+            # Optimizing is idempotent, so re-optimizing the output at the
+            # same level is a cache hit as well
+            _store_optimized(output_key, optimized_path)
         
         logger.info(f"Circuit optimization completed: {optimized_path}")
         return optimized_path
     except Exception as e:
         logger.error(f"Error optimizing circuit: {e}")
         # If optimization fails, return the original circuit path
-        if os.path.exists(optimized_path):
+        with suppress(FileNotFoundError):
             os.unlink(optimized_path)
-        return str(circuit_path)
+        return circuit_path_str
 
 
-def _apply_basic_optimizations(input_path: str, output_path: str) -> bool:
+@lru_cache(maxsize=128)
+def _circuit_digest(circuit_path: str, mtime_ns: int, size: int) -> str:
     """
-    Apply basic optimizations (level 1) to a circuit.
+    Hash a circuit file, re-reading it only when its stat changes.
     
     Args:
-        input_path: Path to the input circuit
-        output_path: Path to save the optimized circuit
+        circuit_path: Path to the circuit
+        mtime_ns: Modification time of the circuit in nanoseconds
+        size: Size of the circuit in bytes
         
     Returns:
-        True if optimization was successful, False otherwise
+        Hex digest of the circuit contents
     """
+    return hash_file(circuit_path)
+
+
+def _cache_dir_private() -> bool:
+    """Check that only the current user can have written the on-disk cache"""
     try:
-        # For ZoKrates circuits, use ZoKrates optimizer
-        result = subprocess.run(
-            ["zokrates", "optimize", "--input", input_path, "--output", output_path],
-            check=True,
-            capture_output=True,
-            text=True
-        )
-        
-        logger.debug(f"Basic optimization output: {result.stdout}")
-        return True
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Basic optimization error: {e.stderr}")
-        # Copy the original file to the output path
-        with open(input_path, "rb") as src, open(output_path, "wb") as dst:
-            dst.write(src.read())
+        check_private_directory(OPT_CACHE_DIR)
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        logger.warning(f"Ignoring optimization cache: {e}")
         return False
+    return True
 
 
-def _apply_intermediate_optimizations(input_path: str, output_path: str) -> bool:
+def _cache_path(cache_key: Tuple[str, int]) -> str:
+    """Get the on-disk location of a cached optimized circuit"""
+    digest, level = cache_key
+    return os.path.join(OPT_CACHE_DIR, f"{digest}_L{level}.out")
+
+
+def _store_optimized(cache_key: Tuple[str, int], optimized_path: str) -> None:
     """
-    Apply intermediate optimizations (level 2) to a circuit.
+    Copy an optimized circuit into the optimization cache.
     
     Args:
-        input_path: Path to the input circuit
-        output_path: Path to save the optimized circuit
-        
-    Returns:
-        True if optimization was successful, False otherwise
+        cache_key: (input digest, optimization level) of the circuit
+        optimized_path: Path to the optimized circuit
     """
-    # First apply basic optimizations
-    if not _apply_basic_optimizations(input_path, output_path):
-        return False
-    
+    cached_path = _cache_path(cache_key)
+    temp_path = None
     try:
-        # For ZoKrates circuits, use additional optimizations
-        # This would typically involve more sophisticated optimization techniques
-        # For demonstration, we'll just use a placeholder with additional flags
-        result = subprocess.run(
-            ["zokrates", "optimize", "--input", output_path, "--output", output_path, "--stage", "2"],
-            check=True,
-            capture_output=True,
-            text=True
-        )
+        ensure_private_directory(OPT_CACHE_DIR)
+        with tempfile.NamedTemporaryFile(dir=OPT_CACHE_DIR, delete=False) as temp_file:
+            temp_path = temp_file.name
+        shutil.copyfile(optimized_path, temp_path)
+        os.replace(temp_path, cached_path)
+        _OPT_CACHE[cache_key] = cached_path
+    except OSError as e:
+        logger.warning(f"Failed to cache optimized circuit: {e}")
+        if temp_path is not None:
+            with suppress(FileNotFoundError):
+                os.unlink(temp_path)
+
+
+@lru_cache(maxsize=1)
+def _zokrates_bin() -> str:
+    """Resolve the ZoKrates binary once instead of searching $PATH per call"""
+    return shutil.which("zokrates") or "zokrates"
+
+
+def _run_zokrates(args: List[str]) -> subprocess.CompletedProcess:
+    """
+    Run a ZoKrates command, keeping its stdout only when debug logging is on.
+    
+    Args:
+        args: Command line to run
         
-        logger.debug(f"Intermediate optimization output: {result.stdout}")
-        return True
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Intermediate optimization error: {e.stderr}")
-        return False
+    Returns:
+        The completed process; stdout is None unless the logger is at DEBUG
+        
+    Raises:
+        subprocess.CalledProcessError: If the command exits with an error
+    """
+    stdout = subprocess.PIPE if logger.isEnabledFor(logging.DEBUG) else subprocess.DEVNULL
+    return subprocess.run(
+        args,
+        check=True,
+        stdout=stdout,
+        stderr=subprocess.PIPE,
+        text=True
+    )
 
 
-def _apply_aggressive_optimizations(input_path: str, output_path: str) -> bool:
+def _apply_optimizations(
+    input_path: str,
+    output_path: str,
+    optimization_level: OptimizationLevel
+) -> bool:
     """
-    Apply aggressive optimizations (level 3) to a circuit.
+    Apply optimizations to a circuit with a single ZoKrates invocation.
+    
+    Level 1 runs the basic optimizer, level 2 adds the intermediate stage and
+    level 3 the experimental aggressive stage. ZoKrates runs all stages up to
+    the requested one in the same pass.
     
     Args:
         input_path: Path to the input circuit
         output_path: Path to save the optimized circuit
+        optimization_level: Level of optimization to apply (1-3)
         
     Returns:
         True if optimization was successful, False otherwise
     """
-    # First apply intermediate optimizations
-    if not _apply_intermediate_optimizations(input_path, output_path):
-        return False
+    args = [_zokrates_bin(), "optimize", "--input", input_path, "--output", output_path]
+    if optimization_level >= OptimizationLevel.LEVEL_2:
+        args += ["--stage", str(int(optimization_level))]
+    if optimization_level == OptimizationLevel.LEVEL_3:
+        args.append("--experimental")
     
     try:
-        # For ZoKrates circuits, use the most aggressive optimizations
-        # This would involve techniques like circuit flattening, common subexpression elimination, etc.
-        # For demonstration, we'll just use a placeholder with additional flags
-        result = subprocess.run(
-            ["zokrates", "optimize", "--input", output_path, "--output", output_path, "--stage", "3", "--experimental"],
-            check=True,
-            capture_output=True,
-            text=True
-        )
+        result = _run_zokrates(args)
         
-        logger.debug(f"Aggressive optimization output: {result.stdout}")
+        if result.stdout is not None:
+            logger.debug(f"Level {int(optimization_level)} optimization output: {result.stdout}")
         return True
     except subprocess.CalledProcessError as e:
-        logger.error(f"Aggressive optimization error: {e.stderr}")
-        return False 
\ No newline at end of file
+        logger.error(f"Level {int(optimization_level)} optimization error: {e.stderr}")
+        # Copy the original file to the output path without buffering it
+        shutil.copyfile(input_path, output_path)
+        return False
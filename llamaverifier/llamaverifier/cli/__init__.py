@@ -2,4 +2,10 @@
 Command-line interface for LlamaVerifier
 """
 
-from .commands import app 
\ No newline at end of file
+
+def __getattr__(name: str):
+    # The Typer app is built lazily on first access
+    if name == "app":
+        from .commands import get_app
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
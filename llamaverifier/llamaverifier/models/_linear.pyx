@@ -0,0 +1,17 @@
+# cython: language_level=3
+"""
+Compiled forward pass for LinearModel
+"""
+cimport cython
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def forward_c(const double[::1] w, const double[::1] x, double b):
+    """Compute b + w . x over contiguous float64 arrays"""
+    cdef Py_ssize_t i, n = w.shape[0]
+    cdef double s = b
+    with nogil:
+        for i in range(n):
+            s += w[i] * x[i]
+    return s
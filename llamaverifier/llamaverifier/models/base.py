@@ -1,9 +1,50 @@
 """
 Base model classes for LlamaVerifier
 """
+import re
 from abc import ABC, abstractmethod
 from typing import Dict, List, Any, Optional
 
+import numpy as np
+
+from ..circuits._quant import quantize_int8
+
+# Storage types supported for the forward-pass weights of a LinearModel
+LINEAR_DTYPES = ('float64', 'float32', 'int8')
+
+# One `key = value` parameter per line; lines starting with '#' are comments.
+# Any other non-blank line is captured by the last group so it can be rejected.
+_PARAMETER_RE = re.compile(
+    r'^[ \t]*(?:#.*|([^#=\s][^=\n]*?)[ \t]*=[ \t]*(.*?)|(.+?))?[ \t]*$', re.MULTILINE
+)
+
+try:
+    from ._linear import forward_c
+    CYTHON_AVAILABLE = True
+except ImportError:
+    CYTHON_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# Prefer the ahead-of-time compiled kernel, which needs no JIT warm-up
+if CYTHON_AVAILABLE:
+    _linear_forward = forward_c
+elif NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _linear_forward(weights, x, bias):
+        s = bias
+        for i in range(weights.shape[0]):
+            s += weights[i] * x[i]
+        return s
+else:
+    def _linear_forward(weights, x, bias):
+        return float(weights @ x) + bias
+
 
 class BaseModel(ABC):
     """
@@ -19,6 +60,9 @@ class BaseModel(ABC):
         """
         self.model_path = model_path
         self.parameters = {}
+        # Circuit is encoded once; parameters do not change after loading
+        self._circuit_bytes: Optional[bytes] = None
+        self._circuit_text: Optional[str] = None
         self.load_model()
     
     @abstractmethod
@@ -50,6 +94,16 @@ class BaseModel(ABC):
             Circuit representation of the model
         """
         pass
+    
+    def write_circuit(self, path: str) -> None:
+        """
+        Write the circuit representation of the model to a file
+        
+        Args:
+            path: Path where the circuit will be saved
+        """
+        with open(path, 'wb') as f:
+            f.write(self.to_circuit().encode('utf-8'))
 
 
 class LinearModel(BaseModel):
@@ -57,18 +111,53 @@ class LinearModel(BaseModel):
     Simple linear model
     """
     
+    def __init__(self, model_path: str, dtype: str = 'float64'):
+        """
+        Initialize the model
+        
+        Args:
+            model_path: Path to the model file
+            dtype: Storage type of the weights used by forward (float64,
+                float32 or int8). The circuit always uses the exact weights.
+        """
+        if dtype not in LINEAR_DTYPES:
+            raise ValueError(f"Unsupported dtype: {dtype}. Expected one of {', '.join(LINEAR_DTYPES)}")
+        self.dtype = dtype
+        super().__init__(model_path)
+    
     def load_model(self) -> None:
         """
         Load the model from the model path
         """
         with open(self.model_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                
-                key, value = line.split('=', 1)
-                self.parameters[key.strip()] = float(value.strip())
+            data = f.read()
+        
+        # Parse every line in one scan; comments and blank lines capture nothing
+        for key, value, invalid in _PARAMETER_RE.findall(data):
+            if invalid:
+                raise ValueError(f"Invalid parameter line in {self.model_path}: {invalid!r}")
+            if key:
+                self.parameters[key] = float(value)
+        
+        # Store the weights that are present as parallel index/value arrays so
+        # sparse models only touch their non-zero terms
+        self._n_inputs = int(self.parameters.get('inputs', 0))
+        indices = sorted(
+            int(key[1:]) - 1
+            for key in self.parameters
+            if key[:1] == 'w' and key[1:].isdigit() and 0 < int(key[1:]) <= self._n_inputs
+        )
+        self._weight_indices = np.array(indices, dtype=np.int32)
+        self._weights = np.array([self.parameters[f'w{i+1}'] for i in indices], dtype=np.float64)
+        # Dense models use the inputs as they are, without a gather
+        self._dense = len(indices) == self._n_inputs
+        self._bias = self.parameters.get('b', 0.0)
+        
+        # Reduced-precision copies of the weights for the forward pass
+        if self.dtype == 'int8':
+            self._weights_q, self._weight_scale = quantize_int8(self._weights)
+        elif self.dtype == 'float32':
+            self._weights_f32 = self._weights.astype(np.float32)
     
     def forward(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -83,18 +172,24 @@ class LinearModel(BaseModel):
         if 'inputs' not in inputs:
             raise ValueError("Input must contain 'inputs' key")
         
-        input_values = inputs['inputs']
+        input_values = np.ascontiguousarray(inputs['inputs'], dtype=np.float64)
         
-        if len(input_values) != int(self.parameters.get('inputs', 0)):
-            raise ValueError(f"Expected {self.parameters.get('inputs')} inputs, got {len(input_values)}")
+        if input_values.shape != (self._n_inputs,):
+            raise ValueError(f"Expected {self._n_inputs} inputs, got {len(input_values)}")
         
-        # Simple linear model: y = w1*x1 + w2*x2 + ... + b
-        result = self.parameters.get('b', 0.0)
+        if not self._dense:
+            input_values = input_values[self._weight_indices]
         
-        for i, x in enumerate(input_values):
-            w_key = f'w{i+1}'
-            if w_key in self.parameters:
-                result += self.parameters[w_key] * x
+        # Simple linear model: y = w1*x1 + w2*x2 + ... + b
+        if self.dtype == 'int8':
+            # Integer dot product of the quantized terms, rescaled afterwards
+            inputs_q, input_scale = quantize_int8(input_values)
+            acc = np.dot(self._weights_q.astype(np.int32), inputs_q.astype(np.int32))
+            result = float(acc) / (self._weight_scale * input_scale) + self._bias
+        elif self.dtype == 'float32':
+            result = float(self._weights_f32 @ input_values.astype(np.float32)) + self._bias
+        else:
+            result = float(_linear_forward(self._weights, input_values, self._bias))
         
         return {'output': [result]}
     
@@ -105,34 +200,37 @@ class LinearModel(BaseModel):
         Returns:
             Circuit representation of the model
         """
-        # Simple ZoKrates circuit for a linear model
-        circuit = "def main("
-        
-        # Add input parameters
-        for i in range(int(self.parameters.get('inputs', 0))):
-            circuit += f"private field x{i+1}, "
-        
-        # Add output parameter
-        circuit += "public field y) -> bool {\n"
-        
-        # Add computation
-        circuit += "    field result = "
-        
-        # Add bias term if present
-        if 'b' in self.parameters:
-            circuit += f"{self.parameters['b']}"
-        else:
-            circuit += "0"
+        if self._circuit_text is None:
+            self._circuit_text = self._render_circuit().decode('ascii')
+        return self._circuit_text
+    
+    def write_circuit(self, path: str) -> None:
+        """
+        Write the circuit representation of the model to a file
         
-        # Add weighted inputs
-        for i in range(int(self.parameters.get('inputs', 0))):
-            w_key = f'w{i+1}'
-            if w_key in self.parameters:
-                circuit += f" + {self.parameters[w_key]} * x{i+1}"
+        The circuit is written from its encoded form, without building the
+        text representation.
         
-        # Add return statement
-        circuit += ";\n"
-        circuit += "    return result == y;\n"
-        circuit += "}"
+        Args:
+            path: Path where the circuit will be saved
+        """
+        with open(path, 'wb') as f:
+            f.write(self._render_circuit())
+    
+    def _render_circuit(self) -> bytes:
+        """Encode the ZoKrates circuit once, appending each piece as it is formatted"""
+        if self._circuit_bytes is not None:
+            return self._circuit_bytes
         
-        return circuit 
\ No newline at end of file
+        # Simple ZoKrates circuit for a linear model
+        buf = bytearray(b"def main(")
+        for i in range(self._n_inputs):
+            buf += f"private field x{i+1}, ".encode('ascii')
+        buf += b"public field y) -> bool {\n    field result = "
+        buf += f"{self._bias}".encode('ascii') if 'b' in self.parameters else b"0"
+        for i, weight in zip(self._weight_indices.tolist(), self._weights.tolist()):
+            buf += f" + {weight} * x{i+1}".encode('ascii')
+        buf += b";\n    return result == y;\n}"
+        
+        self._circuit_bytes = bytes(buf)
+        return self._circuit_bytes
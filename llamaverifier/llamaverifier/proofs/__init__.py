@@ -2,5 +2,14 @@
 Proof generation and verification modules for LlamaVerifier
 """
 
-from .generator import ProofSystem
-from .schemes import SchemeType 
\ No newline at end of file
+from .schemes import SchemeType
+
+__all__ = ["ProofSystem", "SchemeType"]
+
+
+def __getattr__(name: str):
+    # ProofSystem is served from generator, which is only imported once used
+    if name == "ProofSystem":
+        from .generator import ProofSystem
+        return ProofSystem
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
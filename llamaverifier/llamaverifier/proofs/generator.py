@@ -1,17 +1,117 @@
 """
 Proof System for generating and verifying zero-knowledge proofs
 """
+import json
 import os
+import stat
 import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
-from ..utils.file_utils import check_file_exists, ensure_directory
+from ..utils.file_utils import (check_private_directory, ensure_directory, ensure_private_directory,
+                                hash_file, link_or_copy, prefetch_file)
 from ..utils.logger import get_logger
-from .schemes import SchemeType, get_scheme
+from .schemes import BaseScheme, ProofJob, SchemeType, get_scheme
 
 logger = get_logger(__name__)
 
+# Number of successful verifications remembered per proof system
+VERIFY_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=256)
+def _circuit_name(circuit_path: str) -> str:
+    """Name workspace artifacts after the circuit file, without any extensions"""
+    return os.path.basename(circuit_path).partition(".")[0]
+
+
+def _require_files(*files: Tuple[str, str]) -> None:
+    """
+    Check that every path is an existing regular file, with one stat per path.
+    
+    Args:
+        files: (path, description) pairs, checked in order
+        
+    Raises:
+        FileNotFoundError: For the first path that is not a regular file
+    """
+    for path, description in files:
+        try:
+            is_file = stat.S_ISREG(os.stat(path).st_mode)
+        except (OSError, TypeError, ValueError):
+            is_file = False
+        
+        if not is_file:
+            raise FileNotFoundError(f"{description} not found: {path}")
+
+
+def _abi_field_count(abi_type: Dict) -> int:
+    """Count the field elements a value of an ABI type flattens to"""
+    kind = abi_type.get("type")
+    components = abi_type.get("components")
+    if kind == "array":
+        return components["size"] * _abi_field_count(components)
+    if kind == "struct":
+        return sum(_abi_field_count(member) for member in components["members"])
+    return 1
+
+
+@lru_cache(maxsize=128)
+def _witness_arity(abi_path: str, mtime_ns: int) -> Optional[int]:
+    """
+    Get the number of witness values a compiled circuit expects.
+    
+    The modification time is part of the cache key, so a recompiled circuit
+    is read again.
+    
+    Args:
+        abi_path: Path to the ABI written next to the compiled circuit
+        mtime_ns: Modification time of the ABI file
+        
+    Returns:
+        Number of flattened input values, or None if the ABI cannot be read
+    """
+    try:
+        with open(abi_path, "r") as f:
+            abi = json.load(f)
+        return sum(_abi_field_count(value) for value in abi["inputs"])
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.debug("Could not read circuit ABI %s: %s", abi_path, e)
+        return None
+
+
+def _check_witness_arity(circuit_path: str, witnesses: Sequence[List[str]]) -> None:
+    """
+    Reject witnesses whose length does not match the circuit's ABI.
+    
+    Circuits compiled without an ABI next to them are not checked.
+    
+    Args:
+        circuit_path: Path to the compiled circuit
+        witnesses: Witness values for each proof
+        
+    Raises:
+        ValueError: If a witness has the wrong number of values
+    """
+    abi_path = f"{circuit_path}.abi.json"
+    try:
+        mtime_ns = os.stat(abi_path).st_mtime_ns
+    except OSError:
+        return
+    
+    arity = _witness_arity(abi_path, mtime_ns)
+    if arity is None:
+        return
+    
+    for witness_values in witnesses:
+        if len(witness_values) != arity:
+            raise ValueError(f"Expected {arity} witness values, got {len(witness_values)}")
+
 
 class ProofSystem:
     """
@@ -34,26 +134,83 @@ class ProofSystem:
         self.workspace_dir = workspace_dir
         if workspace_dir:
             ensure_directory(workspace_dir)
+        
+        # Scheme implementations are stateless, so one per scheme is reused
+        self._scheme_cache: Dict[str, BaseScheme] = {}
+        
+        # Content digests of (scheme, key, proof, inputs) already verified as
+        # valid, least recently used first; invalid results are never cached
+        self._verified: "OrderedDict[Tuple[str, str, str, str], None]" = OrderedDict()
+        self._verified_lock = threading.Lock()
+        
+        # Shared by all batch verifications, created on first use
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_workers = os.cpu_count() or 1
+    
+    def close(self) -> None:
+        """Stop the batch verification workers, waiting for running verifications to finish"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
     
-    def setup(self, circuit_path: str, scheme: str = "g16") -> Tuple[str, str]:
+    def __enter__(self) -> "ProofSystem":
+        """Use the proof system for a block, closing it on exit"""
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        """Stop the batch verification workers"""
+        self.close()
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Return the shared batch verification executor, starting it on first use"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._executor_workers,
+                thread_name_prefix="verify-worker"
+            )
+        return self._executor
+    
+    def _get_scheme(self, scheme: Union[str, SchemeType]) -> BaseScheme:
+        """Return the cached implementation for a scheme, creating it on first use"""
+        scheme_impl = self._scheme_cache.get(scheme)
+        if scheme_impl is None:
+            scheme_impl = self._scheme_cache[scheme] = get_scheme(scheme)
+        return scheme_impl
+    
+    def setup(
+        self,
+        circuit_path: str,
+        scheme: str = "g16",
+        force: bool = False,
+        cache_dir: Optional[str] = None
+    ) -> Tuple[str, str]:
         """
         Perform trusted setup for a circuit.
         
+        Setup is randomized, so every run produces different keys. To avoid
+        repeating it, the keys are cached by circuit content in the workspace
+        or cache_dir and reused when the same circuit is set up again. Whoever can write to the cache can
+        supply keys they hold the toxic waste for, so cached keys are only
+        trusted from a directory that is owned by the current user and not
+        writable by others.
+        
         Args:
             circuit_path: Path to the compiled circuit
             scheme: ZKP scheme to use (g16, gm17, etc.)
+            force: Run the setup even if cached keys exist
+            cache_dir: Directory of the key cache (defaults to the workspace's
+                cache directory; without a workspace, keys are not cached)
             
         Returns:
             Tuple of (proving_key_path, verification_key_path)
         """
-        logger.info(f"Performing trusted setup for circuit: {circuit_path} using scheme: {scheme}")
+        logger.info("Performing trusted setup for circuit: %s using scheme: %s", circuit_path, scheme)
         
-        if not check_file_exists(circuit_path):
-            raise FileNotFoundError(f"Circuit file not found: {circuit_path}")
+        _require_files((circuit_path, "Circuit file"))
         
         # Determine paths for the keys
         if self.workspace_dir:
-            circuit_name = os.path.basename(circuit_path).split(".")[0]
+            circuit_name = _circuit_name(circuit_path)
             proving_key_path = os.path.join(self.workspace_dir, f"{circuit_name}.{scheme}.pk")
             verification_key_path = os.path.join(self.workspace_dir, f"{circuit_name}.{scheme}.vk")
         else:
@@ -63,30 +220,80 @@ class ProofSystem:
             with tempfile.NamedTemporaryFile(suffix=f".{scheme}.vk", delete=False) as vk_file:
                 verification_key_path = vk_file.name
         
+        # Keys are only cached where the caller asked for it
+        if cache_dir is None and self.workspace_dir:
+            cache_dir = os.path.join(self.workspace_dir, "cache")
+        cached_keys = None
+        if cache_dir is not None:
+            cached_keys = self._setup_cache_paths(cache_dir, hash_file(circuit_path), scheme)
+        
+        if cached_keys and not force and all(map(os.path.exists, cached_keys)):
+            cached_pk_path, cached_vk_path = cached_keys
+            try:
+                check_private_directory(cache_dir)
+                link_or_copy(cached_pk_path, proving_key_path)
+                link_or_copy(cached_vk_path, verification_key_path)
+                logger.info("Using cached trusted setup. Proving key: %s, Verification key: %s", proving_key_path, verification_key_path)
+                return proving_key_path, verification_key_path
+            except OSError as e:
+                # Includes a cache directory that fails the ownership check
+                logger.warning("Failed to reuse cached trusted setup: %s", e)
+        
         # Get the appropriate scheme implementation
-        scheme_impl = get_scheme(scheme)
+        scheme_impl = self._get_scheme(scheme)
         
-        # Perform setup
+        # Perform setup, staging the keys so readers never see partial files
+        staged_pk_path = self._staging_path(proving_key_path)
+        staged_vk_path = self._staging_path(verification_key_path)
         try:
-            pk_path, vk_path = scheme_impl.setup(circuit_path)
+            pk_path, vk_path = scheme_impl.setup(
+                circuit_path, pk_out=staged_pk_path, vk_out=staged_vk_path
+            )
             
-            # If we're using our own paths, move the keys
-            if pk_path != proving_key_path:
-                os.rename(pk_path, proving_key_path)
-            if vk_path != verification_key_path:
-                os.rename(vk_path, verification_key_path)
+            # Schemes that pick their own paths still get their keys moved
+            self._publish([(pk_path, proving_key_path), (vk_path, verification_key_path)])
             
-            logger.info(f"Trusted setup completed. Proving key: {proving_key_path}, Verification key: {verification_key_path}")
+            if cached_keys:
+                self._store_setup(proving_key_path, verification_key_path, *cached_keys)
+            logger.info("Trusted setup completed. Proving key: %s, Verification key: %s", proving_key_path, verification_key_path)
             return proving_key_path, verification_key_path
             
         except Exception as e:
-            logger.error(f"Error during trusted setup: {e}")
+            logger.error("Error during trusted setup: %s", e)
             # Clean up temporary files on error
-            for path in [proving_key_path, verification_key_path]:
-                if os.path.exists(path) and path.startswith(tempfile.gettempdir()):
-                    os.unlink(path)
+            self._remove_staged([staged_pk_path, staged_vk_path], [proving_key_path, verification_key_path])
+            self._remove_temp_files([proving_key_path, verification_key_path])
             raise
     
+    @staticmethod
+    def _setup_cache_paths(cache_dir: str, circuit_digest: str, scheme: str) -> Tuple[str, str]:
+        """
+        Get the cache locations of the keys for a circuit digest and scheme.
+        
+        Args:
+            cache_dir: Directory of the key cache
+            circuit_digest: Content digest of the circuit
+            scheme: ZKP scheme the keys belong to
+            
+        Returns:
+            Tuple of (cached_proving_key_path, cached_verification_key_path)
+        """
+        base = os.path.join(cache_dir, f"{circuit_digest}.{scheme}")
+        return f"{base}.pk", f"{base}.vk"
+    
+    @staticmethod
+    def _store_setup(proving_key_path: str, verification_key_path: str,
+                     cached_pk_path: str, cached_vk_path: str) -> None:
+        """Save freshly generated keys in the setup cache"""
+        try:
+            ensure_private_directory(os.path.dirname(cached_pk_path))
+            # The verification key is checked for last, so the pair only
+            # counts as cached once both are in place
+            link_or_copy(proving_key_path, cached_pk_path)
+            link_or_copy(verification_key_path, cached_vk_path)
+        except OSError as e:
+            logger.warning("Failed to cache trusted setup: %s", e)
+    
     def generate_proof(
         self,
         circuit_path: str,
@@ -106,52 +313,201 @@ class ProofSystem:
         Returns:
             Tuple of (proof_path, public_inputs_path)
         """
-        logger.info(f"Generating proof for circuit: {circuit_path} using scheme: {scheme}")
+        logger.info("Generating proof for circuit: %s using scheme: %s", circuit_path, scheme)
         
-        if not check_file_exists(circuit_path):
-            raise FileNotFoundError(f"Circuit file not found: {circuit_path}")
+        _require_files(
+            (circuit_path, "Circuit file"),
+            (proving_key_path, "Proving key"),
+        )
         
-        if not check_file_exists(proving_key_path):
-            raise FileNotFoundError(f"Proving key not found: {proving_key_path}")
+        _check_witness_arity(circuit_path, [witness_values])
+        
+        proof_path, public_inputs_path = self._proof_paths(circuit_path, scheme)
+        
+        return self._generate_proof_into(
+            self._get_scheme(scheme), circuit_path, proving_key_path,
+            witness_values, proof_path, public_inputs_path
+        )
+    
+    def generate_proofs_batch(
+        self,
+        circuit_path: str,
+        proving_key_path: str,
+        witnesses: Sequence[List[str]],
+        scheme: str = "g16",
+        max_workers: Optional[int] = None
+    ) -> List[Tuple[str, str]]:
+        """
+        Generate one zero-knowledge proof per witness against the same circuit.
+        
+        Inputs are validated and the scheme is resolved once for the whole
+        batch, which is then handed to the scheme's generate_proofs_batch as
+        a pipeline of jobs. The batch stops at the first failed proof.
+        
+        Args:
+            circuit_path: Path to the compiled circuit
+            proving_key_path: Path to the proving key
+            witnesses: Witness values for each proof
+            scheme: ZKP scheme to use (g16, gm17, etc.)
+            max_workers: Workers per stage of the scheme's pipeline (optional)
+            
+        Returns:
+            List of (proof_path, public_inputs_path) tuples, in witness order
+        """
+        logger.info("Generating %s proofs for circuit: %s using scheme: %s", len(witnesses), circuit_path, scheme)
+        
+        _require_files(
+            (circuit_path, "Circuit file"),
+            (proving_key_path, "Proving key"),
+        )
+        
+        if not witnesses:
+            return []
+        
+        _check_witness_arity(circuit_path, witnesses)
+        
+        # Every proof in the batch reads the same proving key; have the kernel
+        # load it once so the ZoKrates processes share the cached pages
+        prefetch_file(proving_key_path)
+        
+        scheme_impl = self._get_scheme(scheme)
+        output_paths = [
+            self._proof_paths(circuit_path, scheme, index=i) for i in range(len(witnesses))
+        ]
+        
+        staged_paths = [
+            (self._staging_path(proof_path), self._staging_path(public_inputs_path))
+            for proof_path, public_inputs_path in output_paths
+        ]
+        jobs = [
+            ProofJob(circuit_path, proving_key_path, witness_values, staged_proof_path, staged_public_path)
+            for witness_values, (staged_proof_path, staged_public_path) in zip(witnesses, staged_paths)
+        ]
+        try:
+            results = scheme_impl.generate_proofs_batch(jobs, max_workers=max_workers)
+        except Exception as e:
+            logger.error("Error during batch proof generation: %s", e)
+            final_paths = [path for paths in output_paths for path in paths]
+            self._remove_staged([path for paths in staged_paths for path in paths], final_paths)
+            self._remove_temp_files(final_paths)
+            raise
+        
+        for (p_path, pi_path), (proof_path, public_inputs_path) in zip(results, output_paths):
+            self._publish([(p_path, proof_path), (pi_path, public_inputs_path)])
+        
+        logger.info("Batch proof generation completed: %s proofs", len(output_paths))
+        return output_paths
+    
+    def _proof_paths(self, circuit_path: str, scheme: str, index: Optional[int] = None) -> Tuple[str, str]:
+        """
+        Determine where a proof and its public inputs are stored.
+        
+        Args:
+            circuit_path: Path to the compiled circuit
+            scheme: ZKP scheme the proof is generated with
+            index: Position of the proof within a batch (optional)
+            
+        Returns:
+            Tuple of (proof_path, public_inputs_path)
+        """
+        tag = scheme if index is None else f"{index}.{scheme}"
         
-        # Determine paths for the proof and public inputs
         if self.workspace_dir:
-            circuit_name = os.path.basename(circuit_path).split(".")[0]
-            proof_path = os.path.join(self.workspace_dir, f"{circuit_name}.{scheme}.proof")
-            public_inputs_path = os.path.join(self.workspace_dir, f"{circuit_name}.{scheme}.public")
+            circuit_name = _circuit_name(circuit_path)
+            proof_path = os.path.join(self.workspace_dir, f"{circuit_name}.{tag}.proof")
+            public_inputs_path = os.path.join(self.workspace_dir, f"{circuit_name}.{tag}.public")
         else:
             # Create temporary files for the proof and public inputs
-            with tempfile.NamedTemporaryFile(suffix=f".{scheme}.proof", delete=False) as proof_file:
+            with tempfile.NamedTemporaryFile(suffix=f".{tag}.proof", delete=False) as proof_file:
                 proof_path = proof_file.name
-            with tempfile.NamedTemporaryFile(suffix=f".{scheme}.public", delete=False) as public_file:
+            with tempfile.NamedTemporaryFile(suffix=f".{tag}.public", delete=False) as public_file:
                 public_inputs_path = public_file.name
         
-        # Get the appropriate scheme implementation
-        scheme_impl = get_scheme(scheme)
+        return proof_path, public_inputs_path
+    
+    def _generate_proof_into(
+        self,
+        scheme_impl: BaseScheme,
+        circuit_path: str,
+        proving_key_path: str,
+        witness_values: List[str],
+        proof_path: str,
+        public_inputs_path: str
+    ) -> Tuple[str, str]:
+        """
+        Generate a proof and move it and its public inputs to the given paths.
         
-        # Generate proof
+        Args:
+            scheme_impl: Scheme implementation to prove with
+            circuit_path: Path to the compiled circuit
+            proving_key_path: Path to the proving key
+            witness_values: Values for the witness variables
+            proof_path: Where the proof is stored
+            public_inputs_path: Where the public inputs are stored
+            
+        Returns:
+            Tuple of (proof_path, public_inputs_path)
+        """
+        staged_proof_path = self._staging_path(proof_path)
+        staged_public_path = self._staging_path(public_inputs_path)
         try:
             p_path, pi_path = scheme_impl.generate_proof(
-                circuit_path, proving_key_path, witness_values
+                circuit_path, proving_key_path, witness_values,
+                proof_out=staged_proof_path, public_out=staged_public_path
             )
             
-            # If we're using our own paths, move the files
-            if p_path != proof_path:
-                os.rename(p_path, proof_path)
-            if pi_path != public_inputs_path:
-                os.rename(pi_path, public_inputs_path)
+            # Schemes that pick their own paths still get their files moved
+            self._publish([(p_path, proof_path), (pi_path, public_inputs_path)])
             
-            logger.info(f"Proof generation completed. Proof: {proof_path}, Public inputs: {public_inputs_path}")
+            logger.info("Proof generation completed. Proof: %s, Public inputs: %s", proof_path, public_inputs_path)
             return proof_path, public_inputs_path
             
         except Exception as e:
-            logger.error(f"Error during proof generation: {e}")
+            logger.error("Error during proof generation: %s", e)
             # Clean up temporary files on error
-            for path in [proof_path, public_inputs_path]:
-                if os.path.exists(path) and path.startswith(tempfile.gettempdir()):
-                    os.unlink(path)
+            self._remove_staged([staged_proof_path, staged_public_path], [proof_path, public_inputs_path])
+            self._remove_temp_files([proof_path, public_inputs_path])
             raise
     
+    def _staging_path(self, path: str) -> str:
+        """
+        Get the path a workspace artifact is written to before it is published.
+        
+        Temporary output files are already private to this call, so only
+        workspace paths, which concurrent readers may open, are staged.
+        
+        Args:
+            path: Final artifact path
+            
+        Returns:
+            Path to write the artifact to
+        """
+        if not self.workspace_dir:
+            return path
+        return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    
+    @staticmethod
+    def _publish(moves: List[Tuple[str, str]]) -> None:
+        """Atomically move each written artifact to its final path"""
+        for written_path, final_path in moves:
+            if written_path != final_path:
+                os.replace(written_path, final_path)
+    
+    @staticmethod
+    def _remove_staged(staged_paths: List[str], final_paths: List[str]) -> None:
+        """Delete staging files left behind by a failed write"""
+        for staged_path, final_path in zip(staged_paths, final_paths):
+            if staged_path != final_path:
+                with suppress(FileNotFoundError):
+                    os.unlink(staged_path)
+    
+    @staticmethod
+    def _remove_temp_files(paths: List[str]) -> None:
+        """Delete any of the given paths that are temporary files"""
+        for path in paths:
+            if os.path.exists(path) and path.startswith(tempfile.gettempdir()):
+                os.unlink(path)
+    
     def verify_proof(
         self,
         verification_key_path: str,
@@ -171,21 +527,179 @@ class ProofSystem:
         Returns:
             True if the proof is valid, False otherwise
         """
-        logger.info(f"Verifying proof: {proof_path} using scheme: {scheme}")
+        logger.info("Verifying proof: %s using scheme: %s", proof_path, scheme)
         
-        if not check_file_exists(verification_key_path):
-            raise FileNotFoundError(f"Verification key not found: {verification_key_path}")
+        _require_files(
+            (verification_key_path, "Verification key"),
+            (proof_path, "Proof"),
+            (public_inputs_path, "Public inputs"),
+        )
         
-        if not check_file_exists(proof_path):
-            raise FileNotFoundError(f"Proof not found: {proof_path}")
+        return self._verify_cached(
+            scheme, self._get_scheme(scheme), None,
+            verification_key_path, proof_path, public_inputs_path
+        )
+    
+    def verify_proofs_batch(
+        self,
+        verification_key_path: Optional[str],
+        proofs: Sequence[Tuple[str, ...]],
+        scheme: str = "g16"
+    ) -> List[bool]:
+        """
+        Verify several zero-knowledge proofs in one call.
         
-        if not check_file_exists(public_inputs_path):
-            raise FileNotFoundError(f"Public inputs not found: {public_inputs_path}")
+        Each proof is either a (proof_path, public_inputs_path) pair checked
+        against verification_key_path, or a (verification_key_path,
+        proof_path, public_inputs_path) triple with its own key. Every
+        distinct verification key is checked, hashed and read into the page
+        cache once for the whole batch. Proofs already found valid are
+        answered from the verification cache; the rest are verified
+        concurrently on the shared executor, with an error in one
+        proof only marking that proof invalid.
         
-        # Get the appropriate scheme implementation
-        scheme_impl = get_scheme(scheme)
+        Args:
+            verification_key_path: Verification key for the pairs (optional
+                when every proof is a triple)
+            proofs: (proof_path, public_inputs_path) pairs or
+                (verification_key_path, proof_path, public_inputs_path) triples
+            scheme: ZKP scheme to use (g16, gm17, etc.)
+            
+        Returns:
+            Whether each proof is valid, in input order
+        """
+        logger.info("Verifying %s proofs using scheme: %s", len(proofs), scheme)
+        
+        triples = [
+            tuple(proof) if len(proof) == 3 else (verification_key_path, *proof)
+            for proof in proofs
+        ]
         
-        # Verify the proof
+        # Proofs usually share a few verification keys; handle each only once
+        vk_paths = list(dict.fromkeys(vk_path for vk_path, _, _ in triples))
+        _require_files(
+            *[(vk_path, "Verification key") for vk_path in vk_paths],
+            *[
+                required
+                for _, proof_path, public_inputs_path in triples
+                for required in ((proof_path, "Proof"), (public_inputs_path, "Public inputs"))
+            ],
+        )
+        
+        if not triples:
+            return []
+        
+        vk_digests: Dict[str, Optional[str]] = {}
+        for vk_path in vk_paths:
+            prefetch_file(vk_path)
+            vk_digests[vk_path] = None
+            with suppress(OSError):
+                vk_digests[vk_path] = hash_file(vk_path)
+        
+        scheme_impl = self._get_scheme(scheme)
+        executor = self._get_executor()
+        futures = [
+            executor.submit(
+                self._verify_cached, scheme, scheme_impl, vk_digests[vk_path],
+                vk_path, proof_path, public_inputs_path
+            )
+            for vk_path, proof_path, public_inputs_path in triples
+        ]
+        return [future.result() for future in futures]
+    
+    def _verify_cached(
+        self,
+        scheme: str,
+        scheme_impl: BaseScheme,
+        vk_digest: Optional[str],
+        verification_key_path: str,
+        proof_path: str,
+        public_inputs_path: str
+    ) -> bool:
+        """
+        Verify a proof, skipping the scheme for proofs already found valid.
+        
+        Args:
+            scheme: ZKP scheme the proof is verified with
+            scheme_impl: Scheme implementation to verify with
+            vk_digest: Content digest of the verification key, computed here
+                if None
+            verification_key_path: Path to the verification key
+            proof_path: Path to the proof
+            public_inputs_path: Path to the public inputs
+            
+        Returns:
+            True if the proof is valid, False otherwise
+        """
+        key = self._verified_key(
+            scheme, vk_digest, verification_key_path, proof_path, public_inputs_path
+        )
+        if key is None:
+            # Unreadable inputs are left to the scheme to report as invalid
+            return self._verify_with(scheme_impl, verification_key_path, proof_path, public_inputs_path)
+        
+        if self._is_verified(key):
+            logger.info("Proof already verified: %s", proof_path)
+            return True
+        
+        result = self._verify_with(scheme_impl, verification_key_path, proof_path, public_inputs_path)
+        if result:
+            self._remember_verified(key)
+        return result
+    
+    @staticmethod
+    def _verified_key(
+        scheme: str,
+        vk_digest: Optional[str],
+        verification_key_path: str,
+        proof_path: str,
+        public_inputs_path: str
+    ) -> Optional[Tuple[str, str, str, str]]:
+        """Return the verification cache key for a proof, or None if unreadable"""
+        try:
+            return (
+                scheme,
+                vk_digest or hash_file(verification_key_path),
+                hash_file(proof_path),
+                hash_file(public_inputs_path),
+            )
+        except OSError:
+            return None
+    
+    def _is_verified(self, key: Tuple[str, str, str, str]) -> bool:
+        """Check the verification cache, refreshing the entry on a hit"""
+        with self._verified_lock:
+            if key in self._verified:
+                self._verified.move_to_end(key)
+                return True
+        return False
+    
+    def _remember_verified(self, key: Tuple[str, str, str, str]) -> None:
+        """Record a valid proof, evicting the least recently used entry"""
+        with self._verified_lock:
+            self._verified[key] = None
+            if len(self._verified) > VERIFY_CACHE_SIZE:
+                self._verified.popitem(last=False)
+    
+    @staticmethod
+    def _verify_with(
+        scheme_impl: BaseScheme,
+        verification_key_path: str,
+        proof_path: str,
+        public_inputs_path: str
+    ) -> bool:
+        """
+        Verify a proof with a scheme implementation, treating errors as invalid.
+        
+        Args:
+            scheme_impl: Scheme implementation to verify with
+            verification_key_path: Path to the verification key
+            proof_path: Path to the proof
+            public_inputs_path: Path to the public inputs
+            
+        Returns:
+            True if the proof is valid, False otherwise
+        """
         try:
             result = scheme_impl.verify_proof(
                 verification_key_path, proof_path, public_inputs_path
@@ -199,7 +713,7 @@ class ProofSystem:
             return result
             
         except Exception as e:
-            logger.error(f"Error during proof verification: {e}")
+            logger.error("Error during proof verification: %s", e)
             return False
     
     def export_verifier(
@@ -219,16 +733,15 @@ class ProofSystem:
         Returns:
             Path to the Solidity verifier contract
         """
-        logger.info(f"Exporting verifier contract for key: {verification_key_path} using scheme: {scheme}")
+        logger.info("Exporting verifier contract for key: %s using scheme: %s", verification_key_path, scheme)
         
-        if not check_file_exists(verification_key_path):
-            raise FileNotFoundError(f"Verification key not found: {verification_key_path}")
+        _require_files((verification_key_path, "Verification key"))
         
         # Create output directory if it doesn't exist
-        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        ensure_directory(os.path.dirname(os.path.abspath(output_path)))
         
         # Get the appropriate scheme implementation
-        scheme_impl = get_scheme(scheme)
+        scheme_impl = self._get_scheme(scheme)
         
         # Export the verifier
         try:
@@ -236,9 +749,9 @@ class ProofSystem:
                 verification_key_path, output_path
             )
             
-            logger.info(f"Verifier contract exported to: {result_path}")
+            logger.info("Verifier contract exported to: %s", result_path)
             return result_path
             
         except Exception as e:
-            logger.error(f"Error during verifier export: {e}")
+            logger.error("Error during verifier export: %s", e)
             raise 
\ No newline at end of file
@@ -1,13 +1,32 @@
 """
 ZKP scheme implementations for LlamaVerifier
 """
+import asyncio
+import itertools
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import suppress
+from functools import lru_cache, partial
+from pathlib import Path
 from enum import Enum
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
 
+from ..utils.file_utils import ensure_directory
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Buffer size for streaming witness values to ZoKrates
+STDIN_BUFFER_SIZE = 1 << 16
+
+# Memory-backed directory for scheme scratch files, where available
+_SCRATCH_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK | os.X_OK) else None
+
 
 class SchemeType(str, Enum):
     """Enum for zero-knowledge proof schemes"""
@@ -22,28 +41,64 @@ class SchemeType(str, Enum):
         return cls.GROTH16
     
     @classmethod
+    @lru_cache(maxsize=16)
     def from_string(cls, scheme_str: str) -> "SchemeType":
         """Convert a string to a SchemeType"""
         try:
             return cls(scheme_str.lower())
         except ValueError:
-            logger.warning(f"Unknown scheme type: {scheme_str}. Using default.")
+            logger.warning("Unknown scheme type: %s. Using default.", scheme_str)
             return cls.get_default()
 
 
+class ProofJob(NamedTuple):
+    """A single proof to generate as part of a batch"""
+    circuit_path: str
+    proving_key_path: str
+    witness_values: List[str]
+    proof_out: Optional[str] = None
+    public_out: Optional[str] = None
+
+
 class BaseScheme:
-    """Base class for ZKP schemes"""
+    """
+    Base class for ZKP schemes.
+    
+    Intermediate files are written to a scratch directory owned by the
+    scheme instance, which is removed by close() or when the instance is
+    garbage collected. Outputs the caller did not give a path for are
+    temporary files outside it, so they outlive the instance. Instances
+    handed out by get_scheme are shared, and close() leaves their scratch
+    directory in place for the other holders.
+    """
+    
+    # Set on the instances shared through get_scheme
+    _shared = False
     
     def __init__(self):
         """Initialize the scheme"""
-        pass
+        self._workdir = tempfile.mkdtemp(prefix="llamaverif_", dir=_SCRATCH_ROOT)
+        self._slot_counter = itertools.count()
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self._workdir, True)
     
-    def setup(self, circuit_path: str) -> Tuple[str, str]:
+    def _slot(self, suffix: str) -> str:
+        """Get a fresh file path in the scheme workspace"""
+        return os.path.join(self._workdir, f"{next(self._slot_counter)}{suffix}")
+    
+    def close(self) -> None:
+        """Remove the scratch directory and any files left in it, unless the instance is shared"""
+        if not self._shared:
+            self._finalizer()
+    
+    def setup(self, circuit_path: str, pk_out: Optional[str] = None,
+              vk_out: Optional[str] = None) -> Tuple[str, str]:
         """
         Perform trusted setup for a circuit.
         
         Args:
             circuit_path: Path to the compiled circuit
+            pk_out: Where to write the proving key (temporary file if omitted)
+            vk_out: Where to write the verification key (temporary file if omitted)
             
         Returns:
             Tuple of (proving_key_path, verification_key_path)
@@ -51,7 +106,8 @@ class BaseScheme:
         raise NotImplementedError("Subclasses must implement setup")
     
     def generate_proof(self, circuit_path: str, proving_key_path: str, 
-                     witness_values: List[str]) -> Tuple[str, str]:
+                     witness_values: List[str], proof_out: Optional[str] = None,
+                     public_out: Optional[str] = None) -> Tuple[str, str]:
         """
         Generate a proof for a circuit with the given witness values.
         
@@ -59,12 +115,103 @@ class BaseScheme:
             circuit_path: Path to the compiled circuit
             proving_key_path: Path to the proving key
             witness_values: Witness values
+            proof_out: Where to write the proof (temporary file if omitted)
+            public_out: Where to write the public inputs (temporary file if omitted)
             
         Returns:
             Tuple of (proof_path, public_inputs_path)
         """
         raise NotImplementedError("Subclasses must implement generate_proof")
     
+    def generate_proofs_batch(self, jobs: Sequence[ProofJob],
+                              max_workers: Optional[int] = None) -> List[Tuple[str, str]]:
+        """
+        Generate proofs for independent jobs as a two-stage pipeline.
+        
+        Witnesses are computed on one pool and proofs generated on another,
+        so the witness stage of later jobs overlaps the proof stage of earlier
+        ones. Both stages are ZoKrates subprocesses, so threads are enough to
+        keep them running in parallel. The batch stops at the first failure.
+        
+        Args:
+            jobs: Proofs to generate; plain (circuit, proving key, witness)
+                tuples are accepted
+            max_workers: Workers per stage (defaults to half the CPU count)
+            
+        Returns:
+            List of (proof_path, public_inputs_path) tuples, in job order
+        """
+        jobs = [ProofJob(*job) for job in jobs]
+        if not jobs:
+            return []
+        
+        workers = max_workers or max(1, (os.cpu_count() or 2) // 2)
+        results: List[Optional[Tuple[str, str]]] = [None] * len(jobs)
+        witness_futures = {}
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="witness-worker") as witness_pool, \
+                 ThreadPoolExecutor(max_workers=workers, thread_name_prefix="proof-worker") as proof_pool:
+                witness_futures = {
+                    witness_pool.submit(self._compute_witness, job.circuit_path, job.witness_values): index
+                    for index, job in enumerate(jobs)
+                }
+                proof_futures = {}
+                try:
+                    # Start proving each job as soon as its witness is ready
+                    for future in as_completed(witness_futures):
+                        job = jobs[witness_futures[future]]
+                        proof_future = proof_pool.submit(
+                            self._prove_witness, job.circuit_path, job.proving_key_path,
+                            future.result(), job.proof_out, job.public_out
+                        )
+                        proof_futures[proof_future] = witness_futures[future]
+                    
+                    for future in as_completed(proof_futures):
+                        results[proof_futures[future]] = future.result()
+                except Exception:
+                    for future in (*witness_futures, *proof_futures):
+                        future.cancel()
+                    raise
+        finally:
+            # Remove every witness file that was written
+            for future in witness_futures:
+                if future.done() and not future.cancelled() and future.exception() is None:
+                    witness_path = future.result()
+                    Path(witness_path).unlink(missing_ok=True)
+        
+        return results
+    
+    def _compute_witness(self, circuit_path: str, witness_values: List[str]) -> str:
+        """
+        Compute the witness for a circuit.
+        
+        Args:
+            circuit_path: Path to the compiled circuit
+            witness_values: Witness values
+            
+        Returns:
+            Path to the computed witness file
+        """
+        raise NotImplementedError("Subclasses must implement _compute_witness")
+    
+    def _prove_witness(self, circuit_path: str, proving_key_path: str, witness_path: str,
+                       proof_out: Optional[str] = None,
+                       public_out: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Generate a proof from a computed witness.
+        
+        Args:
+            circuit_path: Path to the compiled circuit
+            proving_key_path: Path to the proving key
+            witness_path: Path to the computed witness
+            proof_out: Where to write the proof (temporary file if omitted)
+            public_out: Where to write the public inputs (temporary file if omitted)
+            
+        Returns:
+            Tuple of (proof_path, public_inputs_path)
+        """
+        raise NotImplementedError("Subclasses must implement _prove_witness")
+    
     def verify_proof(self, verification_key_path: str, proof_path: str, 
                    public_inputs_path: str) -> bool:
         """
@@ -92,138 +239,196 @@ class BaseScheme:
             Path to the Solidity verifier contract
         """
         raise NotImplementedError("Subclasses must implement export_verifier")
+    
+    async def asetup(self, circuit_path: str, pk_out: Optional[str] = None,
+                     vk_out: Optional[str] = None) -> Tuple[str, str]:
+        """Async version of setup, run on the default executor"""
+        return await _run_in_executor(self.setup, circuit_path, pk_out, vk_out)
+    
+    async def agenerate_proof(self, circuit_path: str, proving_key_path: str,
+                              witness_values: List[str], proof_out: Optional[str] = None,
+                              public_out: Optional[str] = None) -> Tuple[str, str]:
+        """Async version of generate_proof, run on the default executor"""
+        return await _run_in_executor(
+            self.generate_proof, circuit_path, proving_key_path, witness_values, proof_out, public_out
+        )
+    
+    async def averify_proof(self, verification_key_path: str, proof_path: str,
+                            public_inputs_path: str) -> bool:
+        """Async version of verify_proof, run on the default executor"""
+        return await _run_in_executor(
+            self.verify_proof, verification_key_path, proof_path, public_inputs_path
+        )
+    
+    async def aexport_verifier(self, verification_key_path: str, output_path: str) -> str:
+        """Async version of export_verifier, run on the default executor"""
+        return await _run_in_executor(self.export_verifier, verification_key_path, output_path)
+    
+    async def averify_batch(self, proofs: Sequence[Tuple[str, str, str]]) -> List[bool]:
+        """
+        Verify several proofs concurrently.
+        
+        Args:
+            proofs: (verification_key_path, proof_path, public_inputs_path) triples
+            
+        Returns:
+            Whether each proof is valid, in input order
+        """
+        return list(await asyncio.gather(*(self.averify_proof(*triple) for triple in proofs)))
 
 
-class Groth16Scheme(BaseScheme):
-    """Groth16 ZKP scheme implementation"""
+class ZokratesScheme(BaseScheme):
+    """
+    ZKP scheme backed by the ZoKrates CLI.
     
-    def setup(self, circuit_path: str) -> Tuple[str, str]:
+    The supported schemes only differ in the --scheme flag passed to
+    ZoKrates, so one implementation serves all of them.
+    """
+    
+    def __init__(self, flag: str, name: Optional[str] = None):
         """
-        Perform trusted setup for a circuit using Groth16.
+        Initialize the scheme.
+        
+        Args:
+            flag: Value of the ZoKrates --scheme flag (e.g. 'g16')
+            name: Name used in log and error messages (defaults to the flag)
+        """
+        super().__init__()
+        self.flag = flag
+        self.name = name or flag
+    
+    def setup(self, circuit_path: str, pk_out: Optional[str] = None,
+              vk_out: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Perform trusted setup for a circuit with this scheme.
         
         Args:
             circuit_path: Path to the compiled circuit
+            pk_out: Where to write the proving key (temporary file if omitted)
+            vk_out: Where to write the verification key (temporary file if omitted)
             
         Returns:
             Tuple of (proving_key_path, verification_key_path)
         """
-        import os
-        import subprocess
-        import tempfile
-        
-        logger.info(f"Performing Groth16 trusted setup for circuit: {circuit_path}")
+        logger.info("Performing %s trusted setup for circuit: %s", self.name, circuit_path)
         
-        # Create temporary files for the keys
-        with tempfile.NamedTemporaryFile(suffix=".proving.key", delete=False) as pk_file, \
-             tempfile.NamedTemporaryFile(suffix=".verification.key", delete=False) as vk_file:
-            proving_key_path = pk_file.name
-            verification_key_path = vk_file.name
+        # Write the keys where requested, or to temporary files
+        proving_key_path = pk_out or _output_path(".proving.key")
+        verification_key_path = vk_out or _output_path(".verification.key")
         
         try:
             # Run ZoKrates to perform the setup
             result = subprocess.run(
-                ["zokrates", "setup", "--scheme", "g16", 
+                [_zokrates_bin(), "setup", "--scheme", self.flag, 
                  "-i", circuit_path, 
                  "--proving-key-path", proving_key_path, 
                  "--verification-key-path", verification_key_path],
                 check=True,
+                close_fds=False,
                 capture_output=True,
                 text=True
             )
             
-            logger.debug(f"Groth16 setup output: {result.stdout}")
-            logger.info(f"Groth16 setup completed. Proving key: {proving_key_path}, Verification key: {verification_key_path}")
+            logger.debug("%s setup output: %s", self.name, result.stdout)
+            logger.info("%s setup completed. Proving key: %s, Verification key: %s", self.name, proving_key_path, verification_key_path)
             
             return proving_key_path, verification_key_path
         except subprocess.CalledProcessError as e:
-            logger.error(f"Groth16 setup error: {e.stderr}")
+            logger.error("%s setup error: %s", self.name, e.stderr)
             # Clean up temporary files on error
             for path in [proving_key_path, verification_key_path]:
-                if os.path.exists(path):
-                    os.unlink(path)
-            raise RuntimeError(f"Failed to perform Groth16 setup: {e}")
+                Path(path).unlink(missing_ok=True)
+            raise RuntimeError(f"Failed to perform {self.name} setup: {e}")
     
     def generate_proof(self, circuit_path: str, proving_key_path: str, 
-                     witness_values: List[str]) -> Tuple[str, str]:
+                     witness_values: List[str], proof_out: Optional[str] = None,
+                     public_out: Optional[str] = None) -> Tuple[str, str]:
         """
-        Generate a proof using Groth16.
+        Generate a proof with this scheme.
         
         Args:
             circuit_path: Path to the compiled circuit
             proving_key_path: Path to the proving key
             witness_values: Witness values
+            proof_out: Where to write the proof (temporary file if omitted)
+            public_out: Where to write the public inputs (temporary file if omitted)
             
         Returns:
             Tuple of (proof_path, public_inputs_path)
         """
-        import os
-        import subprocess
-        import tempfile
+        logger.info("Generating %s proof for circuit: %s", self.name, circuit_path)
         
-        logger.info(f"Generating Groth16 proof for circuit: {circuit_path}")
-        
-        # Create temporary files for the witness and proof
-        with tempfile.NamedTemporaryFile(suffix=".witness", delete=False) as witness_file, \
-             tempfile.NamedTemporaryFile(suffix=".proof", delete=False) as proof_file, \
-             tempfile.NamedTemporaryFile(suffix=".public", delete=False) as public_file:
-            witness_path = witness_file.name
-            proof_path = proof_file.name
-            public_inputs_path = public_file.name
+        witness_path = self._compute_witness(circuit_path, witness_values)
+        try:
+            return self._prove_witness(
+                circuit_path, proving_key_path, witness_path, proof_out, public_out
+            )
+        finally:
+            # Clean up witness file
+            Path(witness_path).unlink(missing_ok=True)
+    
+    def _compute_witness(self, circuit_path: str, witness_values: List[str]) -> str:
+        """Run compute-witness for a circuit and return the witness file"""
+        witness_path = self._slot(".witness")
         
         try:
-            # Write witness values to file
-            with open(witness_path, "w") as f:
-                for value in witness_values:
-                    f.write(f"{value}\n")
-            
-            # Compute witness
-            witness_result = subprocess.run(
-                ["zokrates", "compute-witness", 
+            # Compute witness; the values go in on stdin and ZoKrates writes
+            # the witness file itself
+            output = _run_with_stdin_lines(
+                [_zokrates_bin(), "compute-witness", 
                  "-i", circuit_path, 
                  "-o", witness_path, 
                  "--stdin"],
-                input="\n".join(witness_values),
-                check=True,
-                capture_output=True,
-                text=True
+                witness_values,
+                self._workdir
             )
             
-            logger.debug(f"Witness computation output: {witness_result.stdout}")
-            
+            logger.debug("Witness computation output: %s", output)
+        except subprocess.CalledProcessError as e:
+            logger.error("%s witness computation error: %s", self.name, e.stderr)
+            Path(witness_path).unlink(missing_ok=True)
+            raise RuntimeError(f"Failed to generate {self.name} proof: {e}")
+        
+        return witness_path
+    
+    def _prove_witness(self, circuit_path: str, proving_key_path: str, witness_path: str,
+                       proof_out: Optional[str] = None,
+                       public_out: Optional[str] = None) -> Tuple[str, str]:
+        """Run generate-proof on a computed witness"""
+        # Write the proof where requested, or to temporary files
+        proof_path = proof_out or _output_path(".proof")
+        public_inputs_path = public_out or _output_path(".public")
+        
+        try:
             # Generate proof
             proof_result = subprocess.run(
-                ["zokrates", "generate-proof", 
-                 "--scheme", "g16", 
+                [_zokrates_bin(), "generate-proof", 
+                 "--scheme", self.flag, 
                  "-i", circuit_path, 
                  "--proving-key-path", proving_key_path, 
                  "--witness-path", witness_path, 
                  "--proof-path", proof_path, 
                  "--public-path", public_inputs_path],
                 check=True,
+                close_fds=False,
                 capture_output=True,
                 text=True
-            )
-            
-            logger.debug(f"Proof generation output: {proof_result.stdout}")
-            logger.info(f"Groth16 proof generated. Proof: {proof_path}, Public inputs: {public_inputs_path}")
+            )            
+            logger.debug("Proof generation output: %s", proof_result.stdout)
+            logger.info("%s proof generated. Proof: %s, Public inputs: %s", self.name, proof_path, public_inputs_path)
             
             return proof_path, public_inputs_path
         except subprocess.CalledProcessError as e:
-            logger.error(f"Groth16 proof generation error: {e.stderr}")
+            logger.error("%s proof generation error: %s", self.name, e.stderr)
             # Clean up temporary files on error
-            for path in [witness_path, proof_path, public_inputs_path]:
-                if os.path.exists(path):
-                    os.unlink(path)
-            raise RuntimeError(f"Failed to generate Groth16 proof: {e}")
-        finally:
-            # Clean up witness file
-            if os.path.exists(witness_path):
-                os.unlink(witness_path)
+            for path in [proof_path, public_inputs_path]:
+                Path(path).unlink(missing_ok=True)
+            raise RuntimeError(f"Failed to generate {self.name} proof: {e}")
     
     def verify_proof(self, verification_key_path: str, proof_path: str, 
                    public_inputs_path: str) -> bool:
         """
-        Verify a Groth16 proof.
+        Verify a proof.
         
         Args:
             verification_key_path: Path to the verification key
@@ -233,39 +438,65 @@ class Groth16Scheme(BaseScheme):
         Returns:
             True if the proof is valid, False otherwise
         """
-        import subprocess
-        
-        logger.info(f"Verifying Groth16 proof: {proof_path}")
+        logger.info("Verifying %s proof: %s", self.name, proof_path)
         
         try:
             # Verify the proof
             result = subprocess.run(
-                ["zokrates", "verify", 
-                 "--scheme", "g16", 
+                [_zokrates_bin(), "verify", 
+                 "--scheme", self.flag, 
                  "--verification-key-path", verification_key_path, 
                  "--proof-path", proof_path, 
                  "--public-path", public_inputs_path],
                 check=True,
-                capture_output=True,
-                text=True
+                close_fds=False,
+                capture_output=True
             )
             
-            # Check if verification succeeded
-            success = "VERIFICATION SUCCESSFUL" in result.stdout
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s verification output: %s", self.name, result.stdout.decode(errors='replace'))
+            
+            # Check if verification succeeded; the output is searched as
+            # raw bytes, so it is only decoded when it gets logged
+            success = b"VERIFICATION SUCCESSFUL" in result.stdout
             
             if success:
-                logger.info("Groth16 proof verification successful")
+                logger.info("%s proof verification successful", self.name)
             else:
-                logger.warning("Groth16 proof verification failed")
+                logger.warning("%s proof verification failed", self.name)
             
             return success
         except subprocess.CalledProcessError as e:
-            logger.error(f"Groth16 proof verification error: {e.stderr}")
+            logger.error("%s proof verification error: %s", self.name, e.stderr.decode(errors='replace'))
             return False
     
+    async def averify_proof(self, verification_key_path: str, proof_path: str,
+                            public_inputs_path: str) -> bool:
+        """Verify a proof without blocking the event loop"""
+        logger.info("Verifying %s proof: %s", self.name, proof_path)
+        
+        returncode, stdout, stderr = await _run_zokrates_async(
+            [_zokrates_bin(), "verify",
+             "--scheme", self.flag,
+             "--verification-key-path", verification_key_path,
+             "--proof-path", proof_path,
+             "--public-path", public_inputs_path]
+        )
+        if returncode != 0:
+            logger.error("%s proof verification error: %s", self.name, stderr.decode(errors='replace'))
+            return False
+        
+        success = b"VERIFICATION SUCCESSFUL" in stdout
+        if success:
+            logger.info("%s proof verification successful", self.name)
+        else:
+            logger.warning("%s proof verification failed", self.name)
+        
+        return success
+    
     def export_verifier(self, verification_key_path: str, output_path: str) -> str:
         """
-        Export a Solidity verifier contract for Groth16.
+        Export a Solidity verifier contract for this scheme.
         
         Args:
             verification_key_path: Path to the verification key
@@ -274,214 +505,155 @@ class Groth16Scheme(BaseScheme):
         Returns:
             Path to the Solidity verifier contract
         """
-        import os
-        import subprocess
-        
-        logger.info(f"Exporting Groth16 verifier contract for key: {verification_key_path}")
+        logger.info("Exporting %s verifier contract for key: %s", self.name, verification_key_path)
         
         # Ensure output directory exists
-        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        ensure_directory(os.path.dirname(os.path.abspath(output_path)))
         
         try:
             # Generate the Solidity verifier
             result = subprocess.run(
-                ["zokrates", "export-verifier", 
-                 "--scheme", "g16", 
+                [_zokrates_bin(), "export-verifier", 
+                 "--scheme", self.flag, 
                  "--verification-key-path", verification_key_path, 
                  "-o", output_path],
                 check=True,
+                close_fds=False,
                 capture_output=True,
                 text=True
             )
             
-            logger.debug(f"Verifier export output: {result.stdout}")
-            logger.info(f"Groth16 verifier contract exported to: {output_path}")
+            logger.debug("Verifier export output: %s", result.stdout)
+            logger.info("%s verifier contract exported to: %s", self.name, output_path)
             
             return output_path
         except subprocess.CalledProcessError as e:
-            logger.error(f"Groth16 verifier export error: {e.stderr}")
-            raise RuntimeError(f"Failed to export Groth16 verifier: {e}")
+            logger.error("%s verifier export error: %s", self.name, e.stderr)
+            raise RuntimeError(f"Failed to export {self.name} verifier: {e}")
+
+
+class Groth16Scheme(ZokratesScheme):
+    """Groth16 ZKP scheme implementation"""
+    
+    def __init__(self):
+        """Initialize the scheme"""
+        super().__init__("g16", "Groth16")
 
 
-class GM17Scheme(BaseScheme):
+class GM17Scheme(ZokratesScheme):
     """GM17 ZKP scheme implementation"""
     
-    def setup(self, circuit_path: str) -> Tuple[str, str]:
-        """
-        Perform trusted setup for a circuit using GM17.
-        
-        Args:
-            circuit_path: Path to the compiled circuit
-            
-        Returns:
-            Tuple of (proving_key_path, verification_key_path)
-        """
-        # Similar implementation to Groth16 but with scheme="gm17"
-        # For brevity, we'll use a simplified implementation
-        import os
-        import subprocess
-        import tempfile
-        
-        logger.info(f"Performing GM17 trusted setup for circuit: {circuit_path}")
-        
-        # Create temporary files for the keys
-        with tempfile.NamedTemporaryFile(suffix=".proving.key", delete=False) as pk_file, \
-             tempfile.NamedTemporaryFile(suffix=".verification.key", delete=False) as vk_file:
-            proving_key_path = pk_file.name
-            verification_key_path = vk_file.name
-        
-        try:
-            # Run ZoKrates to perform the setup
-            result = subprocess.run(
-                ["zokrates", "setup", "--scheme", "gm17", 
-                 "-i", circuit_path, 
-                 "--proving-key-path", proving_key_path, 
-                 "--verification-key-path", verification_key_path],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            
-            logger.debug(f"GM17 setup output: {result.stdout}")
-            logger.info(f"GM17 setup completed. Proving key: {proving_key_path}, Verification key: {verification_key_path}")
-            
-            return proving_key_path, verification_key_path
-        except subprocess.CalledProcessError as e:
-            logger.error(f"GM17 setup error: {e.stderr}")
-            # Clean up temporary files on error
-            for path in [proving_key_path, verification_key_path]:
-                if os.path.exists(path):
-                    os.unlink(path)
-            raise RuntimeError(f"Failed to perform GM17 setup: {e}")
+    def __init__(self):
+        """Initialize the scheme"""
+        super().__init__("gm17", "GM17")
+
+
+@lru_cache(maxsize=1)
+def _zokrates_bin() -> str:
+    """
+    Resolve the ZoKrates executable once.
     
-    def generate_proof(self, circuit_path: str, proving_key_path: str, 
-                     witness_values: List[str]) -> Tuple[str, str]:
-        """Generate a proof using GM17"""
-        # Similar to Groth16 but with scheme="gm17"
-        import os
-        import subprocess
-        import tempfile
-        
-        logger.info(f"Generating GM17 proof for circuit: {circuit_path}")
-        
-        # Create temporary files for the witness and proof
-        with tempfile.NamedTemporaryFile(suffix=".witness", delete=False) as witness_file, \
-             tempfile.NamedTemporaryFile(suffix=".proof", delete=False) as proof_file, \
-             tempfile.NamedTemporaryFile(suffix=".public", delete=False) as public_file:
-            witness_path = witness_file.name
-            proof_path = proof_file.name
-            public_inputs_path = public_file.name
-        
-        try:
-            # Write witness values to file
-            with open(witness_path, "w") as f:
-                for value in witness_values:
-                    f.write(f"{value}\n")
-            
-            # Compute witness
-            witness_result = subprocess.run(
-                ["zokrates", "compute-witness", 
-                 "-i", circuit_path, 
-                 "-o", witness_path, 
-                 "--stdin"],
-                input="\n".join(witness_values),
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            
-            # Generate proof
-            proof_result = subprocess.run(
-                ["zokrates", "generate-proof", 
-                 "--scheme", "gm17", 
-                 "-i", circuit_path, 
-                 "--proving-key-path", proving_key_path, 
-                 "--witness-path", witness_path, 
-                 "--proof-path", proof_path, 
-                 "--public-path", public_inputs_path],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            
-            logger.info(f"GM17 proof generated. Proof: {proof_path}, Public inputs: {public_inputs_path}")
-            
-            return proof_path, public_inputs_path
-        except subprocess.CalledProcessError as e:
-            logger.error(f"GM17 proof generation error: {e.stderr}")
-            # Clean up temporary files on error
-            for path in [witness_path, proof_path, public_inputs_path]:
-                if os.path.exists(path):
-                    os.unlink(path)
-            raise RuntimeError(f"Failed to generate GM17 proof: {e}")
-        finally:
-            # Clean up witness file
-            if os.path.exists(witness_path):
-                os.unlink(witness_path)
+    Spawning by absolute path skips the PATH search on every call and,
+    together with close_fds=False (our own descriptors are already
+    non-inheritable), lets subprocess use its posix_spawn/vfork fast path.
     
-    def verify_proof(self, verification_key_path: str, proof_path: str, 
-                   public_inputs_path: str) -> bool:
-        """Verify a GM17 proof"""
-        # Similar to Groth16 but with scheme="gm17"
-        import subprocess
-        
-        logger.info(f"Verifying GM17 proof: {proof_path}")
-        
-        try:
-            # Verify the proof
-            result = subprocess.run(
-                ["zokrates", "verify", 
-                 "--scheme", "gm17", 
-                 "--verification-key-path", verification_key_path, 
-                 "--proof-path", proof_path, 
-                 "--public-path", public_inputs_path],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            
-            # Check if verification succeeded
-            success = "VERIFICATION SUCCESSFUL" in result.stdout
-            
-            if success:
-                logger.info("GM17 proof verification successful")
-            else:
-                logger.warning("GM17 proof verification failed")
-            
-            return success
-        except subprocess.CalledProcessError as e:
-            logger.error(f"GM17 proof verification error: {e.stderr}")
-            return False
+    Returns:
+        Path to the zokrates executable, or the bare name if not on PATH
+    """
+    return shutil.which("zokrates") or "zokrates"
+
+
+def _output_path(suffix: str) -> str:
+    """Create a temporary file for an output the caller did not give a path for"""
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as output_file:
+        return output_file.name
+
+
+def _run_with_stdin_lines(args: List[str], lines: Sequence[str], scratch_dir: str) -> str:
+    """
+    Run a command, streaming lines to its stdin.
     
-    def export_verifier(self, verification_key_path: str, output_path: str) -> str:
-        """Export a Solidity verifier contract for GM17"""
-        # Similar to Groth16 but with scheme="gm17"
-        import os
-        import subprocess
+    The lines are encoded and written as they go, instead of first being
+    joined into one string and then encoded into a second copy. The
+    command's output is collected in a scratch file rather than a pipe, so
+    it can never block on a full output pipe while it is still reading.
+    
+    Args:
+        args: Command line to run
+        lines: Lines written to the command's stdin
+        scratch_dir: Directory for the output scratch file
         
-        logger.info(f"Exporting GM17 verifier contract for key: {verification_key_path}")
+    Returns:
+        Combined stdout and stderr of the command
         
-        # Ensure output directory exists
-        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    Raises:
+        subprocess.CalledProcessError: If the command exits with an error
+    """
+    with tempfile.TemporaryFile(dir=scratch_dir) as output_file:
+        with subprocess.Popen(args, stdin=subprocess.PIPE, stdout=output_file,
+                              stderr=subprocess.STDOUT, bufsize=STDIN_BUFFER_SIZE,
+                              close_fds=False) as proc:
+            try:
+                for index, line in enumerate(lines):
+                    if index:
+                        proc.stdin.write(b"\n")
+                    proc.stdin.write(line.encode())
+                proc.stdin.close()
+            except BrokenPipeError:
+                # The command exited before reading everything; its exit
+                # status says why
+                with suppress(BrokenPipeError):
+                    proc.stdin.close()
+            returncode = proc.wait()
+        
+        output_file.seek(0)
+        output = output_file.read().decode(errors="replace")
+    
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, args, output=output, stderr=output)
+    return output
+
+
+async def _run_in_executor(func, *args):
+    """Run a blocking scheme call on the default executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(func, *args))
+
+
+async def _run_zokrates_async(args: List[str]) -> Tuple[int, bytes, bytes]:
+    """
+    Run a ZoKrates command as an asyncio subprocess, with stdin closed.
+    
+    Args:
+        args: Command line to run
         
-        try:
-            # Generate the Solidity verifier
-            result = subprocess.run(
-                ["zokrates", "export-verifier", 
-                 "--scheme", "gm17", 
-                 "--verification-key-path", verification_key_path, 
-                 "-o", output_path],
-                check=True,
-                capture_output=True,
-                text=True
-            )
-            
-            logger.info(f"GM17 verifier contract exported to: {output_path}")
-            
-            return output_path
-        except subprocess.CalledProcessError as e:
-            logger.error(f"GM17 verifier export error: {e.stderr}")
-            raise RuntimeError(f"Failed to export GM17 verifier: {e}")
+    Returns:
+        Tuple of (returncode, stdout, stderr)
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        close_fds=False,
+    )
+    stdout, stderr = await proc.communicate()
+    return proc.returncode, stdout, stderr
+
+
+# Scheme implementations by type; add other schemes as they are implemented
+_SCHEME_MAP: Dict[SchemeType, type] = {
+    SchemeType.GROTH16: Groth16Scheme,
+    SchemeType.GM17: GM17Scheme,
+}
+
+
+@lru_cache(maxsize=8)
+def _scheme_instance(scheme_type: SchemeType) -> BaseScheme:
+    """Create the shared instance for a scheme type"""
+    instance = _SCHEME_MAP[scheme_type]()
+    instance._shared = True
+    return instance
 
 
 # Factory function to get the appropriate scheme implementation
@@ -489,23 +661,32 @@ def get_scheme(scheme_type: Union[str, SchemeType]) -> BaseScheme:
     """
     Get the appropriate scheme implementation.
     
+    Schemes hold no per-call state, so one instance per scheme type is
+    shared by every caller.
+    
     Args:
         scheme_type: Type of scheme to use
         
     Returns:
         Scheme implementation
     """
+    return _resolve_scheme(scheme_type)
+
+
+@lru_cache(maxsize=32)
+def _resolve_scheme(scheme_type: Union[str, SchemeType]) -> BaseScheme:
+    """
+    Map a scheme name or type to its shared instance.
+    
+    Callers pass the same few names over and over, so the whole resolution
+    (parsing the name, falling back to the default, picking the instance)
+    is cached on the argument and a repeated lookup is one dict probe.
+    """
     if isinstance(scheme_type, str):
         scheme_type = SchemeType.from_string(scheme_type)
     
-    scheme_map = {
-        SchemeType.GROTH16: Groth16Scheme,
-        SchemeType.GM17: GM17Scheme,
-        # Add other schemes as they are implemented
-    }
-    
-    if scheme_type not in scheme_map:
-        logger.warning(f"Scheme {scheme_type} not implemented, using default.")
+    if scheme_type not in _SCHEME_MAP:
+        logger.warning("Scheme %s not implemented, using default.", scheme_type)
         scheme_type = SchemeType.get_default()
     
-    return scheme_map[scheme_type]() 
\ No newline at end of file
+    return _scheme_instance(scheme_type)
@@ -3,5 +3,24 @@ Utility functions for LlamaVerifier
 """
 
 from .logger import setup_logger, get_logger
-from .file_utils import check_file_exists, ensure_directory
-from .system_utils import is_apple_silicon, get_system_info 
\ No newline at end of file
+from .file_utils import check_file_exists, ensure_directory, hash_file
+
+__all__ = [
+    "check_file_exists",
+    "ensure_directory",
+    "get_logger",
+    "get_system_info",
+    "hash_file",
+    "is_apple_silicon",
+    "setup_logger",
+]
+
+# Names served from system_utils, which is only imported once one is used
+_SYSTEM_UTILS = ("get_system_info", "is_apple_silicon")
+
+
+def __getattr__(name: str):
+    if name in _SYSTEM_UTILS:
+        from . import system_utils
+        return getattr(system_utils, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
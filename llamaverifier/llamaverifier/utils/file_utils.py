@@ -1,9 +1,13 @@
 """
 File utility functions for LlamaVerifier
 """
+import fnmatch
+import hashlib
 import os
 import shutil
+import stat
 import tempfile
+import threading
 from pathlib import Path
 from typing import List, Optional, Tuple, Union
 
@@ -11,7 +15,6 @@ from .logger import get_logger
 
 logger = get_logger(__name__)
 
-
 def check_file_exists(file_path: Union[str, Path]) -> bool:
     """
     Check if a file exists at the specified path.
@@ -25,8 +28,11 @@ def check_file_exists(file_path: Union[str, Path]) -> bool:
     if not file_path:
         return False
     
-    path = Path(file_path)
-    return path.exists() and path.is_file()
+    # A single stat covers both the existence and the regular-file check
+    try:
+        return stat.S_ISREG(os.stat(file_path).st_mode)
+    except (OSError, ValueError):
+        return False
 
 
 def ensure_directory(directory_path: Union[str, Path]) -> Path:
@@ -41,10 +47,159 @@ def ensure_directory(directory_path: Union[str, Path]) -> Path:
         Path object for the directory
     """
     path = Path(directory_path)
+    # Not memoized: the directory may have been removed since the last call
     path.mkdir(parents=True, exist_ok=True)
     return path
 
 
+def user_cache_dir(name: str) -> str:
+    """
+    Get the path of a per-user LlamaVerifier cache directory.
+    
+    The directory lives under $XDG_CACHE_HOME, or ~/.cache if that is not
+    set, so it is never shared with other users. It is not created here.
+    
+    Args:
+        name: Name of the cache
+        
+    Returns:
+        Path to the cache directory
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "llamaverifier", name)
+
+
+def ensure_private_directory(directory_path: Union[str, Path]) -> Path:
+    """
+    Ensure that a directory only the current user can write to exists.
+    
+    Missing directories are created with mode 0700. An existing directory
+    must be owned by the current user and not be writable by anyone else,
+    since files found in it are trusted without further checks.
+    
+    Args:
+        directory_path: Path to the directory
+        
+    Returns:
+        Path object for the directory
+        
+    Raises:
+        PermissionError: If the directory is owned by another user or is
+            writable by other users
+    """
+    path = Path(directory_path)
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    check_private_directory(path)
+    return path
+
+
+def check_private_directory(directory_path: Union[str, Path]) -> None:
+    """
+    Check that a directory is owned by the current user and that no other
+    user can write to it.
+    
+    Args:
+        directory_path: Path to the directory
+        
+    Raises:
+        PermissionError: If the directory fails the check
+        OSError: If the directory cannot be inspected
+    """
+    st = os.lstat(directory_path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise PermissionError(f"Not a directory: {directory_path}")
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        raise PermissionError(f"Directory is owned by another user: {directory_path}")
+    if st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"Directory is writable by other users: {directory_path}")
+
+
+def hash_file(file_path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    """
+    Compute the BLAKE2b digest of a file's contents.
+    
+    The file is read unbuffered into one reusable buffer, so hashing a
+    multi-gigabyte proving key costs a single chunk of memory and no
+    per-chunk allocations.
+    
+    Args:
+        file_path: Path to the file
+        chunk_size: Number of bytes read per iteration
+        
+    Returns:
+        Hex digest of the file contents
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(file_path, "rb", buffering=0) as f:
+        if hasattr(os, "posix_fadvise"):
+            # Read-ahead hint only; hashing works the same without it
+            try:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            digest.update(view[:size])
+    return digest.hexdigest()
+
+
+def link_or_copy(src: Union[str, Path], dest: Union[str, Path]) -> None:
+    """
+    Atomically place a copy of a file at the destination path.
+    
+    The file is hard-linked when source and destination share a filesystem
+    and copied otherwise, then moved over the destination so readers never
+    see a partial file.
+    
+    Args:
+        src: Source file path
+        dest: Destination file path
+    """
+    temp_path = f"{dest}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.link(src, temp_path)
+    except OSError:
+        shutil.copyfile(src, temp_path)
+    
+    try:
+        os.replace(temp_path, dest)
+    except OSError:
+        os.unlink(temp_path)
+        raise
+
+
+def prefetch_file(file_path: Union[str, Path]) -> None:
+    """
+    Ask the kernel to start reading a file into the page cache.
+    
+    Later readers, including other processes, then find the file in memory
+    instead of going to disk. Does nothing on platforms without
+    posix_fadvise.
+    
+    Args:
+        file_path: Path to the file
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+    except OSError as e:
+        logger.debug(f"Could not prefetch {file_path}: {e}")
+        return
+    
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError as e:
+        logger.debug(f"Could not prefetch {file_path}: {e}")
+    finally:
+        os.close(fd)
+
+
 def get_temp_file(suffix: Optional[str] = None, prefix: Optional[str] = None, 
                   directory: Optional[str] = None, delete: bool = False) -> str:
     """
@@ -78,27 +233,36 @@ def list_files(directory: Union[str, Path],
     Returns:
         List of Path objects for matching files
     """
-    path = Path(directory)
-    
-    if not path.exists() or not path.is_dir():
+    if not os.path.isdir(directory):
         logger.warning(f"Directory does not exist: {directory}")
         return []
     
-    if recursive:
-        if pattern:
-            return list(path.glob(f"**/{pattern}"))
-        else:
-            return [p for p in path.glob("**/*") if p.is_file()]
-    else:
-        if pattern:
-            return list(path.glob(pattern))
-        else:
-            return [p for p in path.iterdir() if p.is_file()]
+    if pattern is not None and ("/" in pattern or os.sep in pattern):
+        # Patterns spanning directories need full glob matching
+        path = Path(directory)
+        return list(path.glob(f"**/{pattern}" if recursive else pattern))
+    
+    files = []
+    pending = [os.fspath(directory)]
+    while pending:
+        # Directory entries carry their file type, so matching them costs
+        # no extra stat per entry. Symlinked directories are not followed,
+        # like glob, so a link loop cannot recurse forever.
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    if pattern is None or fnmatch.fnmatch(entry.name, pattern):
+                        files.append(Path(entry.path))
+                elif recursive and entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+    
+    return files
 
 
 def copy_with_confirmation(src: Union[str, Path], 
                          dest: Union[str, Path], 
-                         overwrite: bool = False) -> bool:
+                         overwrite: bool = False,
+                         preserve_metadata: bool = False) -> bool:
     """
     Copy a file with confirmation if the destination exists.
     
@@ -106,6 +270,7 @@ def copy_with_confirmation(src: Union[str, Path],
         src: Source file path
         dest: Destination file path
         overwrite: Whether to overwrite existing files without confirmation
+        preserve_metadata: Whether to also copy permission bits and timestamps
         
     Returns:
         True if the file was copied, False otherwise
@@ -122,7 +287,13 @@ def copy_with_confirmation(src: Union[str, Path],
         return False
     
     try:
-        shutil.copy2(src_path, dest_path)
+        if preserve_metadata:
+            shutil.copy2(src_path, dest_path)
+        else:
+            # Plain content copy, which the kernel can do in place on Linux
+            if dest_path.is_dir():
+                dest_path = dest_path / src_path.name
+            shutil.copyfile(src_path, dest_path)
         logger.debug(f"Copied {src} to {dest}")
         return True
     except Exception as e:
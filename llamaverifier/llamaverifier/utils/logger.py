@@ -15,6 +15,27 @@ console = Console()
 # Default logger level
 DEFAULT_LOG_LEVEL = logging.INFO
 
+# Log format for console output
+_LOG_FORMAT = "%(message)s"
+_DATE_FORMAT = "[%Y-%m-%d %H:%M:%S]"
+
+# Whether rich tracebacks render each frame's locals; off unless opted in,
+# since it walks every local on each logged exception
+_SHOW_LOCALS = os.environ.get("LLAMAVERIFIER_RICH_LOCALS", "0") == "1"
+
+# Name of the package logger that holds the shared console handler
+_PACKAGE_LOGGER = "llamaverifier"
+
+# Console handler shared by every logger; levels are applied per logger
+_CONSOLE_HANDLER = RichHandler(
+    console=console,
+    rich_tracebacks=True,
+    tracebacks_show_locals=_SHOW_LOCALS,
+    show_time=True,
+    show_path=False,
+)
+_CONSOLE_HANDLER.setFormatter(logging.Formatter(_LOG_FORMAT, datefmt=_DATE_FORMAT))
+
 # Logger instances
 _loggers = {}
 
@@ -32,7 +53,9 @@ def setup_logger(
         name: Name of the logger
         level: Logging level (default: INFO)
         log_file: Path to log file (optional)
-        console_output: Whether to output logs to console (default: True)
+        console_output: Whether to output logs to console (default: True).
+            Loggers below the package logger always reach the console
+            through it.
         
     Returns:
         Configured logger instance
@@ -51,22 +74,13 @@ def setup_logger(
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
     
-    # Format
-    log_format = "%(message)s"
-    date_format = "[%Y-%m-%d %H:%M:%S]"
-    
-    # Add console handler with rich formatting if requested
-    if console_output:
-        console_handler = RichHandler(
-            console=console,
-            rich_tracebacks=True,
-            tracebacks_show_locals=True,
-            show_time=True,
-            show_path=False,
-        )
-        console_handler.setLevel(level)
-        console_handler.setFormatter(logging.Formatter(log_format, datefmt=date_format))
-        logger.addHandler(console_handler)
+    # Records propagate, so application and test handlers see them too. To
+    # print each record once, only the package logger gets the console
+    # handler and its children reach it by propagation. Loggers outside the
+    # package get their own, but the root logger is left to the application.
+    is_package_child = name.startswith(f"{_PACKAGE_LOGGER}.")
+    if console_output and not is_package_child and logger is not logging.getLogger():
+        logger.addHandler(_CONSOLE_HANDLER)
     
     # Add file handler if log file specified
     if log_file:
@@ -76,7 +90,7 @@ def setup_logger(
         file_handler.setFormatter(
             logging.Formatter(
                 "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-                datefmt=date_format
+                datefmt=_DATE_FORMAT
             )
         )
         logger.addHandler(file_handler)
@@ -1,27 +1,45 @@
 """
 System utility functions for LlamaVerifier
 """
+import importlib.util
 import os
 import platform
+import plistlib
+import shlex
+import shutil
 import subprocess
 import sys
+import time
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 
-import psutil
-
 from .logger import get_logger
 
 logger = get_logger(__name__)
 
+# Seconds to wait for a GPU probe command before giving up
+GPU_PROBE_TIMEOUT = 5
+
+# Seconds a free disk space reading is reused for
+FREE_DISK_TTL = 5
+
+# Platform facts, probed once at import
+_SYSTEM = platform.system()
+_IS_DARWIN = _SYSTEM == "Darwin"
+_IS_APPLE_SILICON = _IS_DARWIN and platform.machine() == "arm64"
+
 
 def is_apple_silicon() -> bool:
     """
     Check if the system is running on Apple Silicon (ARM64).
     
+    The platform cannot change while the process runs, so it is probed once
+    at import.
+    
     Returns:
         True if running on Apple Silicon, False otherwise
     """
-    return platform.system() == "Darwin" and platform.machine() == "arm64"
+    return _IS_APPLE_SILICON
 
 
 def get_system_info() -> Dict[str, str]:
@@ -31,8 +49,55 @@ def get_system_info() -> Dict[str, str]:
     Returns:
         Dictionary containing system information
     """
+    # psutil loads native extensions, so it is only imported when needed
+    import psutil
+    
+    # Only the free memory and disk space are probed again
+    return {
+        **_static_system_info(),
+        "available_memory": f"{psutil.virtual_memory().available / (1024**3):.2f} GB",
+        "free_disk": _free_disk(int(time.monotonic()) // FREE_DISK_TTL),
+    }
+
+
+@lru_cache(maxsize=1)
+def _free_disk(window: int) -> str:
+    """Get the free disk space, re-probed once per FREE_DISK_TTL window"""
+    usage = _root_disk_usage()
+    return f"{usage.free / (1024**3):.2f} GB" if usage else "Unknown"
+
+
+def _root_disk_usage():
+    """
+    Get the disk usage of the root filesystem.
+    
+    Containers without a usable root mount fail the statfs call; the disk
+    figures are then reported as unknown instead of failing the whole probe.
+    
+    Returns:
+        psutil usage tuple, or None if the root filesystem cannot be queried
+    """
+    import psutil
+    
+    try:
+        return psutil.disk_usage('/')
+    except OSError as e:
+        logger.debug(f"Failed to get disk usage: {e}")
+        return None
+
+
+@lru_cache(maxsize=1)
+def _static_system_info() -> Dict[str, str]:
+    """
+    Get the system information that cannot change while the process runs.
+    
+    The result is cached, so callers must copy it before modifying it.
+    
+    Returns:
+        Dictionary containing platform information and capacities
+    """
     info = {
-        "os": platform.system(),
+        "os": _SYSTEM,
         "os_version": platform.release(),
         "architecture": platform.machine(),
         "python_version": platform.python_version(),
@@ -47,23 +112,24 @@ def get_system_info() -> Dict[str, str]:
     else:
         info["mlx_accelerated"] = "Disabled (Not Apple Silicon)"
     
-    # Add memory information
-    mem = psutil.virtual_memory()
-    info["total_memory"] = f"{mem.total / (1024**3):.2f} GB"
-    info["available_memory"] = f"{mem.available / (1024**3):.2f} GB"
+    # Capacities are fixed; only the available amounts change
+    import psutil
     
-    # Add disk information
-    disk = psutil.disk_usage("/")
-    info["total_disk"] = f"{disk.total / (1024**3):.2f} GB"
-    info["free_disk"] = f"{disk.free / (1024**3):.2f} GB"
+    info["total_memory"] = f"{psutil.virtual_memory().total / (1024**3):.2f} GB"
+    usage = _root_disk_usage()
+    info["total_disk"] = f"{usage.total / (1024**3):.2f} GB" if usage else "Unknown"
     
     return info
 
 
+@lru_cache(maxsize=1)
 def is_mlx_available() -> bool:
     """
     Check if MLX is available on the system.
     
+    The result is cached, including a failed import, so the import system
+    is only consulted once.
+    
     Returns:
         True if MLX is available, False otherwise
     """
@@ -77,42 +143,55 @@ def is_mlx_available() -> bool:
         return False
 
 
+@lru_cache(maxsize=1)
 def get_gpu_info() -> Dict[str, str]:
     """
     Get information about the GPU.
     
+    GPU hardware does not change at runtime, so the probe runs once and the
+    result is cached; callers must not modify it.
+    
     Returns:
         Dictionary containing GPU information, or empty dict if not available
     """
-    if platform.system() == "Darwin":
+    if _IS_DARWIN:
         try:
-            # On macOS, use system_profiler
-            cmd = ["system_profiler", "SPDisplaysDataType"]
-            output = subprocess.check_output(cmd, universal_newlines=True)
+            # On macOS, use system_profiler's structured output
+            cmd = ["system_profiler", "-xml", "SPDisplaysDataType"]
+            output = subprocess.run(
+                cmd, capture_output=True, timeout=GPU_PROBE_TIMEOUT, check=True
+            ).stdout
             
-            # Parse output (simplified)
-            info = {}
-            for line in output.split("\n"):
-                line = line.strip()
-                if "Chipset Model" in line:
-                    info["model"] = line.split(":", 1)[1].strip()
-                elif "VRAM" in line:
-                    info["vram"] = line.split(":", 1)[1].strip()
+            # Report the first GPU that names its model
+            for report in plistlib.loads(output):
+                for item in report.get("_items", []):
+                    if "sppci_model" not in item:
+                        continue
+                    info = {"model": item["sppci_model"]}
+                    vram = item.get("spdisplays_vram") or item.get("spdisplays_vram_shared")
+                    if vram:
+                        info["vram"] = vram
+                    return info
             
-            return info
+            return {}
         except Exception as e:
             logger.warning(f"Failed to get GPU info: {e}")
             return {}
-    elif platform.system() == "Linux":
+    elif _SYSTEM == "Linux":
         try:
-            # On Linux, use lspci
-            cmd = ["lspci", "-v"]
-            output = subprocess.check_output(cmd, universal_newlines=True)
+            # On Linux, use lspci's compact machine-readable listing, one
+            # device per line as: slot "class" "vendor" "device" ...
+            cmd = ["lspci", "-mm"]
+            output = subprocess.run(
+                cmd, capture_output=True, text=True, timeout=GPU_PROBE_TIMEOUT, check=True
+            ).stdout
             
-            # Parse output (simplified)
-            for line in output.split("\n"):
-                if "VGA" in line or "3D" in line:
-                    return {"model": line.split(":", 1)[1].strip()}
+            for line in output.splitlines():
+                if "VGA compatible" not in line and "3D controller" not in line:
+                    continue
+                fields = shlex.split(line)
+                if len(fields) >= 4 and fields[1].startswith(("VGA compatible", "3D controller")):
+                    return {"model": f"{fields[2]} {fields[3]}"}
             
             return {}
         except Exception as e:
@@ -123,31 +202,26 @@ def get_gpu_info() -> Dict[str, str]:
         return {}
 
 
+@lru_cache(maxsize=1)
 def check_dependencies() -> List[Tuple[str, bool]]:
     """
     Check if all required external dependencies are installed.
     
+    The result is cached for the lifetime of the process and must not be
+    modified by callers.
+    
     Returns:
         List of tuples (dependency_name, is_installed)
     """
     dependencies = []
     
-    # Check for ZoKrates
-    try:
-        output = subprocess.check_output(["zokrates", "--version"], 
-                                         stderr=subprocess.STDOUT,
-                                         universal_newlines=True)
-        dependencies.append(("ZoKrates", True))
-    except (subprocess.SubprocessError, FileNotFoundError):
-        dependencies.append(("ZoKrates", False))
+    # Check for ZoKrates; a PATH lookup is enough, no need to run it
+    dependencies.append(("ZoKrates", shutil.which("zokrates") is not None))
     
     # Check for Python packages
     required_packages = ["zokrates_pycrypto", "py_ecc", "typer", "rich", "fastapi", "pydantic"]
     for package in required_packages:
-        try:
-            __import__(package)
-            dependencies.append((package, True))
-        except ImportError:
-            dependencies.append((package, False))
+        # Locate the package without executing it; only presence matters
+        dependencies.append((package, importlib.util.find_spec(package) is not None))
     
     return dependencies 
\ No newline at end of file
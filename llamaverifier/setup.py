@@ -3,21 +3,31 @@
 Setup script for LlamaVerifier
 """
 import os
-from setuptools import setup, find_packages
+import re
+from setuptools import Extension, setup, find_packages
 
 # Read the contents of README.md
 with open("README.md", "r", encoding="utf-8") as fh:
     long_description = fh.read()
 
 # Read the requirements from requirements.txt
-with open("requirements.txt", "r", encoding="utf-8") as fh:
-    requirements = [line.strip() for line in fh if line.strip() and not line.startswith("#")]
+def _read_requirements(path):
+    """Yield the requirement lines of a requirements file"""
+    with open(path, "r", encoding="utf-8") as fh:
+        for raw in fh:
+            line = raw.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+
+requirements = list(_read_requirements("requirements.txt"))
 
 # Optional dependencies
 extras_require = {
     "dev": [
         "pytest>=7.4.0",
         "pytest-cov>=4.1.0",
+        "pytest-xdist>=3.3.0",
         "black>=23.7.0",
         "isort>=5.12.0",
         "mypy>=1.5.0",
@@ -29,16 +39,34 @@ extras_require = {
     "apple": [
         "mlx>=0.0.5",
     ],
+    "jit": [
+        "numba>=0.58.0",
+    ],
 }
 
-# Get version from package
-about = {}
+# Optional compiled extensions, built only when Cython is available
+try:
+    from Cython.Build import cythonize
+    ext_modules = cythonize(
+        [
+            Extension(
+                "llamaverifier.models._linear",
+                ["llamaverifier/models/_linear.pyx"],
+                optional=True,
+            ),
+        ],
+        language_level=3,
+    )
+except ImportError:
+    ext_modules = []
+
+# Get version from package, without executing its imports
 with open(os.path.join("llamaverifier", "__init__.py"), "r", encoding="utf-8") as f:
-    exec(f.read(), about)
+    version = re.search(r'^__version__\s*=\s*["\']([^"\']+)', f.read(), re.M).group(1)
 
 setup(
     name="llamaverifier",
-    version=about["__version__"],
+    version=version,
     author="LlamaVerifier Contributors",
     author_email="info@llamaverifier.ai",
     description="Zero-Knowledge Proof System for AI Model Verification",
@@ -46,6 +74,7 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/username/llamaverifier",
     packages=find_packages(),
+    ext_modules=ext_modules,
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Developers",
@@ -67,6 +96,9 @@ setup(
             "llamaverifier=llamaverifier.cli.commands:main",
         ],
     },
+    package_data={
+        "llamaverifier.circuits": ["templates/*.j2"],
+    },
     include_package_data=True,
     zip_safe=False,
 ) 
\ No newline at end of file
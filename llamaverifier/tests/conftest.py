@@ -3,22 +3,53 @@ Pytest configuration file for LlamaVerifier tests
 """
 import os
 import json
-import tempfile
-import shutil
+from pathlib import Path
 from unittest import mock
 
 import pytest
 
-
-@pytest.fixture
-def temp_dir():
-    """Create a temporary directory for test files"""
-    temp_dir = tempfile.mkdtemp()
-    yield temp_dir
-    shutil.rmtree(temp_dir)
-
-
-@pytest.fixture
+# Import every subpackage once per session: a broken import then stops
+# collection instead of being re-checked inside individual tests
+import llamaverifier.api
+import llamaverifier.circuits
+import llamaverifier.cli
+import llamaverifier.proofs
+
+
+def _fast_tmpdir():
+    """Return a RAM-backed directory for temporary files, or None if there is none"""
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK | os.X_OK):
+        return shm
+    return None
+
+
+def pytest_configure(config):
+    """Put tmp_path and tmp_path_factory directories on tmpfs where available
+    
+    The test files are small throwaway dummies, so there is no reason for
+    them to reach a block device. An explicit --basetemp or
+    PYTEST_DEBUG_TEMPROOT still takes precedence.
+    """
+    if config.option.basetemp is None and "PYTEST_DEBUG_TEMPROOT" not in os.environ:
+        fast_tmpdir = _fast_tmpdir()
+        if fast_tmpdir is not None:
+            os.environ["PYTEST_DEBUG_TEMPROOT"] = fast_tmpdir
+
+
+@pytest.fixture(scope="session")
+def temp_dir(tmp_path_factory):
+    """Create a temporary directory for test files, shared by the session
+    
+    The dummy files created in it are fixed content, so they are written
+    once per session; tests must not modify them. The directory lives
+    under pytest's base temp directory, which is separate for each xdist
+    worker.
+    """
+    return str(tmp_path_factory.mktemp("data"))
+
+
+@pytest.fixture(scope="session")
 def model_file(temp_dir):
     """Create a dummy model file"""
     model_path = os.path.join(temp_dir, "model.txt")
@@ -29,27 +60,25 @@ def model_file(temp_dir):
     return model_path
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def input_file(temp_dir):
     """Create a dummy input file"""
     input_data = {"input": [1, 2, 3]}
     input_path = os.path.join(temp_dir, "input.json")
-    with open(input_path, "w") as f:
-        json.dump(input_data, f)
+    Path(input_path).write_text(json.dumps(input_data, separators=(",", ":")))
     return input_path, input_data
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def output_file(temp_dir):
     """Create a dummy output file"""
     output_data = {"output": [3, 2, 1]}
     output_path = os.path.join(temp_dir, "output.json")
-    with open(output_path, "w") as f:
-        json.dump(output_data, f)
+    Path(output_path).write_text(json.dumps(output_data, separators=(",", ":")))
     return output_path, output_data
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def circuit_file(temp_dir):
     """Create a dummy circuit file"""
     circuit_path = os.path.join(temp_dir, "circuit.zok")
@@ -59,17 +88,16 @@ def circuit_file(temp_dir):
     return circuit_path
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def witness_file(temp_dir):
     """Create a dummy witness file"""
     witness_data = {"a": 3, "b": 4, "c": 12}
     witness_path = os.path.join(temp_dir, "witness.json")
-    with open(witness_path, "w") as f:
-        json.dump(witness_data, f)
+    Path(witness_path).write_text(json.dumps(witness_data, separators=(",", ":")))
     return witness_path, witness_data
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def proving_key_file(temp_dir):
     """Create a dummy proving key file"""
     pk_path = os.path.join(temp_dir, "proving.key")
@@ -78,7 +106,7 @@ def proving_key_file(temp_dir):
     return pk_path
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def verification_key_file(temp_dir):
     """Create a dummy verification key file"""
     vk_path = os.path.join(temp_dir, "verification.key")
@@ -87,7 +115,7 @@ def verification_key_file(temp_dir):
     return vk_path
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def proof_file(temp_dir):
     """Create a dummy proof file"""
     proof_data = {
@@ -96,22 +124,20 @@ def proof_file(temp_dir):
         "c": ["0x3333", "0x4444"]
     }
     proof_path = os.path.join(temp_dir, "proof.json")
-    with open(proof_path, "w") as f:
-        json.dump(proof_data, f)
+    Path(proof_path).write_text(json.dumps(proof_data, separators=(",", ":")))
     return proof_path, proof_data
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def public_inputs_file(temp_dir):
     """Create a dummy public inputs file"""
     public_inputs_data = {"c": 12}
     public_inputs_path = os.path.join(temp_dir, "public.json")
-    with open(public_inputs_path, "w") as f:
-        json.dump(public_inputs_data, f)
+    Path(public_inputs_path).write_text(json.dumps(public_inputs_data, separators=(",", ":")))
     return public_inputs_path, public_inputs_data
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def contract_file(temp_dir):
     """Create a dummy Solidity verifier contract file"""
     contract_path = os.path.join(temp_dir, "LlamaVerifier.sol")
@@ -182,13 +208,25 @@ def contract_file(temp_dir):
     return contract_path
 
 
+@pytest.fixture(scope="session")
+def api_client():
+    """Create one API test client for the whole session"""
+    from fastapi.testclient import TestClient
+    
+    from llamaverifier.api.server import app
+    
+    # Not entered as a context manager: that would run the startup hooks
+    # and start real ZoKrates workers underneath the mocked tests
+    return TestClient(app)
+
+
 @pytest.fixture
 def mock_subprocess_run():
     """Mock subprocess.run to return success"""
     with mock.patch("subprocess.run") as mock_run:
         mock_run.return_value = mock.Mock(
             returncode=0,
-            stdout="Success",
+            stdout=b"PASSED\nVERIFICATION SUCCESSFUL\n",
             stderr=""
         )
         yield mock_run
@@ -1,58 +1,58 @@
 """
 Tests for the API server module
 """
+import asyncio
+import io
 import os
-import json
-import tempfile
 from unittest import TestCase, mock
-from fastapi.testclient import TestClient
 
 import pytest
 
-from llamaverifier.api.server import app, VerificationRequest
+from llamaverifier.api.server import ArtifactStore, VerificationRequest
 
 
+# Uploaded file contents, held in memory so tests never reread them from disk
+MODEL_BYTES = b"# Dummy model file\nparam_1=1\nparam_2=2\n"
+CIRCUIT_BYTES = (
+    b"def main(private field a, private field b, public field c) -> bool:\n"
+    b"    return a * b == c\n"
+)
+
+
+@pytest.fixture(scope="class")
+def bind_api_client(request, api_client):
+    """Expose the session API client to a TestCase class as self.client"""
+    request.cls.client = api_client
+
+
+@pytest.mark.usefixtures("bind_api_client")
 class TestAPIServer(TestCase):
     """Test cases for the API server"""
     
-    def setUp(self):
-        """Set up test fixtures"""
-        self.client = TestClient(app)
-        
-        # Create a temporary directory for test files
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.addCleanup(self.temp_dir.cleanup)
-        
-        # Create a dummy model file
-        self.model_path = os.path.join(self.temp_dir.name, "model.txt")
-        with open(self.model_path, "w") as f:
-            f.write("# Dummy model file\n")
-            f.write("param_1=1\n")
-            f.write("param_2=2\n")
-        
-        # Create a dummy input file
-        self.input_data = {"input": [1, 2, 3]}
-        self.input_path = os.path.join(self.temp_dir.name, "input.json")
-        with open(self.input_path, "w") as f:
-            json.dump(self.input_data, f)
-        
-        # Create a dummy output file
-        self.output_data = {"output": [3, 2, 1]}
-        self.output_path = os.path.join(self.temp_dir.name, "output.json")
-        with open(self.output_path, "w") as f:
-            json.dump(self.output_data, f)
-        
-        # Create a dummy circuit file
-        self.circuit_path = os.path.join(self.temp_dir.name, "circuit.zok")
-        with open(self.circuit_path, "w") as f:
-            f.write("def main(private field a, private field b, public field c) -> bool:\n")
-            f.write("    return a * b == c\n")
+    # Witness values; the generate-proof endpoint takes them as the body
+    witness_values = ["1", "2", "3", "6"]
+    
+    @pytest.fixture(autouse=True)
+    def _set_up(self, tmp_path):
+        """Set up test fixtures
+        
+        Artifacts the mocked proof system returns are written to pytest's
+        per-test directory.
+        """
+        self.temp_dir = str(tmp_path)
+    
+    def _write(self, name: str, data: bytes) -> str:
+        """Write an artifact file and return its path"""
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
     
     def test_root_endpoint(self):
         """Test root endpoint"""
         response = self.client.get("/")
         self.assertEqual(response.status_code, 200)
-        self.assertIn("Welcome to LlamaVerifier API", response.json()["message"])
+        self.assertIn("Welcome to the LlamaVerifier API", response.json()["message"])
     
     def test_info_endpoint(self):
         """Test info endpoint"""
@@ -61,213 +61,239 @@ class TestAPIServer(TestCase):
         self.assertIn("version", response.json())
         self.assertIn("system_info", response.json())
     
-    @mock.patch("llamaverifier.api.server.ZKPCompiler")
-    def test_compile_endpoint(self, mock_compiler_class):
+    @mock.patch("llamaverifier.api.server.zokrates_pool")
+    def test_compile_endpoint(self, mock_pool):
         """Test compile endpoint"""
-        # Mock the compiler
-        mock_compiler = mock.MagicMock()
-        mock_compiler.compile_model.return_value = True
-        mock_compiler_class.return_value = mock_compiler
-        
-        # Create test files
-        with open(self.model_path, "rb") as model_file:
-            # Test the endpoint
+        # Mock the worker pool
+        mock_pool.submit = mock.AsyncMock(return_value=True)
+        
+        # Test the endpoint
+        response = self.client.post(
+            "/compile",
+            files={
+                "model_file": ("model.txt", io.BytesIO(b"# Compiled model\nparam_1=1\n"), "text/plain")
+            },
+            data={
+                "model_type": "generic",
+                "optimization_level": "1"
+            }
+        )
+        
+        # Check response
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["circuit_id"].startswith("circuit_"))
+        self.assertEqual(response.json()["message"], "Model compiled successfully")
+        
+        # Check that the model was compiled on the pool
+        mock_pool.submit.assert_called_once()
+        self.assertEqual(mock_pool.submit.call_args[0][2:], ("generic", 1))
+    
+    @mock.patch("llamaverifier.api.server.zokrates_pool")
+    def test_compile_endpoint_deduplicates_uploads(self, mock_pool):
+        """Test that identical uploads are only compiled once"""
+        mock_pool.precompile = mock.AsyncMock(return_value=True)
+        mock_pool.submit = mock.AsyncMock(return_value=True)
+        
+        circuit_ids = []
+        for _ in range(2):
             response = self.client.post(
                 "/compile",
-                files={
-                    "model_file": ("model.txt", model_file, "text/plain")
-                },
-                data={
-                    "model_type": "generic",
-                    "optimization_level": "1"
-                }
+                files={"model_file": ("model.txt", io.BytesIO(MODEL_BYTES))},
+                data={"model_type": "generic", "optimization_level": "1"}
             )
+            self.assertEqual(response.status_code, 200)
+            circuit_ids.append(response.json()["circuit_id"])
+        
+        # Check that the second upload reused the first circuit
+        self.assertEqual(circuit_ids[0], circuit_ids[1])
+        self.assertIn("cached", response.json()["message"])
+        mock_pool.submit.assert_called_once()
+        mock_pool.precompile.assert_not_called()
+    
+    @mock.patch("llamaverifier.api.server.zokrates_pool")
+    def test_compile_endpoint_failure_cleanup(self, mock_pool):
+        """Test that a failed compilation removes the circuit and its side files"""
+        written = []
         
-        # Check response
-        self.assertEqual(response.status_code, 200)
-        self.assertIn("circuit_id", response.json())
-        self.assertTrue(response.json()["success"])
+        async def fake_submit(model_path, output_path, model_type, optimization_level):
+            for path in (output_path, f"{output_path}.abi.json", f"{output_path}.r1cs"):
+                with open(path, "w") as f:
+                    f.write("partial")
+                written.append(path)
+            return False
+        
+        mock_pool.submit = mock.AsyncMock(side_effect=fake_submit)
         
-        # Check that the compiler was called
-        mock_compiler.compile_model.assert_called_once()
+        response = self.client.post(
+            "/compile",
+            files={"model_file": ("model.txt", io.BytesIO(b"# Failing model\n"))},
+            data={"model_type": "generic", "optimization_level": "1"}
+        )
+        
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(len(written), 3)
+        for path in written:
+            self.assertFalse(os.path.exists(path))
+    
+    @mock.patch("llamaverifier.api.server.proof_system")
+    @mock.patch("llamaverifier.api.server.zokrates_pool")
+    def test_shutdown_removes_artifacts(self, mock_pool, mock_proof_system):
+        """Test that shutdown removes every stored artifact"""
+        from llamaverifier.api import server
+        
+        circuit_path = self._write("circuit.out", CIRCUIT_BYTES)
+        self._write("circuit.out.committed", b"1")
+        stores = (server.proofs, server.public_inputs, server.verification_keys, server.proving_keys)
+        server.circuits["shutdown-circuit"] = circuit_path
+        for index, store in enumerate(stores):
+            store[f"shutdown-{index}"] = self._write(f"artifact_{index}", b"data")
+        
+        asyncio.run(server.stop_workers())
+        
+        mock_pool.shutdown.assert_called_once()
+        mock_proof_system.close.assert_called_once()
+        self.assertEqual(os.listdir(self.temp_dir), [])
+        for store in (server.circuits, *stores):
+            self.assertEqual(len(store), 0)
     
-    @mock.patch("llamaverifier.api.server.ProofSystem")
-    def test_setup_endpoint(self, mock_proof_system_class):
+    @mock.patch("llamaverifier.api.server.proof_system")
+    def test_setup_endpoint(self, mock_proof_system):
         """Test setup endpoint"""
         # Mock the proof system
-        mock_proof_system = mock.MagicMock()
         mock_proof_system.setup.return_value = ("pk.key", "vk.key")
-        mock_proof_system_class.return_value = mock_proof_system
         
         # Add a circuit to the in-memory storage
-        with open(self.circuit_path, "rb") as circuit_file:
-            circuit_content = circuit_file.read()
-        
-        # Mock the circuits dictionary
-        from llamaverifier.api.server import circuits
-        circuit_id = "test-circuit-id"
-        circuits[circuit_id] = circuit_content
+        from llamaverifier.api.server import circuits, proving_keys, verification_keys
+        circuit_id = "test-setup-circuit"
+        circuits[circuit_id] = self._write("circuit.out", CIRCUIT_BYTES)
         
         # Test the endpoint
-        response = self.client.post(
-            f"/setup/{circuit_id}",
-            json={"scheme": "groth16"}
-        )
+        response = self.client.post(f"/setup/{circuit_id}", params={"scheme": "g16"})
         
         # Check response
         self.assertEqual(response.status_code, 200)
-        self.assertIn("proving_key_id", response.json())
-        self.assertIn("verification_key_id", response.json())
-        self.assertTrue(response.json()["success"])
+        self.assertEqual(response.json()["proving_key_id"], f"proving_key_{circuit_id}")
+        self.assertEqual(response.json()["verification_key_id"], f"verification_key_{circuit_id}")
+        self.assertEqual(proving_keys[f"proving_key_{circuit_id}"], "pk.key")
+        self.assertEqual(verification_keys[f"verification_key_{circuit_id}"], "vk.key")
         
         # Check that the proof system was called
-        mock_proof_system.setup.assert_called_once()
+        mock_proof_system.setup.assert_called_once_with(circuits[circuit_id], "g16")
+        
+        # Unknown circuits are rejected
+        self.assertEqual(self.client.post("/setup/missing-circuit").status_code, 404)
     
-    @mock.patch("llamaverifier.api.server.ProofSystem")
-    def test_generate_proof_endpoint(self, mock_proof_system_class):
+    @mock.patch("llamaverifier.api.server.proof_system")
+    def test_generate_proof_endpoint(self, mock_proof_system):
         """Test generate-proof endpoint"""
         # Mock the proof system
-        mock_proof_system = mock.MagicMock()
-        mock_proof_system.generate_proof.return_value = ("proof.json", "public.json")
-        mock_proof_system_class.return_value = mock_proof_system
-        
-        # Add a circuit and proving key to the in-memory storage
-        from llamaverifier.api.server import circuits, proving_keys
-        circuit_id = "test-circuit-id"
-        proving_key_id = "test-pk-id"
-        
-        with open(self.circuit_path, "rb") as circuit_file:
-            circuits[circuit_id] = circuit_file.read()
+        mock_proof_system.generate_proof.return_value = (
+            self._write("proof.json", b'{"proof": "dummy proof"}'),
+            self._write("public.json", b'{"c": 12}'),
+        )
         
-        proving_keys[proving_key_id] = b"dummy proving key"
+        # Add a circuit and its proving key to the in-memory storage
+        from llamaverifier.api.server import circuits, proofs, proving_keys, public_inputs
+        circuit_id = "test-proof-circuit"
+        circuits[circuit_id] = self._write("circuit.out", CIRCUIT_BYTES)
+        proving_keys[f"proving_key_{circuit_id}"] = self._write("pk.key", b"dummy proving key")
         
         # Test the endpoint
         response = self.client.post(
             f"/generate-proof/{circuit_id}",
-            json={
-                "witness": self.input_data,
-                "proving_key_id": proving_key_id,
-                "scheme": "groth16"
-            }
+            json=self.witness_values,
+            params={"scheme": "g16"}
         )
         
         # Check response
         self.assertEqual(response.status_code, 200)
-        self.assertIn("proof_id", response.json())
-        self.assertIn("public_inputs_id", response.json())
-        self.assertTrue(response.json()["success"])
+        self.assertIn(response.json()["proof_id"], proofs)
+        self.assertIn(response.json()["public_inputs_id"], public_inputs)
         
         # Check that the proof system was called
-        mock_proof_system.generate_proof.assert_called_once()
+        mock_proof_system.generate_proof.assert_called_once_with(
+            circuits[circuit_id],
+            proving_keys[f"proving_key_{circuit_id}"],
+            self.witness_values,
+            "g16"
+        )
     
-    @mock.patch("llamaverifier.api.server.ProofSystem")
-    def test_verify_endpoint(self, mock_proof_system_class):
+    @mock.patch("llamaverifier.api.server.proof_system")
+    def test_verify_endpoint(self, mock_proof_system):
         """Test verify endpoint"""
         # Mock the proof system
-        mock_proof_system = mock.MagicMock()
         mock_proof_system.verify_proof.return_value = True
-        mock_proof_system_class.return_value = mock_proof_system
         
         # Add verification key, proof, and public inputs to the in-memory storage
         from llamaverifier.api.server import verification_keys, proofs, public_inputs
-        verification_key_id = "test-vk-id"
+        circuit_id = "test-verify-circuit"
         proof_id = "test-proof-id"
         public_inputs_id = "test-public-id"
         
-        verification_keys[verification_key_id] = b"dummy verification key"
-        proofs[proof_id] = b'{"proof": "dummy proof"}'
-        public_inputs[public_inputs_id] = b'{"c": 12}'
+        verification_keys[f"verification_key_{circuit_id}"] = self._write("vk.key", b"dummy verification key")
+        proofs[proof_id] = self._write("proof.json", b'{"proof": "dummy proof"}')
+        public_inputs[public_inputs_id] = self._write("public.json", b'{"c": 12}')
         
         # Test the endpoint
-        response = self.client.post(
-            "/verify",
-            json={
-                "verification_key_id": verification_key_id,
-                "proof_id": proof_id,
-                "public_inputs_id": public_inputs_id,
-                "scheme": "groth16"
-            }
+        request = VerificationRequest(
+            circuit_id=circuit_id,
+            proof_id=proof_id,
+            public_inputs_id=public_inputs_id
         )
+        response = self.client.post("/verify", json=request.model_dump(), params={"scheme": "g16"})
         
         # Check response
         self.assertEqual(response.status_code, 200)
         self.assertTrue(response.json()["valid"])
-        self.assertTrue(response.json()["success"])
+        self.assertEqual(response.json()["message"], "Proof is valid")
         
         # Check that the proof system was called
-        mock_proof_system.verify_proof.assert_called_once()
+        mock_proof_system.verify_proof.assert_called_once_with(
+            verification_keys[f"verification_key_{circuit_id}"],
+            proofs[proof_id],
+            public_inputs[public_inputs_id],
+            "g16"
+        )
     
-    @mock.patch("llamaverifier.api.server.ProofSystem")
-    def test_export_verifier_endpoint(self, mock_proof_system_class):
+    @mock.patch("llamaverifier.api.server.proof_system")
+    def test_export_verifier_endpoint(self, mock_proof_system):
         """Test export-verifier endpoint"""
-        # Mock the proof system
-        mock_proof_system = mock.MagicMock()
-        mock_proof_system.export_verifier.return_value = "verifier.sol"
-        mock_proof_system_class.return_value = mock_proof_system
+        # Mock the proof system to write the contract where it is asked to
+        def export_verifier(verification_key_path, output_path, scheme):
+            with open(output_path, "w") as f:
+                f.write("contract Verifier {}")
+            return output_path
+        
+        mock_proof_system.export_verifier.side_effect = export_verifier
         
         # Add verification key to the in-memory storage
         from llamaverifier.api.server import verification_keys
-        verification_key_id = "test-vk-id"
-        
-        verification_keys[verification_key_id] = b"dummy verification key"
+        circuit_id = "test-export-circuit"
+        verification_keys[f"verification_key_{circuit_id}"] = self._write("vk.key", b"dummy verification key")
         
         # Test the endpoint
-        response = self.client.post(
-            f"/export-verifier/{verification_key_id}",
-            json={"scheme": "groth16"}
-        )
+        response = self.client.post(f"/export-verifier/{circuit_id}", params={"scheme": "g16"})
         
-        # Check response
+        # Check that the contract was streamed back
         self.assertEqual(response.status_code, 200)
-        self.assertIn("verifier_contract", response.json())
-        self.assertTrue(response.json()["success"])
-        
-        # Check that the proof system was called
+        self.assertEqual(response.text, "contract Verifier {}")
         mock_proof_system.export_verifier.assert_called_once()
-    
-    @mock.patch("llamaverifier.api.server.ZKPCompiler")
-    @mock.patch("llamaverifier.api.server.ProofSystem")
-    def test_verify_model_endpoint(self, mock_proof_system_class, mock_compiler_class):
-        """Test verify model endpoint (end-to-end)"""
-        # Mock the compiler
-        mock_compiler = mock.MagicMock()
-        mock_compiler.compile_model.return_value = True
-        mock_compiler_class.return_value = mock_compiler
-        
-        # Mock the proof system
-        mock_proof_system = mock.MagicMock()
-        mock_proof_system.setup.return_value = ("pk.key", "vk.key")
-        mock_proof_system.generate_proof.return_value = ("proof.json", "public.json")
-        mock_proof_system.verify_proof.return_value = True
-        mock_proof_system_class.return_value = mock_proof_system
-        
-        # Create the verification request
-        verification_request = VerificationRequest(
-            model_type="generic",
-            input_data=self.input_data,
-            expected_output=self.output_data,
-            scheme="groth16"
-        )
-        
-        # Test the endpoint
-        with open(self.model_path, "rb") as model_file:
-            response = self.client.post(
-                "/verify-model",
-                files={
-                    "model_file": ("model.txt", model_file, "text/plain")
-                },
-                data={
-                    "request": json.dumps(verification_request.dict())
-                }
-            )
         
-        # Check response
-        self.assertEqual(response.status_code, 200)
-        self.assertTrue(response.json()["valid"])
-        self.assertTrue(response.json()["success"])
-        
-        # Check that the compiler and proof system were called
-        mock_compiler.compile_model.assert_called_once()
-        mock_proof_system.setup.assert_called_once()
-        mock_proof_system.generate_proof.assert_called_once()
-        mock_proof_system.verify_proof.assert_called_once() 
\ No newline at end of file
+        # The temporary contract is removed once it has been sent
+        self.assertFalse(os.path.exists(mock_proof_system.export_verifier.call_args[0][1]))
+
+
+class TestArtifactStore(TestCase):
+    """Test cases for the sharded artifact store"""
+    
+    def test_store_operations(self):
+        """Test storing and looking up artifacts"""
+        store = ArtifactStore(num_shards=4)
+        store["circuit_a"] = "/tmp/a.out"
+        store["circuit_b"] = "/tmp/b.out"
+        
+        self.assertIn("circuit_a", store)
+        self.assertNotIn("circuit_c", store)
+        self.assertEqual(store["circuit_b"], "/tmp/b.out")
+        self.assertIsNone(store.get("circuit_c"))
+        self.assertEqual(len(store), 2)
@@ -2,250 +2,222 @@
 Tests for the CLI commands module
 """
 import os
-import tempfile
-from unittest import TestCase, mock
+from types import SimpleNamespace
+from unittest import mock
 from typer.testing import CliRunner
 
 import pytest
 
-from llamaverifier.cli.commands import app
-
-
-class TestCLICommands(TestCase):
-    """Test cases for the CLI commands"""
-    
-    def setUp(self):
-        """Set up test fixtures"""
-        self.runner = CliRunner()
-        
-        # Create a temporary directory for test files
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.addCleanup(self.temp_dir.cleanup)
-        
-        # Create a dummy model file
-        self.model_path = os.path.join(self.temp_dir.name, "model.txt")
-        with open(self.model_path, "w") as f:
-            f.write("# Dummy model file\n")
-            f.write("param_1=1\n")
-            f.write("param_2=2\n")
-        
-        # Create a dummy input file
-        self.input_path = os.path.join(self.temp_dir.name, "input.json")
-        with open(self.input_path, "w") as f:
-            f.write('{"input": [1, 2, 3]}\n')
-        
-        # Create a dummy output file
-        self.output_path = os.path.join(self.temp_dir.name, "output.json")
-        with open(self.output_path, "w") as f:
-            f.write('{"output": [3, 2, 1]}\n')
-        
-        # Create a dummy circuit file
-        self.circuit_path = os.path.join(self.temp_dir.name, "circuit.zok")
-        with open(self.circuit_path, "w") as f:
-            f.write("def main(private field a, private field b, public field c) -> bool:\n")
-            f.write("    return a * b == c\n")
-    
-    @mock.patch("llamaverifier.cli.commands.print_banner")
-    @mock.patch("llamaverifier.cli.commands.print_system_info")
-    def test_info_command(self, mock_print_system_info, mock_print_banner):
-        """Test info command"""
-        # Run the command
-        result = self.runner.invoke(app, ["info"])
-        
-        # Check result
-        self.assertEqual(result.exit_code, 0)
-        
-        # Check that the banner and system info were printed
-        mock_print_banner.assert_called_once()
-        mock_print_system_info.assert_called_once()
-    
-    @mock.patch("llamaverifier.cli.commands.ZKPCompiler")
-    def test_compile_command(self, mock_compiler_class):
-        """Test compile command"""
-        # Mock the compiler
-        mock_compiler = mock.MagicMock()
-        mock_compiler.compile_model.return_value = True
-        mock_compiler_class.return_value = mock_compiler
-        
-        # Run the command
-        result = self.runner.invoke(app, [
-            "compile",
-            "--model", self.model_path,
-            "--output", os.path.join(self.temp_dir.name, "circuit.out"),
-            "--model-type", "generic",
-            "--optimization", "1"
-        ])
-        
-        # Check result
-        self.assertEqual(result.exit_code, 0)
-        
-        # Check that the compiler was called
-        mock_compiler.compile_model.assert_called_once()
-    
-    @mock.patch("llamaverifier.cli.commands.ProofSystem")
-    def test_setup_command(self, mock_proof_system_class):
-        """Test setup command"""
-        # Mock the proof system
-        mock_proof_system = mock.MagicMock()
-        mock_proof_system.setup.return_value = ("pk.key", "vk.key")
-        mock_proof_system_class.return_value = mock_proof_system
-        
-        # Run the command
-        result = self.runner.invoke(app, [
-            "setup",
-            "--circuit", self.circuit_path,
-            "--output-dir", self.temp_dir.name,
-            "--scheme", "groth16"
-        ])
-        
-        # Check result
-        self.assertEqual(result.exit_code, 0)
-        
-        # Check that the proof system was called
-        mock_proof_system.setup.assert_called_once()
-    
-    @mock.patch("llamaverifier.cli.commands.ProofSystem")
-    def test_prove_command(self, mock_proof_system_class):
-        """Test prove command"""
-        # Mock the proof system
-        mock_proof_system = mock.MagicMock()
-        mock_proof_system.generate_proof.return_value = ("proof.json", "public.json")
-        mock_proof_system_class.return_value = mock_proof_system
-        
-        # Create dummy proving key
-        pk_path = os.path.join(self.temp_dir.name, "proving.key")
-        with open(pk_path, "w") as f:
-            f.write("dummy proving key")
-        
-        # Run the command
-        result = self.runner.invoke(app, [
-            "prove",
-            "--circuit", self.circuit_path,
-            "--witness", self.input_path,
-            "--proving-key", pk_path,
-            "--output-dir", self.temp_dir.name,
-            "--scheme", "groth16"
-        ])
-        
-        # Check result
-        self.assertEqual(result.exit_code, 0)
-        
-        # Check that the proof system was called
-        mock_proof_system.generate_proof.assert_called_once()
-    
-    @mock.patch("llamaverifier.cli.commands.ProofSystem")
-    def test_verify_proof_command(self, mock_proof_system_class):
-        """Test verify_proof command"""
-        # Mock the proof system
-        mock_proof_system = mock.MagicMock()
-        mock_proof_system.verify_proof.return_value = True
-        mock_proof_system_class.return_value = mock_proof_system
-        
-        # Create dummy verification key
-        vk_path = os.path.join(self.temp_dir.name, "verification.key")
-        with open(vk_path, "w") as f:
-            f.write("dummy verification key")
-        
-        # Create dummy proof
-        proof_path = os.path.join(self.temp_dir.name, "proof.json")
-        with open(proof_path, "w") as f:
-            f.write('{"proof": "dummy proof"}\n')
-        
-        # Create dummy public inputs
-        public_inputs_path = os.path.join(self.temp_dir.name, "public.json")
-        with open(public_inputs_path, "w") as f:
-            f.write('{"c": 12}\n')
-        
-        # Run the command
-        result = self.runner.invoke(app, [
-            "verify-proof",
-            "--verification-key", vk_path,
-            "--proof", proof_path,
-            "--public-inputs", public_inputs_path,
-            "--scheme", "groth16"
-        ])
-        
-        # Check result
-        self.assertEqual(result.exit_code, 0)
-        
-        # Check that the proof system was called
-        mock_proof_system.verify_proof.assert_called_once()
-    
-    @mock.patch("llamaverifier.cli.commands.ProofSystem")
-    def test_export_command(self, mock_proof_system_class):
-        """Test export command"""
-        # Mock the proof system
-        mock_proof_system = mock.MagicMock()
-        mock_proof_system.export_verifier.return_value = "verifier.sol"
-        mock_proof_system_class.return_value = mock_proof_system
-        
-        # Create dummy verification key
-        vk_path = os.path.join(self.temp_dir.name, "verification.key")
-        with open(vk_path, "w") as f:
-            f.write("dummy verification key")
-        
-        # Run the command
-        result = self.runner.invoke(app, [
-            "export",
-            "--verification-key", vk_path,
-            "--output-dir", self.temp_dir.name,
-            "--scheme", "groth16"
-        ])
-        
-        # Check result
-        self.assertEqual(result.exit_code, 0)
-        
-        # Check that the proof system was called
-        mock_proof_system.export_verifier.assert_called_once()
-    
-    @mock.patch("llamaverifier.cli.commands.ZKPCompiler")
-    @mock.patch("llamaverifier.cli.commands.ProofSystem")
-    def test_verify_command(self, mock_proof_system_class, mock_compiler_class):
-        """Test verify command (end-to-end)"""
-        # Mock the compiler
-        mock_compiler = mock.MagicMock()
-        mock_compiler.compile_model.return_value = True
-        mock_compiler_class.return_value = mock_compiler
-        
-        # Mock the proof system
-        mock_proof_system = mock.MagicMock()
-        mock_proof_system.setup.return_value = ("pk.key", "vk.key")
-        mock_proof_system.generate_proof.return_value = ("proof.json", "public.json")
-        mock_proof_system.verify_proof.return_value = True
-        mock_proof_system_class.return_value = mock_proof_system
-        
-        # Run the command
-        result = self.runner.invoke(app, [
-            "verify",
-            "--model", self.model_path,
-            "--input", self.input_path,
-            "--expected-output", self.output_path,
-            "--model-type", "generic",
-            "--scheme", "groth16",
-            "--output-dir", self.temp_dir.name
-        ])
-        
-        # Check result
-        self.assertEqual(result.exit_code, 0)
-        
-        # Check that the compiler and proof system were called
-        mock_compiler.compile_model.assert_called_once()
-        mock_proof_system.setup.assert_called_once()
-        mock_proof_system.generate_proof.assert_called_once()
-        mock_proof_system.verify_proof.assert_called_once()
-    
-    @mock.patch("llamaverifier.cli.commands.uvicorn.run")
-    def test_server_command(self, mock_run):
-        """Test server command"""
-        # Run the command
-        result = self.runner.invoke(app, [
-            "server",
-            "--host", "127.0.0.1",
-            "--port", "8000"
-        ])
-        
-        # Check result
-        self.assertEqual(result.exit_code, 0)
-        
-        # Check that uvicorn.run was called
-        mock_run.assert_called_once() 
\ No newline at end of file
+from llamaverifier.cli.commands import _one_benchmark_run, _read_values, _spinner, app
+
+
+# CliRunner keeps no state between invocations, so one serves every test
+_RUNNER = CliRunner()
+
+# Results returned by the stubbed collaborators' methods
+COMPILER_RESULTS = {"compile_model": True}
+PROOF_SYSTEM_RESULTS = {
+    "setup": ("pk.key", "vk.key"),
+    "generate_proof": ("proof.json", "public.json"),
+    "verify_proof": True,
+    "export_verifier": "verifier.sol",
+}
+
+# Command, arguments (formatted with the cli_paths entries) and the number
+# of calls each recorder must see
+COMMAND_CASES = [
+    ("info", [], {"print_banner": 1, "print_system_info": 1}),
+    ("compile", [
+        "{model}", "{circuit_out}",
+        "--model-type", "generic",
+        "--optimization-level", "1",
+    ], {"compile_model": 1}),
+    ("setup", [
+        "{circuit}", "{out}",
+        "--scheme", "g16",
+    ], {"setup": 1}),
+    ("prove", [
+        "{circuit}", "{pk}", "{input}", "{out}",
+        "--scheme", "g16",
+    ], {"generate_proof": 1}),
+    ("verify-proof", [
+        "{vk}", "{proof}", "{public}",
+        "--scheme", "g16",
+    ], {"verify_proof": 1}),
+    ("export", [
+        "{vk}", "{verifier_out}",
+        "--scheme", "g16",
+    ], {"export_verifier": 1}),
+    ("verify", [
+        "{model}", "{input}", "{output}",
+        "--model-type", "generic",
+        "--scheme", "g16",
+        "--output-dir", "{out}",
+    ], {"compile_model": 1, "setup": 1, "generate_proof": 1, "verify_proof": 1}),
+    ("server", [
+        "--host", "127.0.0.1",
+        "--port", "8000",
+    ], {"start_server": 1}),
+]
+
+COMPILER_TARGET = "llamaverifier.circuits.ZKPCompiler"
+PROOF_SYSTEM_TARGET = "llamaverifier.proofs.ProofSystem"
+FUNCTION_TARGETS = {
+    "print_banner": "llamaverifier.cli.commands.print_banner",
+    "print_system_info": "llamaverifier.cli.commands.print_system_info",
+    "start_server": "llamaverifier.api.server.start_server",
+}
+
+
+class _Recorder:
+    """Callable that counts its calls and returns a fixed value"""
+    
+    __slots__ = ("calls", "rv")
+    
+    def __init__(self, rv):
+        self.calls = 0
+        self.rv = rv
+    
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.rv
+
+
+def _stub(results):
+    """Build a collaborator whose methods record calls and return ``results``"""
+    return SimpleNamespace(**{name: _Recorder(rv) for name, rv in results.items()})
+
+
+@pytest.fixture(scope="module")
+def cli_paths(tmp_path_factory, model_file, input_file, output_file, circuit_file,
+              proving_key_file, verification_key_file, proof_file, public_inputs_file):
+    """Map the session's dummy files to the names used in COMMAND_CASES
+    
+    The commands under test are mocked and only read these files; anything
+    a test writes goes to the ``out`` directory.
+    """
+    out_dir = tmp_path_factory.mktemp("cli")
+    return {
+        "model": model_file,
+        "input": input_file[0],
+        "output": output_file[0],
+        "circuit": circuit_file,
+        "pk": proving_key_file,
+        "vk": verification_key_file,
+        "proof": proof_file[0],
+        "public": public_inputs_file[0],
+        "out": str(out_dir),
+        "circuit_out": str(out_dir / "circuit.out"),
+        "verifier_out": str(out_dir / "verifier.sol"),
+    }
+
+
+def _install_recorders(monkeypatch, names):
+    """Replace the commands' collaborators with call recorders
+    
+    The compiler and proof system are always stubbed; module functions are
+    only replaced when ``names`` refers to them.
+    """
+    compiler = _stub(COMPILER_RESULTS)
+    proof_system = _stub(PROOF_SYSTEM_RESULTS)
+    monkeypatch.setattr(COMPILER_TARGET, lambda *args, **kwargs: compiler)
+    monkeypatch.setattr(PROOF_SYSTEM_TARGET, lambda *args, **kwargs: proof_system)
+    
+    recorders = {**vars(compiler), **vars(proof_system)}
+    for name in names:
+        if name in FUNCTION_TARGETS:
+            recorders[name] = _Recorder(None)
+            monkeypatch.setattr(FUNCTION_TARGETS[name], recorders[name])
+    return recorders
+
+
+@pytest.mark.parametrize("command,args,expected_calls", COMMAND_CASES,
+                         ids=[case[0] for case in COMMAND_CASES])
+def test_command(command, args, expected_calls, cli_paths, monkeypatch):
+    """Test that each command exits cleanly and calls its collaborators"""
+    recorders = _install_recorders(monkeypatch, expected_calls)
+    result = _RUNNER.invoke(app, [command, *(arg.format_map(cli_paths) for arg in args)])
+    
+    assert result.exit_code == 0
+    for name, calls in expected_calls.items():
+        assert recorders[name].calls == calls, name
+
+
+def test_one_benchmark_run(tmp_path, model_file, monkeypatch):
+    """Test a single benchmark run"""
+    # The compiler class stays a Mock because its constructor call is checked
+    mock_compiler_class = mock.Mock(return_value=_stub(COMPILER_RESULTS))
+    monkeypatch.setattr(COMPILER_TARGET, mock_compiler_class)
+    monkeypatch.setattr(PROOF_SYSTEM_TARGET, lambda *args, **kwargs: _stub(PROOF_SYSTEM_RESULTS))
+    
+    result = _one_benchmark_run(
+        0,
+        temp_dir=str(tmp_path),
+        model_path=model_file,
+        witness_values=["1", "2", "3", "6"],
+        model_type="generic",
+        scheme="g16"
+    )
+    
+    # Check that every stage was timed in its own run directory
+    assert result["error"] is None
+    assert set(result["times"]) == {"compile", "setup", "prove", "verify"}
+    mock_compiler_class.assert_called_once_with(
+        workspace_dir=os.path.join(str(tmp_path), "run_0")
+    )
+
+
+def test_compile_failure_cleanup(tmp_path, model_file, monkeypatch):
+    """Test that a failed compile removes the files it wrote but keeps older ones"""
+    output = str(tmp_path / "circuit.out")
+    (tmp_path / "circuit.out.abi.json").write_text("earlier")
+    
+    def failing_compile(model_path, output_path, **kwargs):
+        for suffix in ("", ".committed", ".weights"):
+            with open(output_path + suffix, "w") as f:
+                f.write("partial")
+        return False
+    
+    monkeypatch.setattr(COMPILER_TARGET, lambda *args, **kwargs: SimpleNamespace(compile_model=failing_compile))
+    
+    result = _RUNNER.invoke(app, ["compile", model_file, output])
+    assert result.exit_code == 1
+    assert sorted(os.listdir(tmp_path)) == ["circuit.out.abi.json"]
+
+
+def test_benchmark_runs_sequentially(monkeypatch):
+    """Test that one untimed warm-up run precedes the timed runs in-process"""
+    started = []
+    
+    def fake_run(run, **kwargs):
+        started.append(run)
+        return {"times": {"compile": 0.5}, "error": None}
+    
+    monkeypatch.setattr("llamaverifier.cli.commands._one_benchmark_run", fake_run)
+    
+    result = _RUNNER.invoke(app, ["benchmark", "--runs", "2"])
+    assert result.exit_code == 0
+    assert started == [2, 0, 1]
+    assert result.output.count("Benchmarking compilation") == 2
+
+
+def test_read_values(tmp_path, monkeypatch):
+    """Test that small and memory-mapped witness files parse the same"""
+    witness_path = tmp_path / "witness.txt"
+    witness_path.write_bytes(b"1\n 2 \r\n\n3")
+    
+    expected = ["1", "2", "", "3"]
+    assert _read_values(str(witness_path)) == expected
+    monkeypatch.setattr("llamaverifier.cli.commands.MMAP_THRESHOLD", 0)
+    assert _read_values(str(witness_path)) == expected
+
+
+def test_spinner_skipped_when_piped(monkeypatch):
+    """Test that no spinner is started when stdout is not a terminal"""
+    mock_progress = mock.Mock()
+    monkeypatch.setattr("rich.progress.Progress", mock_progress)
+    monkeypatch.setattr("sys.stdout.isatty", lambda: False)
+    with _spinner("Working...", "work"):
+        pass
+    
+    mock_progress.assert_not_called()
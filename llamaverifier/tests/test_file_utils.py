@@ -0,0 +1,27 @@
+"""
+Tests for the file utility functions
+"""
+import os
+
+from llamaverifier.utils.file_utils import list_files
+
+
+def test_list_files_symlink_loop(tmp_path):
+    """Test that a symlink loop does not stop a recursive listing"""
+    sub = tmp_path / "a"
+    sub.mkdir()
+    (sub / "model.txt").write_text("w1=1\n")
+    os.symlink("..", sub / "loop")
+    
+    assert list_files(tmp_path, "*.txt", recursive=True) == [sub / "model.txt"]
+
+
+def test_list_files_pattern_with_directory(tmp_path):
+    """Test that patterns naming a directory keep their glob meaning"""
+    sub = tmp_path / "a"
+    sub.mkdir()
+    (sub / "model.txt").write_text("w1=1\n")
+    (tmp_path / "model.txt").write_text("w1=1\n")
+    
+    assert list_files(tmp_path, "a/*.txt") == [sub / "model.txt"]
+    assert sorted(list_files(tmp_path, "*.txt", recursive=True)) == [sub / "model.txt", tmp_path / "model.txt"]
@@ -1,122 +1,109 @@
 """
 Tests for the main module
 """
-import os
 import sys
-from unittest import TestCase, mock
 
 import pytest
 
 from llamaverifier.__main__ import main
 
 
-class TestMain(TestCase):
-    """Test cases for the main module"""
+# Command lines shared by the tests; installed with monkeypatch so sys.argv
+# is restored after each test
+_ARGV_BARE = ["llamaverifier"]
+_ARGV_INFO = ["llamaverifier", "info"]
+_ARGV_COMPILE = ["llamaverifier", "compile", "model.txt", "circuit.out"]
+_ARGV_SETUP = ["llamaverifier", "setup", "circuit.out", "keys"]
+_ARGV_PROVE = ["llamaverifier", "prove", "circuit.out", "pk.key", "witness.txt", "proofs"]
+_ARGV_VERIFY_PROOF = ["llamaverifier", "verify-proof", "vk.key", "proof.json", "public.json"]
+_ARGV_EXPORT = ["llamaverifier", "export", "vk.key", "verifier.sol"]
+_ARGV_SERVER = ["llamaverifier", "server", "--host", "127.0.0.1", "--port", "8000"]
+_ARGV_VERIFY = ["llamaverifier", "verify", "model.txt", "input.txt", "output.txt"]
+
+# Each command line with the arguments main() passes on, sliced once here
+# instead of in every assertion
+_ARGV_CASES = [
+    (argv, argv[1:])
+    for argv in (
+        _ARGV_INFO,
+        _ARGV_COMPILE,
+        _ARGV_SETUP,
+        _ARGV_PROVE,
+        _ARGV_VERIFY_PROOF,
+        _ARGV_EXPORT,
+        _ARGV_SERVER,
+        _ARGV_VERIFY,
+    )
+]
+
+
+class _AppRecorder:
+    """Stand-in for the Typer app that records how it was called"""
     
-    @mock.patch("llamaverifier.__main__.app")
-    def test_main(self, mock_app):
-        """Test main function"""
-        # Test main function with no arguments
-        sys.argv = ["llamaverifier"]
-        main()
-        mock_app.assert_called_once()
-        
-        # Reset mock
-        mock_app.reset_mock()
-        
-        # Test main function with arguments
-        sys.argv = ["llamaverifier", "info"]
-        main()
-        mock_app.assert_called_once_with(["info"])
+    __slots__ = ("args", "calls")
     
-    @mock.patch("llamaverifier.__main__.app")
-    def test_main_with_args(self, mock_app):
-        """Test main function with various arguments"""
-        # Test with info command
-        sys.argv = ["llamaverifier", "info"]
-        main()
-        mock_app.assert_called_once_with(["info"])
-        
-        # Reset mock
-        mock_app.reset_mock()
-        
-        # Test with compile command
-        sys.argv = ["llamaverifier", "compile", "--model", "model.txt"]
-        main()
-        mock_app.assert_called_once_with(["compile", "--model", "model.txt"])
-        
-        # Reset mock
-        mock_app.reset_mock()
-        
-        # Test with setup command
-        sys.argv = ["llamaverifier", "setup", "--circuit", "circuit.zok"]
-        main()
-        mock_app.assert_called_once_with(["setup", "--circuit", "circuit.zok"])
-        
-        # Reset mock
-        mock_app.reset_mock()
-        
-        # Test with prove command
-        sys.argv = ["llamaverifier", "prove", "--circuit", "circuit.zok", "--witness", "witness.json"]
-        main()
-        mock_app.assert_called_once_with(["prove", "--circuit", "circuit.zok", "--witness", "witness.json"])
-        
-        # Reset mock
-        mock_app.reset_mock()
-        
-        # Test with verify-proof command
-        sys.argv = ["llamaverifier", "verify-proof", "--verification-key", "vk.key", "--proof", "proof.json"]
-        main()
-        mock_app.assert_called_once_with(["verify-proof", "--verification-key", "vk.key", "--proof", "proof.json"])
-        
-        # Reset mock
-        mock_app.reset_mock()
-        
-        # Test with export command
-        sys.argv = ["llamaverifier", "export", "--verification-key", "vk.key"]
-        main()
-        mock_app.assert_called_once_with(["export", "--verification-key", "vk.key"])
-        
-        # Reset mock
-        mock_app.reset_mock()
-        
-        # Test with server command
-        sys.argv = ["llamaverifier", "server", "--host", "127.0.0.1", "--port", "8000"]
-        main()
-        mock_app.assert_called_once_with(["server", "--host", "127.0.0.1", "--port", "8000"])
-        
-        # Reset mock
-        mock_app.reset_mock()
-        
-        # Test with verify command (end-to-end)
-        sys.argv = ["llamaverifier", "verify", "--model", "model.txt", "--input", "input.json"]
-        main()
-        mock_app.assert_called_once_with(["verify", "--model", "model.txt", "--input", "input.json"])
+    def __init__(self):
+        self.args = None
+        self.calls = 0
     
-    @mock.patch("llamaverifier.__main__.app")
-    @mock.patch("sys.exit")
-    def test_main_exception(self, mock_exit, mock_app):
-        """Test main function with exception"""
-        # Mock app to raise an exception
-        mock_app.side_effect = Exception("Test exception")
-        
-        # Test main function with exception
-        sys.argv = ["llamaverifier"]
+    def __call__(self, *args):
+        self.args = args
+        self.calls += 1
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """Replace the Typer app with a recorder"""
+    recorder = _AppRecorder()
+    monkeypatch.setattr("llamaverifier.__main__.get_app", lambda: recorder)
+    return recorder
+
+
+def _raise(exc):
+    """Build a stand-in for the app that raises ``exc``"""
+    def app(*args):
+        raise exc
+    return app
+
+
+def test_main(app, monkeypatch):
+    """Test main function"""
+    # Test main function with no arguments
+    monkeypatch.setattr(sys, "argv", _ARGV_BARE)
+    main()
+    assert app.calls == 1
+    
+    # Without explicit arguments the app reads sys.argv itself
+    monkeypatch.setattr(sys, "argv", _ARGV_INFO)
+    main()
+    assert app.calls == 2 and app.args == ()
+
+
+@pytest.mark.parametrize("argv,expected_args", _ARGV_CASES)
+def test_main_with_args(argv, expected_args, app, monkeypatch):
+    """Test that main passes explicit arguments on to the app"""
+    monkeypatch.setattr(sys, "argv", argv)
+    main(expected_args)
+    assert app.calls == 1 and app.args == (expected_args,)
+
+
+def test_main_exception(monkeypatch):
+    """Test main function with exception"""
+    monkeypatch.setattr("llamaverifier.__main__.get_app", lambda: _raise(Exception("Test exception")))
+    monkeypatch.setattr(sys, "argv", _ARGV_BARE)
+    
+    # Check that main exits with code 1
+    with pytest.raises(SystemExit) as exc_info:
         main()
-        
-        # Check that sys.exit was called with code 1
-        mock_exit.assert_called_once_with(1)
+    assert exc_info.value.code == 1
+
+
+def test_main_keyboard_interrupt(monkeypatch):
+    """Test main function with KeyboardInterrupt"""
+    monkeypatch.setattr("llamaverifier.__main__.get_app", lambda: _raise(KeyboardInterrupt()))
+    monkeypatch.setattr(sys, "argv", _ARGV_BARE)
     
-    @mock.patch("llamaverifier.__main__.app")
-    @mock.patch("sys.exit")
-    def test_main_keyboard_interrupt(self, mock_exit, mock_app):
-        """Test main function with KeyboardInterrupt"""
-        # Mock app to raise a KeyboardInterrupt
-        mock_app.side_effect = KeyboardInterrupt()
-        
-        # Test main function with KeyboardInterrupt
-        sys.argv = ["llamaverifier"]
+    # Check that main exits with code 0
+    with pytest.raises(SystemExit) as exc_info:
         main()
-        
-        # Check that sys.exit was called with code 0
-        mock_exit.assert_called_once_with(0) 
\ No newline at end of file
+    assert exc_info.value.code == 0
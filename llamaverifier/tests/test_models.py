@@ -0,0 +1,113 @@
+"""
+Tests for the model classes
+"""
+import os
+from unittest import TestCase
+
+import pytest
+
+from llamaverifier.models import LinearModel
+
+
+class TestLinearModel(TestCase):
+    """Test cases for the LinearModel class"""
+    
+    @pytest.fixture(autouse=True)
+    def _set_up(self, tmp_path):
+        """Set up test fixtures"""
+        self.temp_dir = str(tmp_path)
+        
+        # Create a linear model with a missing weight
+        self.model_path = os.path.join(self.temp_dir, "model.txt")
+        with open(self.model_path, "w") as f:
+            f.write("# Linear model\n")
+            f.write("inputs=3\n")
+            f.write("w1=0.5\n")
+            f.write("\n")
+            f.write("  w3 = 2.0\n")
+            f.write("b=1.0\n")
+    
+    def test_load_model(self):
+        """Test parsing of the parameter file"""
+        model = LinearModel(self.model_path)
+        
+        self.assertEqual(model.parameters, {"inputs": 3.0, "w1": 0.5, "w3": 2.0, "b": 1.0})
+    
+    def test_load_model_invalid_line(self):
+        """Test that lines which are not comments or parameters are rejected"""
+        for line in ("w2 0.5", "w2 = 0.5 1.0"):
+            with open(self.model_path, "w") as f:
+                f.write(f"inputs=2\n{line}\n")
+            with self.assertRaises(ValueError):
+                LinearModel(self.model_path)
+    
+    def test_forward(self):
+        """Test the forward pass"""
+        model = LinearModel(self.model_path)
+        
+        result = model.forward({"inputs": [2.0, 7.0, 3.0]})
+        
+        self.assertEqual(result, {"output": [8.0]})
+        self.assertIsInstance(result["output"][0], float)
+    
+    def test_forward_dense(self):
+        """Test the forward pass of a model with every weight present"""
+        with open(self.model_path, "w") as f:
+            f.write("inputs=2\nw1=3.0\nw2=-1.0\n")
+        model = LinearModel(self.model_path)
+        
+        self.assertEqual(model.forward({"inputs": [2.0, 4.0]}), {"output": [2.0]})
+    
+    def test_forward_reduced_precision(self):
+        """Test the forward pass with float32 and int8 weights"""
+        inputs = {"inputs": [2.0, 7.0, 3.0]}
+        
+        for dtype in ("float32", "int8"):
+            model = LinearModel(self.model_path, dtype=dtype)
+            self.assertAlmostEqual(model.forward(inputs)["output"][0], 8.0, delta=0.1)
+            # The circuit keeps the exact weights
+            self.assertEqual(model.to_circuit(), LinearModel(self.model_path).to_circuit())
+        
+        with self.assertRaises(ValueError):
+            LinearModel(self.model_path, dtype="int4")
+    
+    def test_forward_wrong_input_count(self):
+        """Test the forward pass with the wrong number of inputs"""
+        model = LinearModel(self.model_path)
+        
+        with self.assertRaises(ValueError):
+            model.forward({"inputs": [1.0, 2.0]})
+        
+        with self.assertRaises(ValueError):
+            model.forward({"values": [1.0, 2.0, 3.0]})
+    
+    def test_to_circuit(self):
+        """Test conversion of the model to a ZoKrates circuit"""
+        model = LinearModel(self.model_path)
+        
+        self.assertEqual(
+            model.to_circuit(),
+            "def main(private field x1, private field x2, private field x3, public field y) -> bool {\n"
+            "    field result = 1.0 + 0.5 * x1 + 2.0 * x3;\n"
+            "    return result == y;\n"
+            "}"
+        )
+    
+    def test_to_circuit_memoized(self):
+        """Test that the circuit text is generated only once"""
+        model = LinearModel(self.model_path)
+        
+        first = model.to_circuit()
+        model.parameters["b"] = 5.0
+        
+        self.assertIs(model.to_circuit(), first)
+    
+    def test_write_circuit(self):
+        """Test writing the circuit straight to a file"""
+        model = LinearModel(self.model_path)
+        circuit_path = os.path.join(self.temp_dir, "model.zok")
+        
+        model.write_circuit(circuit_path)
+        
+        with open(circuit_path) as f:
+            self.assertEqual(f.read(), model.to_circuit())
@@ -1,8 +1,12 @@
 """
 Tests for the ProofSystem class
 """
+import asyncio
+import json
 import os
-import tempfile
+import shutil
+import stat
+import subprocess
 from unittest import TestCase, mock
 
 import pytest
@@ -14,24 +18,21 @@ from llamaverifier.proofs.schemes import SchemeType
 class TestProofSystem(TestCase):
     """Test cases for the ProofSystem class"""
     
-    def setUp(self):
-        """Set up test fixtures"""
+    @pytest.fixture(autouse=True)
+    def _set_up(self, tmp_path, monkeypatch, circuit_file, witness_file):
+        """Set up test fixtures
+        
+        The circuit and witness are the session's read-only dummy files;
+        anything a test writes goes to pytest's per-test directory. ZoKrates
+        is never run: the schemes' subprocess.run is replaced by one mock per
+        test, which tests configure through self.mock_run.
+        """
+        self.mock_run = mock.Mock(return_value=mock.Mock(returncode=0, stdout=b"", stderr=b""))
+        monkeypatch.setattr("llamaverifier.proofs.schemes.subprocess.run", self.mock_run)
         self.proof_system = ProofSystem()
-        
-        # Create a temporary directory for test files
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.addCleanup(self.temp_dir.cleanup)
-        
-        # Create a dummy circuit file
-        self.circuit_path = os.path.join(self.temp_dir.name, "circuit.zok")
-        with open(self.circuit_path, "w") as f:
-            f.write("def main(private field a, private field b, public field c) -> bool:\n")
-            f.write("    return a * b == c\n")
-        
-        # Create dummy witness values
-        self.witness_path = os.path.join(self.temp_dir.name, "witness.json")
-        with open(self.witness_path, "w") as f:
-            f.write('{"a": 3, "b": 4, "c": 12}\n')
+        self.temp_dir = str(tmp_path)
+        self.circuit_path = circuit_file
+        self.witness_path = witness_file[0]
     
     def test_init(self):
         """Test initialization of ProofSystem"""
@@ -39,19 +40,23 @@ class TestProofSystem(TestCase):
         self.assertIsNotNone(proof_system)
         
         # Test with workspace_dir
-        workspace_dir = os.path.join(self.temp_dir.name, "workspace")
+        workspace_dir = os.path.join(self.temp_dir, "workspace")
         proof_system = ProofSystem(workspace_dir=workspace_dir)
         self.assertEqual(proof_system.workspace_dir, workspace_dir)
-        
-        # Test with scheme
-        proof_system = ProofSystem(scheme="groth16")
-        self.assertEqual(proof_system.scheme, "groth16")
     
-    @mock.patch("llamaverifier.proofs.generator.subprocess.run")
-    def test_setup(self, mock_run):
+    def test_worker_reuse(self):
+        """Test that batch calls share one executor until the system is closed"""
+        with ProofSystem() as proof_system:
+            executor = proof_system._get_executor()
+            self.assertIs(proof_system._get_executor(), executor)
+        
+        self.assertIsNone(proof_system._executor)
+        self.assertTrue(executor._shutdown)
+    
+    def test_setup(self):
         """Test setup method"""
         # Mock subprocess.run to return success
-        mock_run.return_value = mock.Mock(
+        self.mock_run.return_value = mock.Mock(
             returncode=0,
             stdout="Setup successful",
             stderr=""
@@ -67,96 +72,91 @@ class TestProofSystem(TestCase):
         self.assertIsNotNone(vk_path)
         
         # Check that subprocess.run was called
-        mock_run.assert_called()
+        self.mock_run.assert_called()
     
-    @mock.patch("llamaverifier.proofs.generator.subprocess.run")
-    def test_setup_failure(self, mock_run):
+    def test_setup_failure(self):
         """Test setup failure"""
-        # Mock subprocess.run to return failure
-        mock_run.return_value = mock.Mock(
-            returncode=1,
-            stdout="",
-            stderr="Setup failed"
+        # Mock subprocess.run to fail like a checked ZoKrates run
+        self.mock_run.side_effect = subprocess.CalledProcessError(
+            1, ["zokrates", "setup"], output=b"", stderr=b"Setup failed"
         )
         
         # Test setup
         with self.assertRaises(RuntimeError):
             self.proof_system.setup(circuit_path=self.circuit_path)
     
-    @mock.patch("llamaverifier.proofs.generator.subprocess.run")
-    def test_generate_proof(self, mock_run):
+    def test_generate_proof(self):
         """Test generate_proof method"""
         # Mock subprocess.run to return success
-        mock_run.return_value = mock.Mock(
+        self.mock_run.return_value = mock.Mock(
             returncode=0,
             stdout="Proof generation successful",
             stderr=""
         )
         
         # Create dummy proving key
-        pk_path = os.path.join(self.temp_dir.name, "proving.key")
+        pk_path = os.path.join(self.temp_dir, "proving.key")
         with open(pk_path, "w") as f:
             f.write("dummy proving key")
         
         # Test generate_proof
-        proof_path, public_inputs_path = self.proof_system.generate_proof(
-            circuit_path=self.circuit_path,
-            witness_path=self.witness_path,
-            proving_key_path=pk_path
-        )
+        with mock.patch("llamaverifier.proofs.schemes._run_with_stdin_lines") as mock_witness:
+            proof_path, public_inputs_path = self.proof_system.generate_proof(
+                circuit_path=self.circuit_path,
+                proving_key_path=pk_path,
+                witness_values=["3", "4", "12"]
+            )
         
         # Check result
         self.assertIsNotNone(proof_path)
         self.assertIsNotNone(public_inputs_path)
         
-        # Check that subprocess.run was called
-        mock_run.assert_called()
+        # Check that the witness was computed and the proof generated
+        mock_witness.assert_called_once()
+        self.mock_run.assert_called()
     
-    @mock.patch("llamaverifier.proofs.generator.subprocess.run")
-    def test_generate_proof_failure(self, mock_run):
+    def test_generate_proof_failure(self):
         """Test generate_proof failure"""
-        # Mock subprocess.run to return failure
-        mock_run.return_value = mock.Mock(
-            returncode=1,
-            stdout="",
-            stderr="Proof generation failed"
+        # Mock subprocess.run to fail like a checked ZoKrates run
+        self.mock_run.side_effect = subprocess.CalledProcessError(
+            1, ["zokrates", "generate-proof"], output=b"", stderr=b"Proof generation failed"
         )
         
         # Create dummy proving key
-        pk_path = os.path.join(self.temp_dir.name, "proving.key")
+        pk_path = os.path.join(self.temp_dir, "proving.key")
         with open(pk_path, "w") as f:
             f.write("dummy proving key")
         
         # Test generate_proof
-        with self.assertRaises(RuntimeError):
+        with mock.patch("llamaverifier.proofs.schemes._run_with_stdin_lines"), \
+                self.assertRaises(RuntimeError):
             self.proof_system.generate_proof(
                 circuit_path=self.circuit_path,
-                witness_path=self.witness_path,
-                proving_key_path=pk_path
+                proving_key_path=pk_path,
+                witness_values=["3", "4", "12"]
             )
     
-    @mock.patch("llamaverifier.proofs.generator.subprocess.run")
-    def test_verify_proof(self, mock_run):
+    def test_verify_proof(self):
         """Test verify_proof method"""
         # Mock subprocess.run to return success
-        mock_run.return_value = mock.Mock(
+        self.mock_run.return_value = mock.Mock(
             returncode=0,
-            stdout="Verification successful",
-            stderr=""
+            stdout=b"PASSED\nVERIFICATION SUCCESSFUL\n",
+            stderr=b""
         )
         
         # Create dummy verification key
-        vk_path = os.path.join(self.temp_dir.name, "verification.key")
+        vk_path = os.path.join(self.temp_dir, "verification.key")
         with open(vk_path, "w") as f:
             f.write("dummy verification key")
         
         # Create dummy proof
-        proof_path = os.path.join(self.temp_dir.name, "proof.json")
+        proof_path = os.path.join(self.temp_dir, "proof.json")
         with open(proof_path, "w") as f:
             f.write('{"proof": "dummy proof"}\n')
         
         # Create dummy public inputs
-        public_inputs_path = os.path.join(self.temp_dir.name, "public.json")
+        public_inputs_path = os.path.join(self.temp_dir, "public.json")
         with open(public_inputs_path, "w") as f:
             f.write('{"c": 12}\n')
         
@@ -171,30 +171,29 @@ class TestProofSystem(TestCase):
         self.assertTrue(result)
         
         # Check that subprocess.run was called
-        mock_run.assert_called()
+        self.mock_run.assert_called()
     
-    @mock.patch("llamaverifier.proofs.generator.subprocess.run")
-    def test_verify_proof_failure(self, mock_run):
+    def test_verify_proof_failure(self):
         """Test verify_proof failure"""
         # Mock subprocess.run to return failure
-        mock_run.return_value = mock.Mock(
+        self.mock_run.return_value = mock.Mock(
             returncode=1,
             stdout="",
             stderr="Verification failed"
         )
         
         # Create dummy verification key
-        vk_path = os.path.join(self.temp_dir.name, "verification.key")
+        vk_path = os.path.join(self.temp_dir, "verification.key")
         with open(vk_path, "w") as f:
             f.write("dummy verification key")
         
         # Create dummy proof
-        proof_path = os.path.join(self.temp_dir.name, "proof.json")
+        proof_path = os.path.join(self.temp_dir, "proof.json")
         with open(proof_path, "w") as f:
             f.write('{"proof": "dummy proof"}\n')
         
         # Create dummy public inputs
-        public_inputs_path = os.path.join(self.temp_dir.name, "public.json")
+        public_inputs_path = os.path.join(self.temp_dir, "public.json")
         with open(public_inputs_path, "w") as f:
             f.write('{"c": 12}\n')
         
@@ -208,55 +207,425 @@ class TestProofSystem(TestCase):
         # Check result
         self.assertFalse(result)
     
-    @mock.patch("llamaverifier.proofs.generator.subprocess.run")
-    def test_export_verifier(self, mock_run):
+    def test_export_verifier(self):
         """Test export_verifier method"""
         # Mock subprocess.run to return success
-        mock_run.return_value = mock.Mock(
+        self.mock_run.return_value = mock.Mock(
             returncode=0,
             stdout="Export successful",
             stderr=""
         )
         
         # Create dummy verification key
-        vk_path = os.path.join(self.temp_dir.name, "verification.key")
+        vk_path = os.path.join(self.temp_dir, "verification.key")
         with open(vk_path, "w") as f:
             f.write("dummy verification key")
         
         # Test export_verifier
+        output_path = os.path.join(self.temp_dir, "verifier.sol")
         verifier_path = self.proof_system.export_verifier(
-            verification_key_path=vk_path
+            verification_key_path=vk_path,
+            output_path=output_path
         )
         
         # Check result
-        self.assertIsNotNone(verifier_path)
+        self.assertEqual(verifier_path, output_path)
         
         # Check that subprocess.run was called
-        mock_run.assert_called()
+        self.mock_run.assert_called()
     
-    @mock.patch("llamaverifier.proofs.generator.subprocess.run")
-    def test_export_verifier_failure(self, mock_run):
+    def test_export_verifier_failure(self):
         """Test export_verifier failure"""
-        # Mock subprocess.run to return failure
-        mock_run.return_value = mock.Mock(
-            returncode=1,
-            stdout="",
-            stderr="Export failed"
+        # Mock subprocess.run to fail like a checked ZoKrates run
+        self.mock_run.side_effect = subprocess.CalledProcessError(
+            1, ["zokrates", "export-verifier"], output="", stderr="Export failed"
         )
         
         # Create dummy verification key
-        vk_path = os.path.join(self.temp_dir.name, "verification.key")
+        vk_path = os.path.join(self.temp_dir, "verification.key")
         with open(vk_path, "w") as f:
             f.write("dummy verification key")
         
         # Test export_verifier
         with self.assertRaises(RuntimeError):
             self.proof_system.export_verifier(
-                verification_key_path=vk_path
+                verification_key_path=vk_path,
+                output_path=os.path.join(self.temp_dir, "verifier.sol")
+            )
+    
+    @mock.patch("llamaverifier.proofs.generator.get_scheme")
+    def test_scheme_cached(self, mock_get_scheme):
+        """Test that the scheme implementation is created once per scheme"""
+        first = self.proof_system._get_scheme("g16")
+        second = self.proof_system._get_scheme("g16")
+        
+        self.assertIs(first, second)
+        mock_get_scheme.assert_called_once_with("g16")
+    
+    def test_setup_cached(self):
+        """Test that repeated setup of an unchanged circuit reuses the keys"""
+        proof_system = ProofSystem(workspace_dir=self.temp_dir)
+        
+        def fake_setup(circuit_path, pk_out, vk_out):
+            for path in (pk_out, vk_out):
+                with open(path, "w") as f:
+                    f.write("key")
+            return pk_out, vk_out
+        
+        scheme_impl = mock.Mock(spec=["setup"])
+        scheme_impl.setup.side_effect = fake_setup
+        
+        with mock.patch("llamaverifier.proofs.generator.get_scheme", return_value=scheme_impl):
+            first = proof_system.setup(self.circuit_path)
+            os.unlink(first[0])
+            second = proof_system.setup(self.circuit_path)
+            proof_system.setup(self.circuit_path, force=True)
+        
+        self.assertEqual(first, second)
+        self.assertTrue(os.path.exists(second[0]))
+        self.assertEqual(scheme_impl.setup.call_count, 2)
+    
+    def test_setup_shared_cache_dir(self):
+        """Test that workspaces sharing a cache directory reuse each other's keys"""
+        cache_dir = os.path.join(self.temp_dir, "keys")
+        
+        def fake_setup(circuit_path, pk_out, vk_out):
+            for path in (pk_out, vk_out):
+                with open(path, "w") as f:
+                    f.write("key")
+            return pk_out, vk_out
+        
+        scheme_impl = mock.Mock(spec=["setup"])
+        scheme_impl.setup.side_effect = fake_setup
+        
+        with mock.patch("llamaverifier.proofs.generator.get_scheme", return_value=scheme_impl):
+            for workspace in ("first", "second"):
+                proof_system = ProofSystem(workspace_dir=os.path.join(self.temp_dir, workspace))
+                pk_path, vk_path = proof_system.setup(self.circuit_path, cache_dir=cache_dir)
+                self.assertTrue(os.path.exists(pk_path))
+                self.assertTrue(os.path.exists(vk_path))
+        
+        self.assertEqual(scheme_impl.setup.call_count, 1)
+    
+    def test_setup_not_cached_by_default(self):
+        """Test that setup without a workspace or cache directory caches nothing"""
+        def fake_setup(circuit_path, pk_out, vk_out):
+            for path in (pk_out, vk_out):
+                with open(path, "w") as f:
+                    f.write("key")
+            return pk_out, vk_out
+        
+        scheme_impl = mock.Mock(spec=["setup"])
+        scheme_impl.setup.side_effect = fake_setup
+        
+        with mock.patch("llamaverifier.proofs.generator.get_scheme", return_value=scheme_impl), \
+             mock.patch("llamaverifier.proofs.generator.hash_file") as mock_hash:
+            for _ in range(2):
+                for path in self.proof_system.setup(self.circuit_path):
+                    os.unlink(path)
+        
+        self.assertEqual(scheme_impl.setup.call_count, 2)
+        mock_hash.assert_not_called()
+    
+    def test_setup_cache_not_private(self):
+        """Test that keys in a cache directory others can write to are not reused"""
+        cache_dir = os.path.join(self.temp_dir, "keys")
+        
+        def fake_setup(circuit_path, pk_out, vk_out):
+            for path in (pk_out, vk_out):
+                with open(path, "w") as f:
+                    f.write("key")
+            return pk_out, vk_out
+        
+        scheme_impl = mock.Mock(spec=["setup"])
+        scheme_impl.setup.side_effect = fake_setup
+        proof_system = ProofSystem(workspace_dir=self.temp_dir)
+        
+        with mock.patch("llamaverifier.proofs.generator.get_scheme", return_value=scheme_impl):
+            proof_system.setup(self.circuit_path, cache_dir=cache_dir)
+            self.assertEqual(stat.S_IMODE(os.stat(cache_dir).st_mode) & 0o077, 0)
+            
+            os.chmod(cache_dir, 0o777)
+            proof_system.setup(self.circuit_path, cache_dir=cache_dir)
+        
+        self.assertEqual(scheme_impl.setup.call_count, 2)
+    
+    def test_generate_proofs_batch(self):
+        """Test batch proof generation against a single circuit"""
+        proof_system = ProofSystem(workspace_dir=self.temp_dir)
+        pk_path = os.path.join(self.temp_dir, "proving.key")
+        with open(pk_path, "w") as f:
+            f.write("dummy proving key")
+        
+        def fake_generate_proofs_batch(jobs, max_workers=None):
+            for job in jobs:
+                for path in (job.proof_out, job.public_out):
+                    with open(path, "w") as f:
+                        f.write(job.witness_values[0])
+            return [(job.proof_out, job.public_out) for job in jobs]
+        
+        scheme_impl = mock.Mock(spec=["generate_proofs_batch"])
+        scheme_impl.generate_proofs_batch.side_effect = fake_generate_proofs_batch
+        
+        with mock.patch("llamaverifier.proofs.generator.get_scheme", return_value=scheme_impl) as mock_get_scheme, \
+             mock.patch("llamaverifier.proofs.generator.prefetch_file") as mock_prefetch:
+            results = proof_system.generate_proofs_batch(
+                circuit_path=self.circuit_path,
+                proving_key_path=pk_path,
+                witnesses=[["1"], ["2"], ["3"]],
+            )
+        
+        mock_get_scheme.assert_called_once_with("g16")
+        mock_prefetch.assert_called_once_with(pk_path)
+        scheme_impl.generate_proofs_batch.assert_called_once()
+        self.assertEqual(len(results), 3)
+        for i, (proof_path, public_path) in enumerate(results):
+            self.assertEqual(proof_path, os.path.join(self.temp_dir, f"circuit.{i}.g16.proof"))
+            with open(proof_path) as f:
+                self.assertEqual(f.read(), str(i + 1))
+            self.assertTrue(os.path.exists(public_path))
+        
+        # Proofs are staged and moved into place, leaving no partial files
+        self.assertFalse([name for name in os.listdir(self.temp_dir) if name.endswith(".tmp")])
+        proof_system.close()
+    
+    def test_generate_proofs_batch_failure(self):
+        """Test that a failed proof stops the batch"""
+        proof_system = ProofSystem(workspace_dir=self.temp_dir)
+        self.addCleanup(proof_system.close)
+        pk_path = os.path.join(self.temp_dir, "proving.key")
+        with open(pk_path, "w") as f:
+            f.write("dummy proving key")
+        
+        scheme_impl = mock.Mock(spec=["generate_proofs_batch"])
+        scheme_impl.generate_proofs_batch.side_effect = RuntimeError("prover crashed")
+        
+        with mock.patch("llamaverifier.proofs.generator.get_scheme", return_value=scheme_impl):
+            with self.assertRaises(RuntimeError):
+                proof_system.generate_proofs_batch(
+                    circuit_path=self.circuit_path,
+                    proving_key_path=pk_path,
+                    witnesses=[["1"], ["2"]],
+                    max_workers=1,
+                )
+        
+        # No staged or published proofs are left behind
+        self.assertFalse([name for name in os.listdir(self.temp_dir) if name.endswith((".proof", ".public", ".tmp"))])
+    
+    def test_generate_proof_witness_arity(self):
+        """Test that witnesses are checked against the circuit ABI before proving"""
+        pk_path = os.path.join(self.temp_dir, "proving.key")
+        with open(pk_path, "w") as f:
+            f.write("dummy proving key")
+        
+        # The ABI is read from next to the circuit, so use a private copy
+        circuit_path = os.path.join(self.temp_dir, "circuit.zok")
+        shutil.copyfile(self.circuit_path, circuit_path)
+        with open(f"{circuit_path}.abi.json", "w") as f:
+            f.write(json.dumps({
+                "inputs": [
+                    {"name": "a", "public": False, "type": "field"},
+                    {"name": "w", "public": False, "type": "array",
+                     "components": {"size": 2, "type": "field"}},
+                ],
+                "outputs": [],
+            }))
+        
+        with mock.patch("llamaverifier.proofs.generator.get_scheme") as mock_get_scheme:
+            with self.assertRaises(ValueError):
+                self.proof_system.generate_proof(circuit_path, pk_path, ["1", "2"])
+        
+        mock_get_scheme.assert_not_called()
+    
+    def test_verify_proofs_batch(self):
+        """Test verifying several proofs against one verification key"""
+        paths = {}
+        for name in ("vk", "a.proof", "a.public", "b.proof", "b.public"):
+            paths[name] = os.path.join(self.temp_dir, name)
+            with open(paths[name], "w") as f:
+                f.write(name)
+        self.addCleanup(self.proof_system.close)
+        
+        scheme_impl = mock.Mock(spec=["verify_proof"])
+        scheme_impl.verify_proof.side_effect = lambda vk, proof, public: proof == paths["a.proof"]
+        
+        with mock.patch("llamaverifier.proofs.generator.get_scheme", return_value=scheme_impl):
+            results = self.proof_system.verify_proofs_batch(
+                paths["vk"],
+                [(paths["a.proof"], paths["a.public"]), (paths["b.proof"], paths["b.public"])],
+            )
+        
+        self.assertEqual(results, [True, False])
+    
+    def test_verify_proof_cached(self):
+        """Test that only valid verifications are served from the cache"""
+        paths = {}
+        for name in ("vk", "proof", "public"):
+            paths[name] = os.path.join(self.temp_dir, name)
+            with open(paths[name], "w") as f:
+                f.write(name)
+        
+        scheme_impl = mock.Mock(spec=["verify_proof"])
+        scheme_impl.verify_proof.return_value = False
+        
+        with mock.patch("llamaverifier.proofs.generator.get_scheme", return_value=scheme_impl):
+            # Invalid results are checked again
+            self.assertFalse(self.proof_system.verify_proof(paths["vk"], paths["proof"], paths["public"]))
+            scheme_impl.verify_proof.return_value = True
+            self.assertTrue(self.proof_system.verify_proof(paths["vk"], paths["proof"], paths["public"]))
+            self.assertTrue(self.proof_system.verify_proof(paths["vk"], paths["proof"], paths["public"]))
+            
+            # Changing the proof's content misses the cache
+            with open(paths["proof"], "w") as f:
+                f.write("other proof")
+            self.proof_system.verify_proof(paths["vk"], paths["proof"], paths["public"])
+        
+        self.assertEqual(scheme_impl.verify_proof.call_count, 3)
+    
+    def test_verify_proofs_batch_own_keys(self):
+        """Test verifying proofs that each carry their own verification key"""
+        paths = {}
+        for name in ("vk", "other.vk", "a.proof", "a.public", "b.proof", "b.public"):
+            paths[name] = os.path.join(self.temp_dir, name)
+            with open(paths[name], "w") as f:
+                f.write(name)
+        self.addCleanup(self.proof_system.close)
+        triples = [
+            (paths["vk"], paths["a.proof"], paths["a.public"]),
+            (paths["other.vk"], paths["b.proof"], paths["b.public"]),
+        ]
+        
+        scheme_impl = mock.Mock(spec=["verify_proof"])
+        scheme_impl.verify_proof.side_effect = lambda vk, proof, public: vk == paths["vk"]
+        
+        with mock.patch("llamaverifier.proofs.generator.get_scheme", return_value=scheme_impl):
+            self.assertEqual(self.proof_system.verify_proofs_batch(None, triples), [True, False])
+            self.assertEqual(scheme_impl.verify_proof.call_count, 2)
+            
+            # Only the invalid proof is verified again
+            self.assertEqual(self.proof_system.verify_proofs_batch(None, triples), [True, False])
+            scheme_impl.verify_proof.assert_called_with(*triples[1])
+            
+            # A batch of cache hits never reaches the scheme
+            self.assertEqual(self.proof_system.verify_proofs_batch(None, triples[:1]), [True])
+        
+        self.assertEqual(scheme_impl.verify_proof.call_count, 3)
+    
+    @mock.patch("llamaverifier.proofs.schemes.subprocess.Popen")
+    @mock.patch("llamaverifier.proofs.schemes.subprocess.run")
+    def test_scheme_batch_pipeline(self, mock_run, mock_popen):
+        """Test that a scheme batch computes each witness before proving it"""
+        from llamaverifier.proofs.schemes import Groth16Scheme
+        
+        witness_paths = []
+        witness_inputs = []
+        
+        def fake_popen(cmd, **kwargs):
+            self.assertEqual(cmd[1], "compute-witness")
+            witness_paths.append(cmd[cmd.index("-o") + 1])
+            proc = mock.MagicMock()
+            proc.__enter__.return_value = proc
+            proc.stdin.write.side_effect = witness_inputs.append
+            proc.wait.return_value = 0
+            return proc
+        
+        def fake_run(cmd, **kwargs):
+            self.assertIn(cmd[cmd.index("--witness-path") + 1], witness_paths)
+            return mock.Mock(returncode=0, stdout="", stderr="")
+        
+        mock_popen.side_effect = fake_popen
+        mock_run.side_effect = fake_run
+        proof_paths = [os.path.join(self.temp_dir, f"{i}.proof") for i in range(3)]
+        jobs = [
+            (self.circuit_path, "proving.key", [str(i)], proof_paths[i], f"{proof_paths[i]}.public")
+            for i in range(3)
+        ]
+        
+        results = Groth16Scheme().generate_proofs_batch(jobs, max_workers=2)
+        
+        self.assertEqual([proof for proof, _ in results], proof_paths)
+        self.assertEqual(mock_popen.call_count, 3)
+        self.assertEqual(mock_run.call_count, 3)
+        self.assertEqual(sorted(witness_inputs), [b"0", b"1", b"2"])
+        # Witness files are removed once the batch is done
+        self.assertFalse(any(os.path.exists(path) for path in witness_paths))
+    
+    @mock.patch("asyncio.create_subprocess_exec")
+    def test_scheme_averify_batch(self, mock_exec):
+        """Test concurrent verification through asyncio subprocesses"""
+        from llamaverifier.proofs.schemes import Groth16Scheme
+        
+        def fake_exec(*args, **kwargs):
+            proc = mock.Mock(returncode=0)
+            valid = args[args.index("--proof-path") + 1] == "good.proof"
+            proc.communicate = mock.AsyncMock(
+                return_value=(b"VERIFICATION SUCCESSFUL" if valid else b"", b"")
             )
+            return proc
+        
+        mock_exec.side_effect = fake_exec
+        
+        results = asyncio.run(Groth16Scheme().averify_batch([
+            ("vk", "good.proof", "good.public"),
+            ("vk", "bad.proof", "bad.public"),
+        ]))
+        
+        self.assertEqual(results, [True, False])
+        self.assertEqual(mock_exec.call_count, 2)
+    
+    def test_get_scheme_shared_instance(self):
+        """Test that scheme instances are shared between lookups"""
+        from llamaverifier.proofs.schemes import Groth16Scheme, get_scheme
+        
+        scheme = get_scheme("g16")
+        
+        self.assertIsInstance(scheme, Groth16Scheme)
+        self.assertIs(get_scheme("G16"), scheme)
+        self.assertIs(get_scheme(SchemeType.GROTH16), scheme)
+    
+    def test_scheme_workspace(self):
+        """Test that scheme scratch files live in a removable workspace"""
+        from llamaverifier.proofs.schemes import Groth16Scheme
+        
+        scheme = Groth16Scheme()
+        first = scheme._slot(".witness")
+        second = scheme._slot(".witness")
+        
+        self.assertNotEqual(first, second)
+        self.assertEqual(os.path.dirname(first), scheme._workdir)
+        self.assertTrue(os.path.isdir(scheme._workdir))
+        
+        scheme.close()
+        self.assertFalse(os.path.exists(scheme._workdir))
+    
+    def test_shared_scheme_close(self):
+        """Test that closing a shared scheme keeps its scratch directory and outputs"""
+        from llamaverifier.proofs.schemes import get_scheme
+        
+        scheme = get_scheme("g16")
+        pk_path, vk_path = scheme.setup(self.circuit_path)
+        self.addCleanup(os.unlink, pk_path)
+        self.addCleanup(os.unlink, vk_path)
+        
+        scheme.close()
+        
+        self.assertTrue(os.path.isdir(scheme._workdir))
+        self.assertNotEqual(os.path.dirname(pk_path), scheme._workdir)
+        self.assertTrue(os.path.exists(pk_path))
+    
+    def test_scheme_flags(self):
+        """Test that each scheme passes its own ZoKrates scheme flag"""
+        from llamaverifier.proofs.schemes import GM17Scheme, Groth16Scheme
+        
+        self.mock_run.return_value = mock.Mock(returncode=0, stdout="", stderr="")
+        
+        for scheme, flag in ((Groth16Scheme(), "g16"), (GM17Scheme(), "gm17")):
+            scheme.export_verifier("vk.key", os.path.join(self.temp_dir, "verifier.sol"))
+            args = self.mock_run.call_args[0][0]
+            self.assertEqual(args[args.index("--scheme") + 1], flag)
     
     def test_scheme_type_enum(self):
         """Test SchemeType enum"""
-        self.assertEqual(SchemeType.GROTH16.value, "groth16")
+        self.assertEqual(SchemeType.GROTH16.value, "g16")
         self.assertEqual(SchemeType.GM17.value, "gm17")
         self.assertEqual(SchemeType.MARLIN.value, "marlin") 
\ No newline at end of file
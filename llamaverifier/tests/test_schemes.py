@@ -1,8 +1,7 @@
 """
 Tests for the schemes module
 """
-import os
-import tempfile
+import subprocess
 from unittest import TestCase, mock
 
 import pytest
@@ -12,63 +11,87 @@ from llamaverifier.proofs.schemes import (
     BaseScheme,
     Groth16Scheme,
     GM17Scheme,
-    MarlinScheme,
     get_scheme
 )
 
 
+@pytest.mark.parametrize("scheme_cls", [Groth16Scheme, GM17Scheme])
+def test_scheme(scheme_cls, circuit_file, tmp_path, mock_subprocess_run):
+    """Test each ZoKrates-backed scheme against a successful subprocess"""
+    scheme = scheme_cls()
+    
+    # Test setup method
+    pk_path, vk_path = scheme.setup(
+        circuit_file, str(tmp_path / "pk.key"), str(tmp_path / "vk.key")
+    )
+    assert (pk_path, vk_path) == (str(tmp_path / "pk.key"), str(tmp_path / "vk.key"))
+    
+    # Test generate_proof method; the witness is streamed to compute-witness
+    with mock.patch("llamaverifier.proofs.schemes._run_with_stdin_lines", return_value="") as mock_witness:
+        proof_path, public_inputs_path = scheme.generate_proof(
+            circuit_file, pk_path, ["3", "4", "12"],
+            str(tmp_path / "proof.json"), str(tmp_path / "public.json")
+        )
+    assert mock_witness.call_args[0][1] == ["3", "4", "12"]
+    assert (proof_path, public_inputs_path) == (str(tmp_path / "proof.json"), str(tmp_path / "public.json"))
+    
+    # Test verify_proof method
+    assert scheme.verify_proof(vk_path, proof_path, public_inputs_path)
+    
+    # Test export_verifier method
+    output_path = str(tmp_path / "verifier.sol")
+    assert scheme.export_verifier(vk_path, output_path) == output_path
+    
+    scheme.close()
+
+
 class TestSchemes(TestCase):
     """Test cases for the schemes module"""
     
-    def setUp(self):
-        """Set up test fixtures"""
-        # Create a temporary directory for test files
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.addCleanup(self.temp_dir.cleanup)
-        
-        # Create a dummy circuit file
-        self.circuit_path = os.path.join(self.temp_dir.name, "circuit.zok")
-        with open(self.circuit_path, "w") as f:
-            f.write("def main(private field a, private field b, public field c) -> bool:\n")
-            f.write("    return a * b == c\n")
-        
-        # Create dummy witness values
-        self.witness_path = os.path.join(self.temp_dir.name, "witness.json")
-        with open(self.witness_path, "w") as f:
-            f.write('{"a": 3, "b": 4, "c": 12}\n')
+    @pytest.fixture(autouse=True)
+    def _set_up(self, tmp_path, circuit_file, witness_file):
+        """Set up test fixtures
+        
+        The circuit and witness are the session's read-only dummy files;
+        anything a test writes goes to pytest's per-test directory.
+        """
+        self.temp_dir = str(tmp_path)
+        self.circuit_path = circuit_file
+        self.witness_path = witness_file[0]
     
     def test_scheme_type_enum(self):
         """Test SchemeType enum"""
-        self.assertEqual(SchemeType.GROTH16.value, "groth16")
+        self.assertEqual(SchemeType.GROTH16.value, "g16")
         self.assertEqual(SchemeType.GM17.value, "gm17")
         self.assertEqual(SchemeType.MARLIN.value, "marlin")
     
     def test_get_scheme(self):
         """Test get_scheme function"""
         # Test getting Groth16 scheme
-        scheme = get_scheme("groth16")
+        scheme = get_scheme("g16")
         self.assertIsInstance(scheme, Groth16Scheme)
         
+        # Test that repeated lookups share one instance
+        self.assertIs(get_scheme("g16"), scheme)
+        self.assertIs(get_scheme(SchemeType.GROTH16), scheme)
+        
         # Test getting GM17 scheme
         scheme = get_scheme("gm17")
         self.assertIsInstance(scheme, GM17Scheme)
         
-        # Test getting Marlin scheme
-        scheme = get_scheme("marlin")
-        self.assertIsInstance(scheme, MarlinScheme)
-        
         # Test getting default scheme
         scheme = get_scheme(None)
         self.assertIsInstance(scheme, Groth16Scheme)
         
-        # Test getting invalid scheme
-        with self.assertRaises(ValueError):
-            get_scheme("invalid_scheme")
+        # Test that unknown and unimplemented schemes fall back to the default
+        self.assertIsInstance(get_scheme("invalid_scheme"), Groth16Scheme)
+        self.assertIsInstance(get_scheme("marlin"), Groth16Scheme)
     
     def test_base_scheme(self):
         """Test BaseScheme class"""
         # Create a BaseScheme instance
         scheme = BaseScheme()
+        self.addCleanup(scheme.close)
         
         # Test setup method
         with self.assertRaises(NotImplementedError):
@@ -76,7 +99,7 @@ class TestSchemes(TestCase):
         
         # Test generate_proof method
         with self.assertRaises(NotImplementedError):
-            scheme.generate_proof(self.circuit_path, self.witness_path, "pk.key")
+            scheme.generate_proof(self.circuit_path, "pk.key", ["3", "4", "12"])
         
         # Test verify_proof method
         with self.assertRaises(NotImplementedError):
@@ -84,131 +107,36 @@ class TestSchemes(TestCase):
         
         # Test export_verifier method
         with self.assertRaises(NotImplementedError):
-            scheme.export_verifier("vk.key")
-    
-    @mock.patch("llamaverifier.proofs.schemes.subprocess.run")
-    def test_groth16_scheme(self, mock_run):
-        """Test Groth16Scheme class"""
-        # Mock subprocess.run to return success
-        mock_run.return_value = mock.Mock(
-            returncode=0,
-            stdout="Success",
-            stderr=""
-        )
-        
-        # Create a Groth16Scheme instance
-        scheme = Groth16Scheme()
-        
-        # Test setup method
-        pk_path, vk_path = scheme.setup(self.circuit_path)
-        self.assertIsNotNone(pk_path)
-        self.assertIsNotNone(vk_path)
-        
-        # Test generate_proof method
-        proof_path, public_inputs_path = scheme.generate_proof(
-            self.circuit_path, self.witness_path, "pk.key"
-        )
-        self.assertIsNotNone(proof_path)
-        self.assertIsNotNone(public_inputs_path)
-        
-        # Test verify_proof method
-        result = scheme.verify_proof("vk.key", "proof.json", "public.json")
-        self.assertTrue(result)
-        
-        # Test export_verifier method
-        verifier_path = scheme.export_verifier("vk.key")
-        self.assertIsNotNone(verifier_path)
+            scheme.export_verifier("vk.key", "verifier.sol")
     
+    @mock.patch("llamaverifier.proofs.schemes._run_with_stdin_lines")
     @mock.patch("llamaverifier.proofs.schemes.subprocess.run")
-    def test_gm17_scheme(self, mock_run):
-        """Test GM17Scheme class"""
-        # Mock subprocess.run to return success
-        mock_run.return_value = mock.Mock(
-            returncode=0,
-            stdout="Success",
-            stderr=""
-        )
-        
-        # Create a GM17Scheme instance
-        scheme = GM17Scheme()
-        
-        # Test setup method
-        pk_path, vk_path = scheme.setup(self.circuit_path)
-        self.assertIsNotNone(pk_path)
-        self.assertIsNotNone(vk_path)
-        
-        # Test generate_proof method
-        proof_path, public_inputs_path = scheme.generate_proof(
-            self.circuit_path, self.witness_path, "pk.key"
-        )
-        self.assertIsNotNone(proof_path)
-        self.assertIsNotNone(public_inputs_path)
-        
-        # Test verify_proof method
-        result = scheme.verify_proof("vk.key", "proof.json", "public.json")
-        self.assertTrue(result)
-        
-        # Test export_verifier method
-        verifier_path = scheme.export_verifier("vk.key")
-        self.assertIsNotNone(verifier_path)
-    
-    @mock.patch("llamaverifier.proofs.schemes.subprocess.run")
-    def test_marlin_scheme(self, mock_run):
-        """Test MarlinScheme class"""
-        # Mock subprocess.run to return success
-        mock_run.return_value = mock.Mock(
-            returncode=0,
-            stdout="Success",
-            stderr=""
-        )
-        
-        # Create a MarlinScheme instance
-        scheme = MarlinScheme()
-        
-        # Test setup method
-        pk_path, vk_path = scheme.setup(self.circuit_path)
-        self.assertIsNotNone(pk_path)
-        self.assertIsNotNone(vk_path)
-        
-        # Test generate_proof method
-        proof_path, public_inputs_path = scheme.generate_proof(
-            self.circuit_path, self.witness_path, "pk.key"
-        )
-        self.assertIsNotNone(proof_path)
-        self.assertIsNotNone(public_inputs_path)
-        
-        # Test verify_proof method
-        result = scheme.verify_proof("vk.key", "proof.json", "public.json")
-        self.assertTrue(result)
-        
-        # Test export_verifier method
-        verifier_path = scheme.export_verifier("vk.key")
-        self.assertIsNotNone(verifier_path)
-    
-    @mock.patch("llamaverifier.proofs.schemes.subprocess.run")
-    def test_scheme_failure(self, mock_run):
+    def test_scheme_failure(self, mock_run, mock_witness):
         """Test scheme failure handling"""
-        # Mock subprocess.run to return failure
-        mock_run.return_value = mock.Mock(
-            returncode=1,
-            stdout="",
-            stderr="Error"
-        )
+        # Mock the ZoKrates calls to fail the way check=True reports it
+        error = subprocess.CalledProcessError(1, ["zokrates"], output=b"", stderr=b"Error")
+        mock_run.side_effect = error
+        mock_witness.side_effect = error
         
         # Create a Groth16Scheme instance
         scheme = Groth16Scheme()
+        self.addCleanup(scheme.close)
         
         # Test setup method
         with self.assertRaises(RuntimeError):
-            scheme.setup(self.circuit_path)
+            scheme.setup(
+                self.circuit_path,
+                f"{self.temp_dir}/pk.key",
+                f"{self.temp_dir}/vk.key"
+            )
         
         # Test generate_proof method
         with self.assertRaises(RuntimeError):
-            scheme.generate_proof(self.circuit_path, self.witness_path, "pk.key")
+            scheme.generate_proof(self.circuit_path, "pk.key", ["3", "4", "12"])
         
         # Test verify_proof method
         self.assertFalse(scheme.verify_proof("vk.key", "proof.json", "public.json"))
         
         # Test export_verifier method
         with self.assertRaises(RuntimeError):
-            scheme.export_verifier("vk.key") 
\ No newline at end of file
+            scheme.export_verifier("vk.key", f"{self.temp_dir}/verifier.sol")
@@ -64,67 +64,3 @@ setup(
     package_dir={"": "src"},
     packages=find_packages(where="src"),
 )
-
-# Updated in commit 5 - 2025-04-04 17:46:50
-
-# Updated in commit 13 - 2025-04-04 17:46:51
-
-# Updated in commit 21 - 2025-04-04 17:46:51
-
-# Updated in commit 29 - 2025-04-04 17:46:52
-
-# Updated in commit 5 - 2025-04-05 14:44:36
-
-# Updated in commit 13 - 2025-04-05 14:44:37
-
-# Updated in commit 21 - 2025-04-05 14:44:37
-
-# Updated in commit 29 - 2025-04-05 14:44:37
-
-# Updated in commit 5 - 2025-04-05 15:30:47
-
-# Updated in commit 13 - 2025-04-05 15:30:47
-
-# Updated in commit 21 - 2025-04-05 15:30:48
-
-# Updated in commit 29 - 2025-04-05 15:30:48
-
-# Updated in commit 5 - 2025-04-05 16:11:06
-
-# Updated in commit 13 - 2025-04-05 16:11:06
-
-# Updated in commit 21 - 2025-04-05 16:11:06
-
-# Updated in commit 29 - 2025-04-05 16:11:06
-
-# Updated in commit 5 - 2025-04-05 17:17:33
-
-# Updated in commit 13 - 2025-04-05 17:17:34
-
-# Updated in commit 21 - 2025-04-05 17:17:34
-
-# Updated in commit 29 - 2025-04-05 17:17:34
-
-# Updated in commit 5 - 2025-04-05 17:49:08
-
-# Updated in commit 13 - 2025-04-05 17:49:08
-
-# Updated in commit 21 - 2025-04-05 17:49:08
-
-# Updated in commit 29 - 2025-04-05 17:49:08
-
-# Updated in commit 5 - 2025-04-05 18:38:50
-
-# Updated in commit 13 - 2025-04-05 18:38:50
-
-# Updated in commit 21 - 2025-04-05 18:38:50
-
-# Updated in commit 29 - 2025-04-05 18:38:50
-
-# Updated in commit 5 - 2025-04-05 18:50:35
-
-# Updated in commit 13 - 2025-04-05 18:50:35
-
-# Updated in commit 21 - 2025-04-05 18:50:35
-
-# Updated in commit 29 - 2025-04-05 18:50:35